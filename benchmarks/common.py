@@ -0,0 +1,97 @@
+"""Helpers shared by the benchmark scripts.
+
+The benchmarks reuse the models and resources from ``tests/base.py`` on a
+file backed SQLite database, so rows can be streamed and read from more than
+one connection. Run them from the repository root, e.g.::
+
+    python -m benchmarks.export --rows 1000000
+
+"""
+import os
+import resource
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import create_engine
+
+from tests.base import Base, Session, User, Order
+
+INSERT_BATCH = 10000
+
+
+@contextmanager
+def database(users, orders_per_user=0):
+    """Create and populate a scratch database, binding the test models'
+    scoped session to it for the duration of the block."""
+
+    directory = tempfile.mkdtemp(prefix='resource-alchemy-bench-')
+    engine = create_engine('sqlite:///%s' % os.path.join(directory, 'bench.db'))
+
+    Session.remove()
+    Session.configure(bind=engine)
+    Base.metadata.create_all(engine)
+
+    try:
+        populate(engine, users, orders_per_user)
+        yield engine
+    finally:
+        Session.remove()
+        engine.dispose()
+        shutil.rmtree(directory)
+
+
+def populate(engine, users, orders_per_user=0):
+    user_rows = []
+    order_rows = []
+
+    for user_id in range(1, users + 1):
+        user_rows.append({
+            'user_id': user_id,
+            'first_name': 'First %d' % user_id,
+            'last_name': 'Last %d' % user_id,
+            'age': 18 + user_id % 60,
+            'savings': user_id * 1.25,
+            'is_active': user_id % 3 != 0,
+            'biography': 'Biography of user %d' % user_id,
+        })
+
+        for _ in range(orders_per_user):
+            order_rows.append({'user_id': user_id})
+
+        if len(user_rows) >= INSERT_BATCH:
+            engine.execute(User.__table__.insert(), user_rows)
+            user_rows = []
+
+        if len(order_rows) >= INSERT_BATCH:
+            engine.execute(Order.__table__.insert(), order_rows)
+            order_rows = []
+
+    if user_rows:
+        engine.execute(User.__table__.insert(), user_rows)
+    if order_rows:
+        engine.execute(Order.__table__.insert(), order_rows)
+
+
+def timed(func, repeat=1):
+    """Return the best wall clock time of `repeat` calls to `func`."""
+
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        func()
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+
+def peak_memory_mb():
+    """Peak resident set size of this process, in megabytes (Linux)."""
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def report(label, seconds, rows):
+    print('%-32s %9.3fs %12.0f rows/s' % (label, seconds, rows / seconds if seconds else 0))
@@ -0,0 +1,62 @@
+"""Compare the single process and process pool NDJSON export paths.
+
+    python -m benchmarks.export --rows 1000000 --processes 4
+
+"""
+import argparse
+import multiprocessing
+
+from resource_alchemy import RestResource, Field
+
+from tests.base import User
+
+from .common import database, timed, report
+
+
+class ExportUserResource(RestResource):
+
+    user_id = Field()
+    first_name = Field()
+    last_name = Field()
+    age = Field()
+    savings = Field()
+    is_active = Field()
+    biography = Field()
+
+    class meta:
+        model = User
+
+
+def consume(chunks):
+    size = 0
+    for chunk in chunks:
+        size += len(chunk)
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--processes', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    parser.add_argument('--orm', action='store_true', help='also time serialize_list on ORM instances')
+    args = parser.parse_args()
+
+    with database(args.rows):
+        query = User.query.order_by(User.user_id)
+
+        if args.orm:
+            seconds = timed(lambda: ExportUserResource.serialize(query.all()))
+            report('serialize_list (ORM)', seconds, args.rows)
+
+        seconds = timed(lambda: consume(ExportUserResource.export(query, chunk_size=args.chunk_size,
+                                                                  processes=0)))
+        report('export, single process', seconds, args.rows)
+
+        seconds = timed(lambda: consume(ExportUserResource.export(query, chunk_size=args.chunk_size,
+                                                                  processes=args.processes)))
+        report('export, %d processes' % args.processes, seconds, args.rows)
+
+
+if __name__ == '__main__':
+    main()
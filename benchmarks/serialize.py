@@ -0,0 +1,63 @@
+"""Compare per-row serialization with and without the compiled serializer.
+
+    python -m benchmarks.serialize --rows 100000
+
+"""
+import argparse
+
+from resource_alchemy import RestResource, Field
+
+from tests.base import User
+
+from .common import database, timed, report
+
+
+class CompiledUserResource(RestResource):
+
+    user_id = Field()
+    first_name = Field()
+    last_name = Field()
+    age = Field()
+    savings = Field()
+    is_active = Field()
+    biography = Field()
+
+    class meta:
+        model = User
+
+
+class LoopUserResource(RestResource):
+
+    user_id = Field()
+    first_name = Field()
+    last_name = Field()
+    age = Field()
+    savings = Field()
+    is_active = Field()
+    biography = Field()
+
+    class meta:
+        model = User
+        compile_serializers = False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with database(args.rows):
+        users = User.query.all()
+
+        loop = timed(lambda: LoopUserResource.serialize(users), args.repeat)
+        report('serialize_one, field loop', loop, args.rows)
+
+        compiled = timed(lambda: CompiledUserResource.serialize(users), args.repeat)
+        report('serialize_one, compiled', compiled, args.rows)
+
+        print('%.2fx faster, %.2fus saved per row' % (loop / compiled, (loop - compiled) * 1e6 / args.rows))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Compare the memory and attribute lookup cost of the slotted field and
+search filter classes with equivalent classes that keep a ``__dict__``.
+
+    python -m benchmarks.slots --count 1000000
+
+"""
+import argparse
+import sys
+
+from resource_alchemy import Field
+from resource_alchemy.search import Filter
+
+from .common import timed
+
+
+class DictField(object):
+
+    def __init__(self, name=None, key=None, read_only=True, required=False, **kwargs):
+        self.name = name
+        self.key = key
+        self.model = None
+        self.read_only = read_only
+        self.required = required
+        self.options = kwargs
+        self.authorization = None
+        self.creation_order = 0
+
+
+class DictFilter(object):
+
+    def __init__(self, fieldname, operator, argument=None, otherfield=None):
+        self.fieldname = fieldname
+        self.operator = operator
+        self.argument = argument
+        self.otherfield = otherfield
+
+
+def sizeof(obj):
+    size = sys.getsizeof(obj)
+
+    # namedtuples expose a __dict__ property, so ask the type instead.
+    if type(obj).__dictoffset__:
+        size += sys.getsizeof(obj.__dict__)
+
+    return size
+
+
+def lookups(obj, attr, count):
+    def run():
+        for _ in xrange(count):
+            getattr(obj, attr)
+    return run
+
+
+def compare(label, slotted, plain, attr, count, repeat):
+    slotted_size = sizeof(slotted)
+    plain_size = sizeof(plain)
+
+    print('%-7s %4d bytes slotted, %4d bytes with __dict__ (%.0f%% smaller)'
+          % (label, slotted_size, plain_size, 100.0 * (plain_size - slotted_size) / plain_size))
+
+    slotted_time = timed(lookups(slotted, attr, count), repeat)
+    plain_time = timed(lookups(plain, attr, count), repeat)
+
+    print('%-7s %4.0fns per .%s slotted, %4.0fns with __dict__'
+          % ('', slotted_time * 1e9 / count, attr, plain_time * 1e9 / count))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--count', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    field = Field(description='a field')
+    field.bind('first_name')
+
+    compare('Field', field, DictField('first_name', 'first_name', description='a field'),
+            'name', args.count, args.repeat)
+    compare('Filter', Filter('age', 'lt', 20), DictFilter('age', 'lt', 20),
+            'argument', args.count, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
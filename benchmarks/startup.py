@@ -0,0 +1,163 @@
+"""Time app startup with N synthetic resources, eager and lazy.
+
+    python -m benchmarks.startup --resources 50 400
+
+Each mode runs in a fresh interpreter, which defines N models with a few
+columns and a foreign key to the next one, then N resources that use
+``meta.excludes`` and a forward-referenced ``ListRelationship``, registers
+them on a Flask app and serves the first request. Lazy resources are
+prepared when they are first used, all at once with `--finalize`, or
+together with every other cache with `--warmup`, as a pre-fork master would.
+The time of each step and the peak resident memory of the interpreter are
+reported.
+
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+#: Steps timed in each interpreter, in order.
+STEPS = ('models', 'resources', 'register', 'prepare', 'first request', 'total')
+
+
+def define_models(count):
+    from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String, create_engine
+    from sqlalchemy.ext.declarative import declarative_base
+    from sqlalchemy.orm import relationship, scoped_session, sessionmaker
+
+    engine = create_engine('sqlite://')
+    session = scoped_session(sessionmaker(bind=engine))
+    base = declarative_base()
+    base.query = session.query_property()
+
+    models = []
+
+    for index in range(count):
+        attrs = {
+            '__tablename__': 'synthetic_%d' % index,
+            'id': Column(Integer, primary_key=True),
+            'name': Column(String(50)),
+            'value': Column(Float),
+            'created': Column(DateTime),
+            'next_id': Column(Integer, ForeignKey('synthetic_%d.id' % ((index + 1) % count))),
+        }
+
+        if index:
+            attrs['previous'] = relationship('Synthetic%d' % (index - 1),
+                                             foreign_keys='Synthetic%d.next_id' % (index - 1))
+
+        models.append(type('Synthetic%d' % index, (base,), attrs))
+
+    base.metadata.create_all(engine)
+
+    return models
+
+
+def define_resources(models, lazy):
+    from resource_alchemy import RestResource, ListRelationship
+
+    resources = []
+
+    def forward(index):
+        return lambda: resources[index]
+
+    for index, model in enumerate(models):
+        meta = type('meta', (), {'model': model, 'excludes': ('created',), 'lazy': lazy})
+        attrs = {'meta': meta}
+
+        if index:
+            attrs['previous'] = ListRelationship(forward(index - 1))
+
+        resources.append(type('Synthetic%dResource' % index, (RestResource,), attrs))
+
+    return resources
+
+
+def child(count, lazy, prepare):
+    """Run in a fresh interpreter and print the timings as JSON."""
+
+    started = time.time()
+    timings = {}
+
+    def step(name, func, *args):
+        start = time.time()
+        result = func(*args)
+        timings[name] = time.time() - start
+        return result
+
+    from flask import Flask
+
+    from resource_alchemy import finalize, warmup
+
+    from .common import peak_memory_mb
+
+    models = step('models', define_models, count)
+    resources = step('resources', define_resources, models, lazy)
+
+    app = Flask(__name__)
+
+    def register():
+        for resource in resources:
+            resource.register_api(app)
+
+    step('register', register)
+
+    def prepare_all():
+        if prepare == 'finalize':
+            finalize()
+        elif prepare == 'warmup':
+            warmup(app)
+
+    step('prepare', prepare_all)
+
+    client = app.test_client()
+
+    def first_request():
+        response = client.get('/%s/' % resources[-1].meta.name)
+        assert response.status_code == 200, response.status_code
+
+    step('first request', first_request)
+
+    timings['total'] = time.time() - started
+    timings['peak_mb'] = peak_memory_mb()
+
+    print(json.dumps(timings))
+
+
+def run(count, lazy, prepare):
+    flags = (['--lazy'] if lazy else []) + (['--%s' % prepare] if prepare else [])
+    output = subprocess.check_output([sys.executable, '-m', 'benchmarks.startup', '--child',
+                                      '--resources', str(count)] + flags)
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--resources', type=int, nargs='+', default=[50, 400])
+    parser.add_argument('--finalize', dest='prepare', action='store_const', const='finalize',
+                        help='prepare the lazy resources with finalize() before the first request')
+    parser.add_argument('--warmup', dest='prepare', action='store_const', const='warmup',
+                        help='build every cache with warmup(app) before the first request')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--lazy', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.resources[0], args.lazy, args.prepare)
+        return
+
+    print('%9s  %-6s %s %10s' % ('resources', 'mode', ' '.join('%13s' % name for name in STEPS), 'peak rss'))
+
+    for count in args.resources:
+        for lazy in (False, True):
+            timings = run(count, lazy, args.prepare)
+            print('%9d  %-6s %s %8.1fMB' % (count, 'lazy' if lazy else 'eager',
+                                          ' '.join('%12.3fs' % timings[name] for name in STEPS),
+                                          timings['peak_mb']))
+            sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
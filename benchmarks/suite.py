@@ -0,0 +1,286 @@
+"""Time the hot paths of a resource at several table sizes.
+
+    python -m benchmarks.suite --rows 1000 100000 1000000 --save baseline.json
+    python -m benchmarks.suite --rows 1000 100000 --compare baseline.json
+
+Every scenario runs `--iterations` times after `--warmup` untimed runs, and
+reports its throughput, p50 and p99 latency, SQL statements per run and the
+peak resident memory of the process so far. With `--compare`, the results
+are checked against a baseline saved with `--save`, and the exit status is 1
+if any scenario got slower than `--tolerance` allows or runs more SQL.
+
+"""
+import argparse
+import json
+import random
+import sys
+import time
+
+from flask import Flask
+from sqlalchemy.ext.hybrid import hybrid_property
+
+from resource_alchemy import RestResource, Field, ListRelationship
+from resource_alchemy.detector import recording, watch
+from resource_alchemy.search import create_query
+
+from tests.base import Session, User, Order
+
+from .common import database, peak_memory_mb
+
+#: Filters for the search scenarios, the first N of which are used.
+SEARCH_FILTERS = [
+    {'name': 'age', 'op': 'ge', 'val': 30},
+    {'name': 'is_active', 'op': 'eq', 'val': True},
+    {'name': 'last_name', 'op': 'like', 'val': 'Last 1%'},
+    {'name': 'savings', 'op': 'gt', 'val': 10.0},
+    {'name': 'first_name', 'op': 'like', 'val': 'First%'},
+    {'name': 'age', 'op': 'lt', 'val': 70},
+    {'name': 'user_id', 'op': 'gt', 'val': 0},
+    {'name': 'biography', 'op': 'like', 'val': 'Biography%'},
+]
+
+
+class BenchOrderResource(RestResource):
+
+    order_id = Field()
+
+    class meta:
+        model = Order
+        name = 'bench_order'
+
+
+class BenchUserResource(RestResource):
+
+    user_id = Field()
+    first_name = Field(read_only=False)
+    last_name = Field(read_only=False)
+    age = Field(read_only=False)
+    savings = Field(read_only=False)
+    is_active = Field(read_only=False)
+    biography = Field(read_only=False)
+
+    class meta:
+        model = User
+        name = 'bench_user'
+
+    @hybrid_property
+    def search_query(cls):
+        return cls.base_query.order_by(User.user_id).limit(cls.meta.results_per_page)
+
+
+class BenchUserOrdersResource(RestResource):
+
+    user_id = Field()
+    first_name = Field(read_only=False)
+    orders = ListRelationship(lambda: BenchOrderResource, read_only=False)
+
+    class meta:
+        model = User
+        name = 'bench_user_orders'
+
+    @hybrid_property
+    def search_query(cls):
+        return cls.base_query.order_by(User.user_id).limit(cls.meta.results_per_page)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure(func, iterations, warmup):
+    """Run `func` `warmup` times, then `iterations` timed times, returning
+    the metrics of the timed runs."""
+
+    for _ in range(warmup):
+        func()
+
+    latencies = []
+
+    with recording(attribute=False) as recorder:
+        for _ in range(iterations):
+            start = time.time()
+            func()
+            latencies.append(time.time() - start)
+
+    total = sum(latencies)
+
+    return {
+        'throughput': iterations / total if total else 0.0,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'sql': len(recorder) / float(iterations),
+        'peak_mb': peak_memory_mb(),
+    }
+
+
+def scenarios(client, rows, args, rng):
+    """Yield ``(name, func)`` for each scenario, against a database of
+    `rows` users."""
+
+    def single_get():
+        response = client.get('/bench_user/%d' % rng.randint(1, rows))
+        assert response.status_code == 200, response.status_code
+
+    def list_get():
+        response = client.get('/bench_user/')
+        assert response.status_code == 200, response.status_code
+
+    def list_get_relationships():
+        response = client.get('/bench_user_orders/')
+        assert response.status_code == 200, response.status_code
+
+    yield 'get one', single_get
+    yield 'get list', list_get
+    yield 'get list with relationships', list_get_relationships
+
+    for count in args.filters:
+        params = {'filters': SEARCH_FILTERS[:count],
+                  'order_by': [{'field': 'user_id', 'direction': 'asc'}]}
+
+        def search(params=params):
+            session = Session()
+            query = create_query(session, User, params, table=BenchUserResource._filter_table)
+            BenchUserResource.serialize(query.limit(BenchUserResource.meta.results_per_page).all())
+            session.rollback()
+
+        yield 'search, %d filters' % count, search
+
+    def schema():
+        # _schema() is cached, so time building it.
+        BenchUserOrdersResource._build_schema()
+
+    yield 'schema', schema
+
+    batch = json.dumps([{'first_name': 'New', 'last_name': 'User %d' % index, 'age': 30 + index % 40,
+                         'savings': float(index), 'is_active': True, 'biography': 'Created by the benchmark'}
+                        for index in range(args.batch)])
+
+    def bulk_create():
+        response = client.post('/bench_user/', data=batch, content_type='application/json')
+        assert response.status_code == 201, response.status_code
+        Session.remove()
+
+    yield 'bulk create, %d rows' % args.batch, bulk_create
+
+    # Each update goes to a different user, whose payload is built up front
+    # so that reading the current orders is not timed.
+    user_ids = rng.sample(range(1, rows + 1), min(rows, args.iterations + args.warmup))
+    orders = dict((user_id, []) for user_id in user_ids)
+
+    for order in Order.query.filter(Order.user_id.in_(user_ids)):
+        orders[order.user_id].append({'order_id': order.order_id})
+
+    Session.remove()
+
+    payloads = iter([(user_id, {'user_id': user_id, 'first_name': 'Updated', 'orders': orders[user_id] + [{}]})
+                     for user_id in user_ids])
+
+    def nested_update():
+        user_id, payload = next(payloads)
+        response = client.put('/bench_user_orders/%d' % user_id, data=json.dumps(payload),
+                              content_type='application/json')
+        assert response.status_code == 200, response.status_code
+        Session.remove()
+
+    yield 'nested list update', nested_update
+
+
+def run(rows, args):
+    results = {}
+    rng = random.Random(rows)
+
+    with database(rows, args.orders_per_user) as engine:
+        watch(engine)
+
+        app = Flask(__name__)
+        BenchUserResource.register_api(app)
+        BenchUserOrdersResource.register_api(app)
+        client = app.test_client()
+
+        for name, func in scenarios(client, rows, args, rng):
+            results[name] = measure(func, args.iterations, args.warmup)
+            Session.remove()
+            report(rows, name, results[name])
+
+    return results
+
+
+def report(rows, name, result):
+    print('%9d  %-32s %10.1f/s %9.2fms %9.2fms %8.1f sql %8.1fMB' % (
+        rows, name, result['throughput'], result['p50_ms'], result['p99_ms'], result['sql'],
+        result['peak_mb']))
+    sys.stdout.flush()
+
+
+def compare(results, baseline, tolerance):
+    """Print the change of every result against `baseline` and return the
+    regressions."""
+
+    regressions = []
+
+    print('')
+    print('%9s  %-32s %10s %10s %10s %8s' % ('rows', 'scenario', 'ops/s', 'p50', 'p99', 'sql'))
+
+    for rows, scenario_results in sorted(results.items(), key=lambda item: int(item[0])):
+        for name, result in sorted(scenario_results.items()):
+            before = baseline.get(rows, {}).get(name)
+
+            if before is None:
+                print('%9s  %-32s %s' % (rows, name, 'not in baseline'))
+                continue
+
+            def change(key):
+                return (result[key] - before[key]) / before[key] if before[key] else 0.0
+
+            print('%9s  %-32s %+9.1f%% %+9.1f%% %+9.1f%% %+8.1f' % (
+                rows, name, change('throughput') * 100, change('p50_ms') * 100, change('p99_ms') * 100,
+                result['sql'] - before['sql']))
+
+            if change('throughput') < -tolerance or change('p50_ms') > tolerance \
+                    or change('p99_ms') > tolerance or result['sql'] > before['sql']:
+                regressions.append((rows, name))
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 100000, 1000000])
+    parser.add_argument('--orders-per-user', type=int, default=2)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--filters', type=int, nargs='+', default=[1, 4, 8],
+                        help='number of filters in each search scenario, at most %d' % len(SEARCH_FILTERS))
+    parser.add_argument('--batch', type=int, default=100, help='rows per bulk create')
+    parser.add_argument('--save', metavar='PATH', help='write the results to PATH as a baseline')
+    parser.add_argument('--compare', metavar='PATH', help='compare the results to the baseline at PATH')
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help='allowed slowdown against the baseline, as a fraction')
+    args = parser.parse_args()
+
+    print('%9s  %-32s %12s %11s %11s %12s %10s' % ('rows', 'scenario', 'throughput', 'p50', 'p99',
+                                                   'sql/run', 'peak rss'))
+
+    # JSON object keys are strings, so the results are keyed the same way.
+    results = dict((str(rows), run(rows, args)) for rows in args.rows)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+        regressions = compare(results, baseline, args.tolerance)
+
+        if regressions:
+            print('\n%d regression(s): %s' % (len(regressions), ', '.join('%s rows %s' % regression
+                                                                         for regression in regressions)))
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
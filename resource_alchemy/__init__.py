@@ -26,7 +26,11 @@ from .resource import (Resource,
                        ApiResource,
                        RestResource,
                        ModelTransformer,
-                       resource_route)
+                       resource_route,
+                       finalize,
+                       registry)
+
+from .naming import convert_name
 
 
 from .authorization import (FullAuthorization,
@@ -34,4 +38,18 @@ from .authorization import (FullAuthorization,
                             ReadOnlyAuthorization,
                             PropertyAuthorization)
 
-from .exceptions import (BaseException, EXCEPTIONS,)
+from .cache import FragmentCache
+
+from .advisor import IndexAdvisor
+
+from .fulltext import create_search_index
+
+from .instrumentation import Instrumentation, InMemoryMetrics
+
+from .detector import QueryDetector, NPlusOneQueries
+
+from .session import SessionProvider
+
+from .warmup import warmup
+
+from .exceptions import (BaseException, NotAuthorized, InvalidFilter, EXCEPTIONS,)
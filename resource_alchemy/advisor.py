@@ -0,0 +1,172 @@
+import collections
+import logging
+import threading
+import time
+
+from sqlalchemy import UniqueConstraint, func, select
+
+from .exceptions import InvalidFilter
+from .registry import registry
+from .search import add_query_hook, remove_query_hook
+from .session import resource_session
+
+
+log = logging.getLogger(__name__)
+
+
+def _column(attribute):
+    """The table column behind a mapped column attribute, or ``None``."""
+
+    columns = getattr(attribute.property, 'columns', None)
+
+    if not columns or not hasattr(columns[0], 'table'):
+        return None
+
+    return columns[0]
+
+
+def leading_columns(table):
+    """The columns of `table` which lead its primary key, an index or a
+    unique constraint, so a lookup or ordering on them can use that index."""
+
+    leading = set()
+
+    if len(table.primary_key.columns):
+        leading.add(list(table.primary_key.columns)[0])
+
+    for index in table.indexes:
+        if len(index.columns):
+            leading.add(list(index.columns)[0])
+
+    for constraint in table.constraints:
+        if isinstance(constraint, UniqueConstraint) and len(constraint.columns):
+            leading.add(list(constraint.columns)[0])
+
+    return leading
+
+
+class IndexAdvisor(object):
+
+    """Records which columns searches filter and order on, per resource, and
+    whether an index covers each of them.
+
+    :meth:`install` registers the advisor as a search query hook. With
+    `strict`, searches which order a table of at least `large_table_rows`
+    rows by a column without an index are refused with
+    :exc:`~resource_alchemy.exceptions.InvalidFilter`. Row counts are read
+    with ``count(*)`` through `bind`, an engine, connection or session, or
+    else the session of the resource searched, and kept for `row_count_ttl`
+    seconds, unless given up front in `row_counts`, which maps table names to
+    row counts.
+
+    """
+
+    def __init__(self, strict=False, large_table_rows=100000, row_count_ttl=300, row_counts=None, bind=None):
+        self.strict = strict
+        self.large_table_rows = large_table_rows
+        self.row_count_ttl = row_count_ttl
+        self.row_counts = dict(row_counts or {})
+        self.bind = bind
+
+        self._lock = threading.Lock()
+        self._usage = collections.defaultdict(lambda: {'filter': 0, 'order_by': 0})
+        self._indexed = {}
+        self._counted = {}
+
+    def install(self):
+        add_query_hook(self)
+        return self
+
+    def uninstall(self):
+        remove_query_hook(self)
+
+    def __call__(self, name, model, filter_columns, order_columns):
+        if self.strict:
+            for attribute in order_columns:
+                column = _column(attribute)
+
+                if column is not None and not self.is_indexed(column) and self.is_large(column.table, model, name):
+                    raise InvalidFilter("Cannot order {0} by '{1}', it is not indexed".format(name, attribute.key))
+
+        with self._lock:
+            for usage, attributes in (('filter', filter_columns), ('order_by', order_columns)):
+                for attribute in attributes:
+                    column = _column(attribute)
+
+                    if column is not None:
+                        self._usage[(name, column)][usage] += 1
+
+    def is_indexed(self, column):
+        indexed = self._indexed.get(column.table)
+
+        if indexed is None:
+            indexed = self._indexed[column.table] = leading_columns(column.table)
+
+        return column in indexed
+
+    def is_large(self, table, model, name=None):
+        return self.row_count(table, model, name) >= self.large_table_rows
+
+    def row_count(self, table, model, name=None):
+        """The number of rows in `table`, counted at most once every
+        `row_count_ttl` seconds through `bind`, or else the session of the
+        resource named `name` or of the first resource for `model`."""
+
+        if table.name in self.row_counts:
+            return self.row_counts[table.name]
+
+        counted = self._counted.get(table.name)
+
+        if counted is None or time.time() - counted[0] > self.row_count_ttl:
+            count = self._bind(model, name).execute(select([func.count()]).select_from(table)).scalar()
+            counted = self._counted[table.name] = (time.time(), count)
+
+        return counted[1]
+
+    def _bind(self, model, name):
+        if self.bind is not None:
+            return self.bind
+
+        resource = registry.for_name(name) if name else None
+
+        if resource is None:
+            resource = registry.for_model(model)
+
+        if resource is None:
+            return model.query.session
+
+        return resource_session(resource)
+
+    def report(self):
+        """Returns one dictionary per resource and column searched on, with
+        how many times it was filtered and ordered on, whether it is indexed,
+        and a ``score`` of those uses when it is not. Sorted by score, so the
+        most needed indexes come first."""
+
+        with self._lock:
+            usage = [(key, dict(counts)) for key, counts in self._usage.items()]
+
+        rows = []
+
+        for (name, column), counts in usage:
+            indexed = self.is_indexed(column)
+            uses = counts['filter'] + counts['order_by']
+
+            rows.append({
+                'resource': name,
+                'column': '%s.%s' % (column.table.name, column.name),
+                'filter': counts['filter'],
+                'order_by': counts['order_by'],
+                'indexed': indexed,
+                'score': 0 if indexed else uses,
+            })
+
+        rows.sort(key=lambda row: (-row['score'], row['resource'], row['column']))
+
+        return rows
+
+    def reset(self):
+        with self._lock:
+            self._usage.clear()
+            self._indexed.clear()
+            self._counted.clear()
@@ -1,9 +1,6 @@
-import re
+from sqlalchemy import false
 
-
-def convert_name(name):
-    s1 = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', name)
-    return re.sub('([a-z0-9])([A-Z])', r'\1_\2', s1).lower()
+from .naming import convert_name  # NOQA
 
 
 class NoAuthorization(object):
@@ -16,6 +13,10 @@ class NoAuthorization(object):
     def can_read(cls, obj, **kwargs):
         return False
 
+    @classmethod
+    def read_filter(cls, query, **kwargs):
+        return query.filter(false())
+
     @classmethod
     def can_update(cls, obj, **kwargs):
         return False
@@ -35,6 +36,10 @@ class FullAuthorization(object):
     def can_read(cls, obj, **kwargs):
         return True
 
+    @classmethod
+    def read_filter(cls, query, **kwargs):
+        return query
+
     @classmethod
     def can_update(cls, obj, **kwargs):
         return True
@@ -73,6 +78,10 @@ class ReadOnlyAuthorization(object):
     def can_read(cls, obj, **kwargs):
         return True
 
+    @classmethod
+    def read_filter(cls, query, **kwargs):
+        return query
+
     @classmethod
     def can_update(cls, obj, **kwargs):
         return False
@@ -0,0 +1,463 @@
+import collections
+import itertools
+import logging
+
+try:
+    import ujson as json
+except ImportError:  # pragma: no cover
+    import json
+
+from sqlalchemy import inspect
+from sqlalchemy.exc import CompileError, SQLAlchemyError
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import Insert
+
+from .authorization import FullAuthorization
+from .exceptions import NotAuthorized
+from .fields import Field, DateTimeField, IntervalField, FullFieldAuthorization
+
+
+log = logging.getLogger(__name__)
+
+#: ``to_obj`` implementations that only apply ``parse_value`` before setting
+#: the attribute, and can therefore be replaced by a plain mapping.
+RAW_TO_OBJ = tuple(field_cls.to_obj.__func__ for field_cls in (Field, DateTimeField, IntervalField))
+
+
+#: Authorizations whose ``can_update`` does not depend on the object, so
+#: rows can be updated without loading them first.
+UNCONDITIONAL_UPDATE = (None, FullAuthorization)
+
+
+class SQLiteUpsert(Insert):
+
+    """``INSERT ... ON CONFLICT (...) DO UPDATE`` for SQLite 3.24+, which
+    SQLAlchemy only provides natively for PostgreSQL."""
+
+    def __init__(self, table, index_elements, update_columns):
+        super(SQLiteUpsert, self).__init__(table)
+        self.index_elements = index_elements
+        self.update_columns = update_columns
+
+
+@compiles(SQLiteUpsert)
+def _compile_upsert(element, compiler, **kw):
+    raise CompileError('Upserts are not supported on %s' % compiler.dialect.name)
+
+
+@compiles(SQLiteUpsert, 'sqlite')
+def _compile_sqlite_upsert(element, compiler, **kw):
+    statement = compiler.visit_insert(element, **kw)
+    quote = compiler.preparer.quote
+
+    target = ', '.join(quote(column.name) for column in element.index_elements)
+
+    if not element.update_columns:
+        return '%s ON CONFLICT (%s) DO NOTHING' % (statement, target)
+
+    assignments = ', '.join('{0} = excluded.{0}'.format(quote(column.name))
+                            for column in element.update_columns)
+
+    return '%s ON CONFLICT (%s) DO UPDATE SET %s' % (statement, target, assignments)
+
+
+def upsert_statement(dialect_name, table, index_elements, update_columns):
+    """Return an insert of `table` which updates `update_columns` when a row
+    with the same `index_elements` already exists."""
+
+    if dialect_name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+
+        statement = insert(table)
+
+        if not update_columns:
+            return statement.on_conflict_do_nothing(index_elements=index_elements)
+
+        return statement.on_conflict_do_update(
+            index_elements=index_elements,
+            set_=dict((column.name, statement.excluded[column.key]) for column in update_columns))
+
+    if dialect_name == 'sqlite':
+        return SQLiteUpsert(table, index_elements, update_columns)
+
+    raise ValueError('Upserts are not supported on %s' % dialect_name)
+
+
+class CreatePlan(object):
+
+    """Builds new objects of a resource's model in one pass over its
+    writable fields.
+
+    Plain writable fields become keyword arguments of the model's
+    constructor, after ``parse_value``. Like :meth:`Field.to_obj` on a fresh
+    object, ``None`` values are left out so column defaults apply. Field
+    authorizations other than :class:`FullFieldAuthorization` are asked once,
+    with the new object, which is then constructed first and has the allowed
+    values set on it. Fields they refuse are skipped, as are read only
+    fields. Fields with their own ``to_obj``, and relationships, are applied
+    to the new object afterwards.
+
+    """
+
+    def __init__(self, resource):
+        self.resource = resource
+        self.model = resource.meta.model
+        self.fields = {}
+        self.deferred = []
+
+        for key, field in resource._field_plan():
+            if field.read_only:
+                continue
+
+            if type(field).to_obj.__func__ in RAW_TO_OBJ:
+                authorization = field.authorization
+
+                if authorization is FullFieldAuthorization:
+                    authorization = None
+
+                self.fields[key] = (field.name, field.parse_value, authorization)
+            else:
+                self.deferred.append((key, field, True))
+
+        # Relationships check their own authorization in to_obj.
+        for key, relationship in sorted(resource._relationships(), key=lambda item: item[1].creation_order):
+            self.deferred.append((key, relationship, False))
+
+    def create(self, obj_data):
+        authorization = self.resource.meta.authorization
+
+        if authorization and not authorization.can_create(obj_data):
+            raise NotAuthorized('Not authorized to create object')
+
+        kwargs = {}
+        obj = None
+
+        for key, value in obj_data.iteritems():
+            entry = self.fields.get(key)
+
+            if entry is None:
+                continue
+
+            name, parse_value, field_authorization = entry
+
+            if field_authorization is not None:
+                if obj is None:
+                    obj = self.model()
+
+                if not field_authorization.can_update(obj, value, **obj_data):
+                    continue
+
+            value = parse_value(value)
+
+            if value is not None:
+                kwargs[name] = value
+
+        if obj is None:
+            obj = self.model(**kwargs)
+        else:
+            for name, value in kwargs.iteritems():
+                setattr(obj, name, value)
+
+        for key, field, check in self.deferred:
+            if key in obj_data:
+                value = obj_data[key]
+
+                if not check or field.authorization.can_update(obj, value, **obj_data):
+                    field.to_obj(obj, value, **obj_data)
+
+        return obj
+
+    def create_list(self, records):
+        return [self.create(obj_data) for obj_data in records]
+
+    def add_all(self, session, objs, records):
+        """Add the objects created from `records` to `session`.
+
+        When the resource has no relationships or fields with their own
+        ``to_obj``, they are inserted right away with
+        :meth:`~sqlalchemy.orm.session.Session.bulk_save_objects`, which
+        skips the unit of work and leaves them out of the session. Primary
+        keys are fetched back unless every record carries its own.
+
+        """
+        if self.deferred:
+            session.add_all(objs)
+            return
+
+        pk_keys = [column.key for column in self.resource._primary_keys()]
+        return_defaults = not all(all(obj_data.get(key) is not None for key in pk_keys) for obj_data in records)
+
+        session.bulk_save_objects(objs, return_defaults=return_defaults)
+
+
+class ImportPlan(object):
+
+    """Validates records against a resource's writable fields and turns them
+    into mappings for :meth:`~sqlalchemy.orm.session.Session.bulk_insert_mappings`.
+
+    With `upsert`, records must also carry every primary key, which is
+    accepted even on read only fields, and the resource's authorization must
+    allow updates without looking at the object.
+
+    Raises :exc:`ValueError` if a writable field has its own ``to_obj``, which
+    bulk inserts cannot run, or if the resource cannot be upserted.
+
+    """
+
+    def __init__(self, resource, upsert=False):
+        self.resource = resource
+        self.upsert = upsert
+        self.fields = {}
+        self.required = []
+        self.primary_keys = {}
+
+        if upsert:
+            if resource.meta.authorization not in UNCONDITIONAL_UPDATE:
+                raise ValueError('%s checks update authorization per object and cannot be '
+                                 'upserted' % resource.meta.name)
+
+            mapper = inspect(resource.meta.model)
+            pk_names = [mapper.get_property_by_column(column).key for column in mapper.primary_key]
+            fields_by_name = dict((field.name, (key, field)) for key, field in resource._field_plan())
+
+            for name in pk_names:
+                if name not in fields_by_name:
+                    raise ValueError("%s does not declare its primary key '%s' and cannot be "
+                                     "upserted" % (resource.meta.name, name))
+
+                key, field = fields_by_name[name]
+                self.primary_keys[key] = field
+
+        for key, field in resource._field_plan():
+            if field.required:
+                self.required.append(key)
+
+            if field.read_only:
+                continue
+
+            if type(field).to_obj.__func__ not in RAW_TO_OBJ:
+                raise ValueError("'%s' overrides to_obj and cannot be imported in bulk" % key)
+
+            self.fields[key] = field
+
+        self.relationships = set(key for key, field in resource._relationships() if not field.read_only)
+        self.readable = set(key for key, _ in resource._fields())
+        self.readable.update(key for key, _ in resource._relationships())
+
+    def validate(self, record):
+        """Return the insert mapping for `record`, or raise :exc:`ValueError`
+        describing why it cannot be imported.
+
+        Like ``to_obj``, read only fields and fields whose authorization
+        refuses the update are left out, so exported records can be imported
+        again.
+
+        """
+
+        if not isinstance(record, dict):
+            raise ValueError('Expected an object')
+
+        authorization = self.resource.meta.authorization
+
+        if authorization and not authorization.can_create(record):
+            raise ValueError('Not authorized to create object')
+
+        missing = [key for key in self.required if record.get(key) is None]
+        missing.extend(key for key in self.primary_keys if record.get(key) is None)
+
+        if missing:
+            raise ValueError('Missing required field(s): %s' % ', '.join(sorted(missing)))
+
+        mapping = {}
+
+        for key, value in record.iteritems():
+            field = self.fields.get(key)
+
+            if field is None:
+                field = self.primary_keys.get(key)
+
+                if field is None:
+                    if key in self.relationships:
+                        raise ValueError("'%s' is a relationship and cannot be imported in bulk" % key)
+                    if key in self.readable:
+                        continue
+                    raise ValueError("Unknown field '%s'" % key)
+            elif not self._can_update(key, field, value, record):
+                continue
+
+            try:
+                mapping[field.name] = field.parse_value(value)
+            except (ValueError, TypeError, OverflowError):
+                raise ValueError("Invalid value for '%s'" % key)
+
+        return mapping
+
+    @staticmethod
+    def _can_update(key, field, value, record):
+        # There is no object yet, which authorizations that inspect it may
+        # not expect. Anything else they raise is theirs to report.
+        try:
+            return field.authorization.can_update(None, value, **record)
+        except (AttributeError, TypeError) as e:
+            raise ValueError("Cannot authorize '%s' without an object: %s" % (key, unicode(e)))
+
+
+def upsert_mappings(session, model, mappings):
+    """Insert or update `mappings` (attribute name to value, as returned by
+    :meth:`ImportPlan.validate`) and return their primary keys in order.
+
+    Mappings for the same primary key are merged first, in order, so the
+    last value of each key wins, as if they were written one after another.
+    The merged mappings are written in order with one executemany statement
+    per run of consecutive mappings with the same set of keys.
+
+    """
+
+    mapper = inspect(model)
+    table = mapper.local_table
+    dialect_name = session.get_bind(mapper).dialect.name
+
+    columns = dict((prop.key, prop.columns[0]) for prop in mapper.column_attrs)
+    pk_columns = list(mapper.primary_key)
+    pk_names = [mapper.get_property_by_column(column).key for column in pk_columns]
+
+    merged = collections.OrderedDict()
+    for mapping in mappings:
+        pk = tuple(mapping[name] for name in pk_names)
+
+        if pk in merged:
+            merged[pk].update(mapping)
+        else:
+            merged[pk] = dict(mapping)
+
+    for names, group in itertools.groupby(merged.values(), frozenset):
+        update_columns = [columns[name] for name in sorted(names) if name not in pk_names]
+        statement = upsert_statement(dialect_name, table, pk_columns, update_columns)
+        params = [dict((columns[name].key, value) for name, value in mapping.iteritems())
+                  for mapping in group]
+
+        session.execute(statement, params)
+
+    return [tuple(mapping[name] for name in pk_names) for mapping in mappings]
+
+
+def upsert(resource, records, session, chunk_size=None):
+    """Insert or update `records` for `resource` without reading them first.
+
+    Every record is validated before anything is written, and a
+    :exc:`ValueError` naming the first bad record is raised. The records are
+    then written with dialect native ``INSERT ... ON CONFLICT DO UPDATE``
+    statements, one per chunk when the records of a chunk carry the same
+    fields (see :func:`upsert_mappings`), touching only the columns present
+    in each record. Nothing is committed.
+
+    Returns the primary key tuples of the records, in order.
+
+    """
+    plan = ImportPlan(resource, upsert=True)
+    chunk_size = chunk_size or resource.meta.import_chunk_size
+
+    mappings = []
+    for index, record in enumerate(records):
+        try:
+            mappings.append(plan.validate(record))
+        except ValueError as e:
+            raise ValueError(u'Record %d: %s' % (index, unicode(e)))
+
+    keys = []
+    for start in range(0, len(mappings), chunk_size):
+        keys.extend(upsert_mappings(session, resource.meta.model, mappings[start:start + chunk_size]))
+
+    return keys
+
+
+def import_ndjson(resource, lines, session, chunk_size=None, upsert=False):
+    """Import newline delimited JSON records and yield progress events.
+
+    Records are validated one at a time and written with
+    ``bulk_insert_mappings`` in chunks of `chunk_size`. Each chunk is
+    committed on its own. The events are dictionaries:
+
+    * ``{'line': 3, 'error': '...'}`` for a record that failed validation,
+    * ``{'lines': [1, 1000], 'error': '...'}`` for a chunk the database
+      rejected, which is rolled back,
+    * ``{'line': 1000, 'imported': 998}`` after each committed chunk, and
+    * ``{'done': True, 'imported': ..., 'failed': ..., 'lines': ...}`` last.
+
+    With `upsert`, records carry their primary keys and existing rows are
+    updated in place instead of failing the chunk.
+
+    The resource's :class:`ImportPlan` is built before anything is read, so
+    a resource that cannot be imported in bulk raises :exc:`ValueError`
+    straight away.
+
+    """
+    plan = ImportPlan(resource, upsert=upsert)
+    chunk_size = chunk_size or resource.meta.import_chunk_size
+
+    return _import_events(plan, lines, session, chunk_size)
+
+
+def _import_events(plan, lines, session, chunk_size):
+    resource = plan.resource
+    model = resource.meta.model
+
+    imported = 0
+    failed = 0
+    line_number = 0
+    first_line = None
+    chunk = []
+
+    def flush(chunk, first, last):
+        try:
+            if plan.upsert:
+                upsert_mappings(session, model, chunk)
+            else:
+                session.bulk_insert_mappings(model, chunk)
+            session.commit()
+        except SQLAlchemyError as e:
+            session.rollback()
+            error = unicode(e.orig if hasattr(e, 'orig') else e)
+            log.warning(u'bulk import of %s lines %d-%d failed: %s', resource.meta.name, first, last, error)
+            return {'lines': [first, last], 'error': error}
+
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+
+        if not line:
+            continue
+
+        try:
+            mapping = plan.validate(json.loads(line))
+        except ValueError as e:
+            failed += 1
+            yield {'line': line_number, 'error': unicode(e)}
+            continue
+
+        if first_line is None:
+            first_line = line_number
+
+        chunk.append(mapping)
+
+        if len(chunk) >= chunk_size:
+            error = flush(chunk, first_line, line_number)
+            if error:
+                failed += len(chunk)
+                yield error
+            else:
+                imported += len(chunk)
+                yield {'line': line_number, 'imported': imported}
+
+            chunk = []
+            first_line = None
+
+    if chunk:
+        error = flush(chunk, first_line, line_number)
+        if error:
+            failed += len(chunk)
+            yield error
+        else:
+            imported += len(chunk)
+            yield {'line': line_number, 'imported': imported}
+
+    yield {'done': True, 'imported': imported, 'failed': failed, 'lines': line_number}
@@ -0,0 +1,159 @@
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+
+class FragmentCache(object):
+
+    """A bounded LRU of serialized object fragments.
+
+    Entries are keyed by resource and primary key and tagged with the value of
+    the resource's ``meta.version_column`` (if any), so a row whose version has
+    moved on is treated as a miss. Entries are also dropped whenever the ORM
+    flushes an update or delete for a watched model, and again when that
+    session commits or rolls back, so a fragment built from uncommitted
+    values in between does not outlive the transaction.
+
+    Only the plain fields of a resource are cached; relationships are encoded
+    by their own resource, which may use a cache of its own.
+
+    Changes made with ``query.update()``, ``query.delete()`` or Core
+    statements do not emit mapper events and are not seen by the cache.
+
+    """
+
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._identities = {}
+        self._stats = {}
+        self._watched = set()
+        self._lock = threading.Lock()
+
+    def watch(self, model):
+        """Invalidate entries when instances of `model` are updated or deleted."""
+
+        if model in self._watched:
+            return
+
+        if not self._watched:
+            event.listen(Session, 'after_commit', self._invalidate_flushed)
+            event.listen(Session, 'after_rollback', self._invalidate_flushed)
+
+        event.listen(model, 'after_update', self._invalidate_target, propagate=True)
+        event.listen(model, 'after_delete', self._invalidate_target, propagate=True)
+
+        self._watched.add(model)
+
+    def fetch(self, resource, obj, build):
+        """Return a copy of the cached fragment for `obj`, building it with
+        ``build(resource, obj)`` on a miss."""
+
+        state = inspect(obj)
+
+        if state.identity is None:
+            return build(resource, obj)
+
+        identity = (state.mapper.base_mapper.class_, state.identity)
+        key = (resource, state.identity)
+
+        version_column = resource.meta.version_column
+        version = getattr(obj, version_column) if version_column else None
+
+        stats = self._resource_stats(resource)
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and entry[0] == version:
+                self._entries[key] = self._entries.pop(key)
+                stats['hits'] += 1
+                return dict(entry[1])
+
+            stats['misses'] += 1
+
+        fragment = build(resource, obj)
+
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (version, fragment, identity)
+            self._identities.setdefault(identity, set()).add(key)
+
+            while len(self._entries) > self.max_size:
+                evicted, (_, _, evicted_identity) = self._entries.popitem(last=False)
+                self._forget(evicted, evicted_identity)
+                self._resource_stats(evicted[0])['evictions'] += 1
+
+        return dict(fragment)
+
+    def invalidate(self, model, pk):
+        """Drop every entry for the row of `model` identified by `pk`."""
+
+        if not isinstance(pk, tuple):
+            pk = (pk,)
+
+        self._invalidate((inspect(model).base_mapper.class_, pk))
+
+    def clear(self):
+        """Drop every entry and reset the statistics."""
+
+        with self._lock:
+            self._entries.clear()
+            self._identities.clear()
+            self._stats.clear()
+
+    def stats(self, resource=None):
+        """Return hit/miss counters for `resource`, or for every resource
+        keyed by its name."""
+
+        if resource is not None:
+            return dict(self._resource_stats(resource))
+
+        return dict((resource.meta.name, dict(stats))
+                    for resource, stats in self._stats.items())
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _resource_stats(self, resource):
+        stats = self._stats.get(resource)
+
+        if stats is None:
+            stats = self._stats.setdefault(resource, {
+                'hits': 0,
+                'misses': 0,
+                'evictions': 0,
+                'invalidations': 0,
+            })
+
+        return stats
+
+    def _forget(self, key, identity):
+        keys = self._identities.get(identity)
+
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._identities[identity]
+
+    def _invalidate_target(self, mapper, connection, target):
+        state = inspect(target)
+
+        if state.identity is not None:
+            identity = (mapper.base_mapper.class_, state.identity)
+            self._invalidate(identity)
+
+            if state.session is not None:
+                state.session.info.setdefault(self, set()).add(identity)
+
+    def _invalidate_flushed(self, session):
+        for identity in session.info.pop(self, ()):
+            self._invalidate(identity)
+
+    def _invalidate(self, identity):
+        with self._lock:
+            for key in self._identities.pop(identity, ()):
+                if self._entries.pop(key, None) is not None:
+                    self._resource_stats(key[0])['invalidations'] += 1
@@ -0,0 +1,66 @@
+import keyword
+import re
+
+from .fields import RAW_FROM_OBJ, UNCONDITIONAL_FIELD_READ, applies_format_value
+
+IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def _attribute(name):
+    if IDENTIFIER.match(name) and not keyword.iskeyword(name):
+        return 'obj.%s' % name
+
+    return 'getattr(obj, %r)' % name
+
+
+def compile_serializer(resource, relationships=True):
+    """Generate a function which serializes an object of `resource` to a
+    dict, with the same result as :meth:`ModelTransformer.serialize_one`
+    minus the resource level authorization check.
+
+    Fields which read their attribute unconditionally are inlined as
+    attribute lookups, with ``format_value`` applied where the field's
+    ``from_obj`` applies it. Any other field, and every relationship, is called through
+    its own ``from_obj``/``encode``.
+
+    The generated source is kept on the function as ``source``.
+
+    """
+    namespace = {}
+    items = []
+
+    for index, (key, field) in enumerate(resource._field_plan()):
+        field_cls = type(field)
+
+        if field_cls.from_obj.__func__ in RAW_FROM_OBJ and field.authorization in UNCONDITIONAL_FIELD_READ:
+            expression = _attribute(field.name)
+
+            if applies_format_value(field_cls):
+                formatter = '_format_%d' % index
+                namespace[formatter] = field_cls.format_value
+                expression = '%s(%s)' % (formatter, expression)
+        else:
+            name = '_field_%d' % index
+            namespace[name] = field
+            expression = '%s.from_obj(obj)' % name
+
+        items.append('%r: %s' % (key, expression))
+
+    if relationships:
+        ordered = sorted(resource._relationships(), key=lambda item: item[1].creation_order)
+
+        for index, (key, relationship) in enumerate(ordered):
+            name = '_relationship_%d' % index
+            namespace[name] = relationship
+            items.append('%r: %s.encode(obj)' % (key, name))
+
+    body = ''.join('        %s,\n' % item for item in items)
+    source = 'def serialize(obj):\n    return {\n%s    }\n' % body
+
+    code = compile(source, '<%s serializer>' % resource.__name__, 'exec')
+    exec(code, namespace)
+
+    serialize = namespace['serialize']
+    serialize.source = source
+
+    return serialize
@@ -0,0 +1,239 @@
+import collections
+import functools
+import logging
+import sys
+import threading
+from contextlib import contextmanager
+
+from flask import request
+from sqlalchemy import event
+
+from .fields import Field
+from .instrumentation import resource_engines
+
+
+log = logging.getLogger(__name__)
+
+_local = threading.local()
+_engines = set()
+_engines_lock = threading.Lock()
+
+#: Field methods whose statements are attributed to the field.
+FIELD_METHODS = frozenset(['from_obj', 'to_obj', 'encode', 'decode'])
+
+
+class Statement(collections.namedtuple('Statement', 'statement parameters source')):
+
+    """A statement executed while recording, and the field which caused it
+    as ``Resource.field``, or ``None``."""
+
+    __slots__ = ()
+
+
+class Repetition(collections.namedtuple('Repetition', 'statement count source')):
+
+    """A statement shape executed `count` times for `source`."""
+
+    __slots__ = ()
+
+    def __str__(self):
+        return '%d queries from %s: %s' % (self.count, self.source or 'an unknown source',
+                                           ' '.join(self.statement.split()))
+
+
+class NPlusOneQueries(Exception):
+
+    """Raised by a :class:`QueryDetector` with ``raise_errors`` when a request
+    repeats a statement."""
+
+    def __init__(self, label, repetitions):
+        self.label = label
+        self.repetitions = repetitions
+
+        message = '%s repeated statements:\n%s' % (label, '\n'.join(str(r) for r in repetitions))
+        super(NPlusOneQueries, self).__init__(message)
+
+
+class QueryRecorder(object):
+
+    """The statements executed on watched engines by this thread while the
+    recorder is active. See :func:`recording`."""
+
+    def __init__(self, attribute=True):
+        self.attribute = attribute
+        self.statements = []
+
+    def __len__(self):
+        return len(self.statements)
+
+    def repetitions(self, threshold=2):
+        """The statements executed at least `threshold` times with the same
+        SQL for the same source, most repeated first."""
+
+        counts = collections.Counter((statement.statement, statement.source)
+                                     for statement in self.statements)
+
+        repeated = [Repetition(statement, count, source)
+                    for (statement, source), count in counts.items() if count >= threshold]
+        repeated.sort(key=lambda repetition: (-repetition.count, repetition.source, repetition.statement))
+
+        return repeated
+
+
+def watch(engine):
+    """Record the statements executed on `engine` while a recorder is
+    active."""
+
+    with _engines_lock:
+        if engine in _engines:
+            return
+        _engines.add(engine)
+
+    event.listen(engine, 'before_cursor_execute', _record_statement)
+
+
+@contextmanager
+def recording(attribute=True):
+    """Record the statements this thread executes on watched engines in the
+    enclosed block. Recorders nest; each sees every statement run inside it.
+
+    With `attribute`, each statement is traced back to the field being
+    encoded or decoded when it ran, which walks the stack once per
+    statement.
+
+    """
+    recorder = QueryRecorder(attribute)
+    recorders = getattr(_local, 'recorders', None)
+
+    if recorders is None:
+        recorders = _local.recorders = []
+
+    recorders.append(recorder)
+    try:
+        yield recorder
+    finally:
+        recorders.remove(recorder)
+
+
+def _source(frame):
+    """``Resource.field`` for the innermost field method on the stack of
+    `frame`, with the resource taken from the ``serialize_one`` call that
+    encodes it."""
+
+    field = None
+
+    while frame is not None:
+        name = frame.f_code.co_name
+
+        if field is None:
+            if name in FIELD_METHODS:
+                candidate = frame.f_locals.get('self')
+
+                if isinstance(candidate, Field):
+                    field = candidate
+        elif name == 'serialize_one':
+            resource = frame.f_locals.get('resource')
+
+            if resource is not None:
+                if not isinstance(resource, type):
+                    resource = type(resource)
+
+                return '%s.%s' % (resource.__name__, field.key)
+
+        frame = frame.f_back
+
+    if field is None:
+        return None
+
+    return '%s.%s' % (field.model.__name__ if field.model is not None else '?', field.key)
+
+
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    recorders = getattr(_local, 'recorders', None)
+
+    if not recorders:
+        return
+
+    source = None
+
+    if any(recorder.attribute for recorder in recorders):
+        # Field.from_obj reads relationships with getattr(obj, name, None),
+        # which would turn any error raised here into a missing value.
+        try:
+            source = _source(sys._getframe(1))
+        except Exception:
+            log.debug('cannot attribute %s', statement, exc_info=True)
+
+    record = Statement(statement, parameters, source)
+
+    for recorder in recorders:
+        recorder.statements.append(record if recorder.attribute else record._replace(source=None))
+
+
+class QueryDetector(object):
+
+    """Finds N+1 queries in the requests to the resources which set it as
+    their ``meta.query_detector``, or in any block run under :meth:`detect`.
+
+    A statement executed `threshold` or more times with the same SQL for the
+    same field is reported as a :class:`Repetition`. Repetitions are logged
+    at `level`, kept in :attr:`detected` and, with `raise_errors`, raised as
+    :exc:`NPlusOneQueries`. Statements are recorded on the engines passed to
+    :meth:`watch`, and on the engine of each resource it instruments.
+
+    Recording walks the stack for every statement, so this is meant for
+    development and tests, not production.
+
+    """
+
+    def __init__(self, threshold=2, raise_errors=False, level=logging.WARNING):
+        self.threshold = threshold
+        self.raise_errors = raise_errors
+        self.level = level
+        self.detected = []
+
+    def watch(self, engine):
+        watch(engine)
+
+    @contextmanager
+    def detect(self, label='query'):
+        """Look for repeated statements in the enclosed block."""
+
+        with recording() as recorder:
+            yield recorder
+
+        repetitions = recorder.repetitions(self.threshold)
+
+        if not repetitions:
+            return
+
+        self.detected.append((label, repetitions))
+
+        for repetition in repetitions:
+            log.log(self.level, '%s: %s', label, repetition)
+
+        if self.raise_errors:
+            raise NPlusOneQueries(label, repetitions)
+
+    def instrument(self, resource, endpoint, view):
+        """Wrap the Flask view function `view` of `resource`."""
+
+        watched = []
+
+        @functools.wraps(view)
+        def detected(*args, **kwargs):
+            if not watched:
+                for engine in resource_engines(resource):
+                    self.watch(engine)
+
+                watched.append(True)
+
+            label = '%s %s %s' % (request.method, resource.meta.name, endpoint)
+
+            with self.detect(label):
+                return view(*args, **kwargs)
+
+        return detected
+
+    def clear(self):
+        del self.detected[:]
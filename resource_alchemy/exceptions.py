@@ -18,7 +18,12 @@ class NotAuthorized(BaseException):
     status_code = 401
 
 
+class InvalidFilter(BaseException):
+    status_code = 400
+
+
 EXCEPTIONS = (
     BaseException,
-    NotAuthorized
+    NotAuthorized,
+    InvalidFilter
 )
@@ -0,0 +1,231 @@
+import collections
+import csv
+import multiprocessing
+from cStringIO import StringIO
+
+try:
+    import ujson as json
+except ImportError:  # pragma: no cover
+    import json
+
+from .authorization import FullAuthorization, ReadOnlyAuthorization
+from .fields import RAW_FROM_OBJ, UNCONDITIONAL_FIELD_READ, applies_format_value
+
+
+#: Authorizations which allow every object to be read.
+UNCONDITIONAL_READ = (None, FullAuthorization, ReadOnlyAuthorization)
+
+
+class ExportPlan(object):
+
+    """The columns to select for a resource and how to format each of them,
+    so its rows can be serialized without ORM instances.
+
+    Raises :exc:`ValueError` if the resource checks authorization per object
+    or per field, or declares a field with its own ``from_obj``.
+
+    """
+
+    def __init__(self, resource):
+        if resource.meta.authorization not in UNCONDITIONAL_READ:
+            raise ValueError('%s checks read authorization per object and cannot be '
+                             'exported from raw rows' % resource.meta.name)
+
+        keys = []
+        columns = []
+        formatters = []
+
+        for key, field in resource._field_plan():
+            field_cls = type(field)
+
+            if field_cls.from_obj.__func__ not in RAW_FROM_OBJ:
+                raise ValueError("'%s' overrides from_obj and cannot be exported from raw rows" % key)
+
+            if field.authorization not in UNCONDITIONAL_FIELD_READ:
+                raise ValueError("'%s' checks read authorization and cannot be exported "
+                                 "from raw rows" % key)
+
+            keys.append(key)
+            columns.append(getattr(resource.meta.model, field.name))
+
+            if applies_format_value(field_cls):
+                formatters.append(field_cls)
+            else:
+                formatters.append(None)
+
+        self.keys = tuple(keys)
+        self.columns = tuple(columns)
+        self.formatters = tuple(formatters)
+
+
+def format_rows(formatters, rows):
+    """Apply each column's ``format_value`` to a chunk of column tuples."""
+
+    formatted = [(index, formatter) for index, formatter in enumerate(formatters) if formatter is not None]
+
+    if not formatted:
+        return rows
+
+    result = []
+    for row in rows:
+        row = list(row)
+        for index, formatter in formatted:
+            row[index] = formatter.format_value(row[index])
+        result.append(row)
+
+    return result
+
+
+def encode_ndjson(keys, rows):
+    dumps = json.dumps
+
+    lines = [dumps(dict(zip(keys, row))) for row in rows]
+    lines.append('')
+    return '\n'.join(lines)
+
+
+def encode_rows(task):
+    """Serialize a chunk of column tuples to newline delimited JSON.
+
+    `task` is a ``(keys, formatters, rows)`` tuple so it can be shipped to a
+    worker process as is.
+
+    """
+    keys, formatters, rows = task
+    return encode_ndjson(keys, format_rows(formatters, rows))
+
+
+def iter_row_chunks(plan, query, chunk_size):
+    """Yield lists of at most `chunk_size` column tuples for `query`, read
+    with a server-side cursor where the driver supports one."""
+
+    statement = query.with_entities(*plan.columns).statement
+    result = query.session.execute(statement.execution_options(stream_results=True))
+
+    try:
+        while True:
+            rows = result.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield [tuple(row) for row in rows]
+    finally:
+        result.close()
+
+
+def export_ndjson(resource, query, chunk_size=None, processes=None):
+    """Yield the rows of `query` as chunks of newline delimited JSON, in query
+    order.
+
+    With `processes` greater than one, chunks are serialized in a pool of
+    worker processes. At most two chunks per process are in flight at any
+    time, so memory stays bounded however large the export is.
+
+    """
+    plan = ExportPlan(resource)
+    chunk_size = chunk_size or resource.meta.export_chunk_size
+
+    if processes is None:
+        processes = resource.meta.export_processes
+
+    if not processes or processes < 2:
+        for rows in iter_row_chunks(plan, query, chunk_size):
+            yield encode_rows((plan.keys, plan.formatters, rows))
+        return
+
+    # Fork the workers before the query opens a cursor.
+    pool = multiprocessing.Pool(processes)
+
+    try:
+        pending = collections.deque()
+
+        for rows in iter_row_chunks(plan, query, chunk_size):
+            pending.append(pool.apply_async(encode_rows, ((plan.keys, plan.formatters, rows),)))
+
+            if len(pending) >= processes * 2:
+                yield pending.popleft().get()
+
+        while pending:
+            yield pending.popleft().get()
+
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def _object_chunks(resource, query, chunk_size):
+    fields = [field for _, field in resource._field_plan()]
+    authorization = resource.meta.authorization
+
+    chunk = []
+    for obj in query.yield_per(chunk_size):
+        if authorization and not authorization.can_read(obj):
+            continue
+
+        chunk.append([field.from_obj(obj) for field in fields])
+
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+def _raw_chunks(plan, query, chunk_size):
+    for rows in iter_row_chunks(plan, query, chunk_size):
+        yield format_rows(plan.formatters, rows)
+
+
+def iter_records(resource, query, chunk_size=None):
+    """Return the keys of the resource's fields and an iterator over chunks
+    of rows of their serialized values, in the order of the keys.
+
+    Resources that can be exported from raw column values are. Anything else
+    is serialized from ORM instances loaded with ``yield_per``, and objects
+    which the resource's authorization does not allow to be read are left
+    out. Either way, memory use does not grow with the size of the result.
+
+    """
+    chunk_size = chunk_size or resource.meta.export_chunk_size
+
+    try:
+        plan = ExportPlan(resource)
+    except ValueError:
+        keys = tuple(key for key, _ in resource._field_plan())
+        return keys, _object_chunks(resource, query, chunk_size)
+
+    return plan.keys, _raw_chunks(plan, query, chunk_size)
+
+
+def ndjson_stream(keys, chunks):
+    for rows in chunks:
+        yield encode_ndjson(keys, rows)
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    elif isinstance(value, unicode):
+        return value.encode('utf-8')
+
+    return value
+
+
+def csv_stream(keys, chunks):
+    """Yield a header row of `keys` followed by the rows of `chunks` as CSV,
+    one chunk at a time."""
+
+    buf = StringIO()
+    writer = csv.writer(buf)
+
+    writer.writerow(keys)
+
+    for rows in chunks:
+        writer.writerows([_csv_value(value) for value in row] for row in rows)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+
+    if buf.tell():
+        yield buf.getvalue()
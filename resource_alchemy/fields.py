@@ -1,14 +1,18 @@
 import dateutil.parser
+import itertools
 import logging
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 
 from sqlalchemy.ext.hybrid import hybrid_method
 
 from .exceptions import NotAuthorized
+from .registry import registry
 
 
 log = logging.getLogger(__name__)
 
+_creation_counter = itertools.count()
+
 
 def get_json_schema_type(column):
     field_type = None
@@ -53,6 +57,21 @@ def isalambda(v):
     return isinstance(v, type(lambda: None)) and v.__name__ == '<lambda>'
 
 
+def resolve_resource(field):
+    """The resource of a relationship `field`. A forward reference given as
+    a lambda is called once, and its result kept in place of the lambda."""
+
+    resource = field._resource
+
+    if isalambda(resource):
+        resource = resource()
+        # Resolving the reference does not change the field, so this
+        # bypasses the immutability of bound fields.
+        object.__setattr__(field, '_resource', resource)
+
+    return resource
+
+
 class ReadOnlyFieldAuthorization(object):
 
     @hybrid_method
@@ -77,11 +96,26 @@ class FullFieldAuthorization(object):
 
 class Field(object):
 
-    def __init__(self, name=None, key=None, read_only=True, required=False, authorization=None, **kwargs):
+    """A serialized attribute of a resource.
+
+    Fields are slotted, and become immutable once :meth:`bind` attaches them
+    to a resource.
+
+    """
+
+    __slots__ = ('name', 'key', 'model', 'read_only', 'required', 'searchable', 'options',
+                 'authorization', 'creation_order', '_bound')
+
+    def __init__(self, name=None, key=None, read_only=True, required=False, authorization=None,
+                 searchable=False, **kwargs):
         self.name = name
+        self.key = key
+        self.model = None
         self.read_only = read_only
         self.required = required
+        self.searchable = searchable
         self.options = kwargs
+        self.creation_order = next(_creation_counter)
 
         if read_only:
             self.authorization = ReadOnlyFieldAuthorization
@@ -90,6 +124,34 @@ class Field(object):
         else:
             self.authorization = FullFieldAuthorization
 
+    def __setattr__(self, attr, value):
+        if getattr(self, '_bound', False):
+            raise AttributeError("Cannot set '%s' on %s field '%s', fields are immutable once bound to a "
+                                 "resource" % (attr, type(self).__name__, self.key))
+
+        object.__setattr__(self, attr, value)
+
+    def bind(self, key, model=None):
+        """Attach the field to a resource under `key` and freeze it."""
+
+        self.key = key
+        self.name = self.name or key
+
+        if model is not None:
+            self.model = model
+
+        self._bound = True
+
+    @staticmethod
+    def format_value(value):
+        """Convert a column value to something we can serialize to JSON."""
+        return value
+
+    @staticmethod
+    def parse_value(value):
+        """Convert a JSON value to what the column expects."""
+        return value
+
     def encode(self, *args, **kwargs):
         return self.from_obj(*args, **kwargs)
 
@@ -136,54 +198,96 @@ class Field(object):
 
 class DateTimeField(Field):
 
+    __slots__ = ()
+
+    @staticmethod
+    def format_value(value):
+        if value is not None:
+            value = value.isoformat()
+
+        return value
+
     def from_obj(self, obj, **kwargs):
 
         value = super(DateTimeField, self).from_obj(obj, **kwargs)
 
+        return self.format_value(value)
+
+    @staticmethod
+    def parse_value(value):
         if value is not None:
-            value = value.isoformat()
+            value = dateutil.parser.parse(value)
 
         return value
 
     def to_obj(self, obj, value, **obj_data):
 
-        if value is not None:
-            value = dateutil.parser.parse(value)
+        value = self.parse_value(value)
 
         return super(DateTimeField, self).to_obj(obj, value, **obj_data)
 
 
 class IntervalField(Field):
 
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         super(IntervalField, self).__init__(*args, **kwargs)
 
-    def to_obj(self, obj, value, **obj_data):
+    @staticmethod
+    def parse_value(value):
         if value is not None:
-            value = datetime.timedelta(seconds=value)
+            value = timedelta(seconds=value)
+
+        return value
+
+    def to_obj(self, obj, value, **obj_data):
+        value = self.parse_value(value)
 
         return super(IntervalField, self).to_obj(obj, value, **obj_data)
 
-    def from_obj(self, obj, **kwargs):
-        value = super(IntervalField, self).from_obj(obj, **kwargs)
+    @staticmethod
+    def format_value(value):
         if value is not None:
             return value.total_seconds()
         else:
             return value
 
+    def from_obj(self, obj, **kwargs):
+        value = super(IntervalField, self).from_obj(obj, **kwargs)
+        return self.format_value(value)
+
+
+#: ``from_obj`` implementations that only read the attribute and apply
+#: ``format_value``.
+RAW_FROM_OBJ = tuple(field_cls.from_obj.__func__ for field_cls in (Field, DateTimeField, IntervalField))
+
+#: The ``RAW_FROM_OBJ`` implementations which call ``format_value``.
+#: ``Field.from_obj`` returns the attribute as it is.
+FORMATTING_FROM_OBJ = tuple(field_cls.from_obj.__func__ for field_cls in (DateTimeField, IntervalField))
+
+
+def applies_format_value(field_cls):
+    """Whether ``from_obj`` of `field_cls`, one of :data:`RAW_FROM_OBJ`,
+    passes the attribute through ``format_value``."""
+
+    return field_cls.from_obj.__func__ in FORMATTING_FROM_OBJ
+
+#: Field authorizations which allow every value to be read.
+UNCONDITIONAL_FIELD_READ = (ReadOnlyFieldAuthorization, FullFieldAuthorization)
+
 
 class Relationship(Field):
 
+    __slots__ = ('_resource',)
+
     def __init__(self, resource, **kwargs):
         self._resource = resource
         super(Relationship, self).__init__(**kwargs)
 
     @property
     def resource(self):
-        if isalambda(self._resource):
-            return self._resource()
-        else:
-            return self._resource
+        return resolve_resource(self)
 
     def json_schema(self):
         schema = {
@@ -226,21 +330,20 @@ class Relationship(Field):
         related_obj = getattr(obj, self.name, None)
 
         if related_obj:
-            return self.resource.serialize(related_obj)
+            return registry.polymorphic(self.resource, type(related_obj)).serialize(related_obj)
 
 
 class ListRelationship(Field):
 
+    __slots__ = ('_resource',)
+
     def __init__(self, resource, **kwargs):
         self._resource = resource
         super(ListRelationship, self).__init__(**kwargs)
 
     @property
     def resource(self):
-        if isalambda(self._resource):
-            return self._resource()
-        else:
-            return self._resource
+        return resolve_resource(self)
 
     def json_schema(self):
         schema = {
@@ -270,7 +373,9 @@ class ListRelationship(Field):
         related_objs = getattr(obj, self.name, None)
 
         if related_objs:
-            return [self.resource.serialize(related_obj)
+            resource = self.resource
+            polymorphic = registry.polymorphic
+            return [polymorphic(resource, type(related_obj)).serialize(related_obj)
                     for related_obj in related_objs]
         else:
             return []
@@ -295,6 +400,8 @@ class ListRelationship(Field):
 
 class FilteredListRelationship(ListRelationship):
 
+    __slots__ = ('list_filter',)
+
     def __init__(self, resource, list_filter=None, **kwargs):
         self.list_filter = list_filter
         super(FilteredListRelationship, self).__init__(resource, **kwargs)
@@ -310,7 +417,9 @@ class FilteredListRelationship(ListRelationship):
             if self.list_filter:
                 related_objs = filter(self.list_filter, related_objs)
 
-            return [self.resource.serialize(related_obj)
+            resource = self.resource
+            polymorphic = registry.polymorphic
+            return [polymorphic(resource, type(related_obj)).serialize(related_obj)
                     for related_obj in related_objs]
         else:
             return []
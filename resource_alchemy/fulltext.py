@@ -0,0 +1,169 @@
+import logging
+
+from sqlalchemy import inspect
+from sqlalchemy.exc import CompileError
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import literal
+from sqlalchemy.sql.expression import ColumnElement
+from sqlalchemy.types import Boolean, Float
+
+
+log = logging.getLogger(__name__)
+
+#: The PostgreSQL text search configuration used for indexes and queries.
+TEXT_SEARCH_CONFIG = 'english'
+
+
+def fts5_query(text):
+    """Turn user input into an FTS5 query matching rows which contain every
+    word, with FTS5's own query syntax quoted away."""
+
+    terms = text.split()
+    return ' '.join('"%s"' % term.replace('"', '""') for term in terms) or '""'
+
+
+def search_table_name(table):
+    return '%s_fts' % table.name
+
+
+def _base_table(column):
+    table = column.table
+    return getattr(table, 'element', table)
+
+
+class FullTextMatch(ColumnElement):
+
+    """True when `column` contains every word of `text`, according to the
+    column's full-text index. See :func:`create_search_index`."""
+
+    type = Boolean()
+
+    def __init__(self, column, text):
+        self.column = column.__clause_element__() if hasattr(column, '__clause_element__') else column
+        self.text = text
+
+
+class FullTextRank(ColumnElement):
+
+    """How well `column` matches `text`, lower is better, for ordering the
+    results of a :class:`FullTextMatch`."""
+
+    type = Float()
+
+    def __init__(self, column, text):
+        self.column = column.__clause_element__() if hasattr(column, '__clause_element__') else column
+        self.text = text
+
+
+@compiles(FullTextMatch)
+@compiles(FullTextRank)
+def _compile_unsupported(element, compiler, **kw):
+    raise CompileError('Full-text search is not supported on %s' % compiler.dialect.name)
+
+
+def _sqlite_parts(element, compiler, **kw):
+    table = _base_table(element.column)
+    fts = compiler.preparer.quote(search_table_name(table))
+    rowid = compiler.process(list(element.column.table.primary_key)[0], **kw)
+    column = '%s.%s' % (fts, compiler.preparer.quote(element.column.name))
+    text = compiler.process(literal(fts5_query(element.text)), **kw)
+    return fts, rowid, column, text
+
+
+@compiles(FullTextMatch, 'sqlite')
+def _compile_sqlite_match(element, compiler, **kw):
+    fts, rowid, column, text = _sqlite_parts(element, compiler, **kw)
+    return '%s IN (SELECT rowid FROM %s WHERE %s MATCH %s)' % (rowid, fts, column, text)
+
+
+@compiles(FullTextRank, 'sqlite')
+def _compile_sqlite_rank(element, compiler, **kw):
+    fts, rowid, column, text = _sqlite_parts(element, compiler, **kw)
+    return 'coalesce((SELECT bm25(%s) FROM %s WHERE %s.rowid = %s AND %s MATCH %s), 0)' % (
+        fts, fts, fts, rowid, column, text)
+
+
+def _postgresql_parts(element, compiler, **kw):
+    config = compiler.process(literal(TEXT_SEARCH_CONFIG), literal_binds=True)
+    document = "to_tsvector(%s, coalesce(%s, ''))" % (config, compiler.process(element.column, **kw))
+    query = 'plainto_tsquery(%s, %s)' % (config, compiler.process(literal(element.text), **kw))
+    return document, query
+
+
+@compiles(FullTextMatch, 'postgresql')
+def _compile_postgresql_match(element, compiler, **kw):
+    return '%s @@ %s' % _postgresql_parts(element, compiler, **kw)
+
+
+@compiles(FullTextRank, 'postgresql')
+def _compile_postgresql_rank(element, compiler, **kw):
+    return '-ts_rank(%s, %s)' % _postgresql_parts(element, compiler, **kw)
+
+
+def searchable_columns(resource):
+    """The columns of the fields of `resource` declared ``searchable``."""
+
+    mapper = inspect(resource.meta.model)
+    return [mapper.columns[field.name] for _, field in resource._field_plan() if field.searchable]
+
+
+def search_index_ddl(dialect_name, resource):
+    """Returns the statements which create the full-text index for the
+    searchable fields of `resource` on `dialect_name`.
+
+    On SQLite this is an external content FTS5 table named ``<table>_fts``,
+    kept up to date by triggers and filled from the existing rows. The model
+    needs a single integer primary key, which FTS5 uses as its rowid. On
+    PostgreSQL it is one GIN index over ``to_tsvector`` per column.
+
+    """
+    columns = searchable_columns(resource)
+
+    if not columns:
+        raise ValueError('%s has no searchable fields' % resource.meta.name)
+
+    table = inspect(resource.meta.model).local_table
+
+    if dialect_name == 'postgresql':
+        return ["CREATE INDEX IF NOT EXISTS ix_{table}_{column}_fts ON {table} USING GIN "
+                "(to_tsvector('{config}', coalesce({column}, '')))".format(
+                    table=table.name, column=column.name, config=TEXT_SEARCH_CONFIG)
+                for column in columns]
+
+    if dialect_name != 'sqlite':
+        raise ValueError('Full-text search is not supported on %s' % dialect_name)
+
+    primary_key = list(table.primary_key.columns)
+
+    if len(primary_key) != 1:
+        raise ValueError('%s needs a single integer primary key for full-text search' % resource.meta.name)
+
+    names = ', '.join(column.name for column in columns)
+    values = lambda row: ', '.join('%s.%s' % (row, column.name) for column in columns)
+    context = dict(table=table.name, fts=search_table_name(table), pk=primary_key[0].name,
+                   names=names, new=values('new'), old=values('old'))
+
+    return [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({names}, content='{table}', "
+        "content_rowid='{pk}')".format(**context),
+        "CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        "INSERT INTO {fts}(rowid, {names}) VALUES (new.{pk}, {new}); END".format(**context),
+        "CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        "INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.{pk}, {old}); END".format(**context),
+        "CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table} BEGIN "
+        "INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.{pk}, {old}); "
+        "INSERT INTO {fts}(rowid, {names}) VALUES (new.{pk}, {new}); END".format(**context),
+        "INSERT INTO {fts}({fts}) VALUES ('rebuild')".format(**context),
+    ]
+
+
+def create_search_index(bind, resource):
+    """Create the full-text index for the searchable fields of `resource`
+    with `bind`, an engine or connection. See :func:`search_index_ddl`."""
+
+    statements = search_index_ddl(bind.dialect.name, resource)
+
+    log.info('creating full-text index for %s', resource.meta.name)
+
+    for statement in statements:
+        bind.execute(statement)
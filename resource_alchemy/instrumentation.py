@@ -0,0 +1,288 @@
+import collections
+import cProfile
+import functools
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import Response, current_app, request
+from sqlalchemy import event, inspect
+
+
+log = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+def current_metrics():
+    """The :class:`RequestMetrics` of the instrumented request running on
+    this thread, or ``None``."""
+
+    return getattr(_local, 'metrics', None)
+
+
+@contextmanager
+def phase(name):
+    """Time the enclosed block as `name` if the current request is
+    instrumented."""
+
+    metrics = current_metrics()
+
+    if metrics is None:
+        yield
+        return
+
+    start = time.time()
+    try:
+        yield
+    finally:
+        metrics.add_time(name, time.time() - start)
+
+
+def resource_engines(resource):
+    """The engines `resource` may run statements on: the primary and the
+    replicas of its session provider, or else the engine behind the session
+    of its model. Empty if none can be found."""
+
+    provider = getattr(resource.meta, 'session_provider', None)
+
+    if provider is not None and provider.primary is not None:
+        return [provider.primary] + list(provider.replicas)
+
+    try:
+        session = resource.meta.model.query.session
+        engine = session.get_bind(inspect(resource.meta.model))
+    except Exception:
+        log.debug('cannot find the engine of %s', resource.meta.name, exc_info=True)
+        return []
+
+    return [getattr(engine, 'engine', engine)]
+
+
+class RequestMetrics(object):
+
+    """Phase timings and counters for one request to one resource.
+
+    Phases may nest: ``authorize`` is part of ``serialize``. Counters are
+    ``sql`` (statements executed), ``objects`` (objects serialized) and
+    ``relationships`` (relationship fields serialized).
+
+    """
+
+    def __init__(self, resource, endpoint, method):
+        self.resource = resource
+        self.endpoint = endpoint
+        self.method = method
+        self.phases = collections.OrderedDict()
+        self.counters = collections.Counter()
+        self.started = time.time()
+        self.duration = None
+
+    def add_time(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def finish(self):
+        self.duration = time.time() - self.started
+
+    def server_timing(self):
+        """The value of a ``Server-Timing`` header for this request."""
+
+        metrics = ['%s;dur=%.2f' % (name, seconds * 1000) for name, seconds in self.phases.items()]
+
+        if self.duration is not None:
+            metrics.append('total;dur=%.2f' % (self.duration * 1000))
+
+        metrics.extend('%s;desc="%d"' % (name, count) for name, count in sorted(self.counters.items()))
+
+        return ', '.join(metrics)
+
+
+class MetricsSink(object):
+
+    """Receives the :class:`RequestMetrics` of every instrumented request."""
+
+    def record(self, metrics):
+        raise NotImplementedError()
+
+
+class InMemoryMetrics(MetricsSink):
+
+    """Totals request metrics per resource, endpoint and method, and renders
+    them in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = {}
+
+    def record(self, metrics):
+        key = (metrics.resource, metrics.endpoint, metrics.method)
+
+        with self._lock:
+            totals = self._totals.get(key)
+
+            if totals is None:
+                totals = self._totals[key] = {'requests': 0, 'seconds': 0.0,
+                                              'phases': collections.Counter(),
+                                              'counters': collections.Counter()}
+
+            totals['requests'] += 1
+            totals['seconds'] += metrics.duration or 0.0
+            totals['phases'].update(metrics.phases)
+            totals['counters'].update(metrics.counters)
+
+    def snapshot(self):
+        """Returns ``{(resource, endpoint, method): totals}``, a copy."""
+
+        with self._lock:
+            return dict((key, {'requests': totals['requests'],
+                               'seconds': totals['seconds'],
+                               'phases': dict(totals['phases']),
+                               'counters': dict(totals['counters'])})
+                        for key, totals in self._totals.items())
+
+    def clear(self):
+        with self._lock:
+            self._totals.clear()
+
+    def prometheus(self):
+        """The totals in the Prometheus text exposition format."""
+
+        snapshot = sorted(self.snapshot().items())
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            lines.append('# HELP %s %s' % (name, help_text))
+            lines.append('# TYPE %s %s' % (name, kind))
+            for labels, value in samples:
+                label_text = ','.join('%s="%s"' % (key, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+                                      for key, value in labels)
+                lines.append('%s{%s} %s' % (name, label_text, value))
+
+        def labels(key, *extra):
+            resource, endpoint, method = key
+            return (('resource', resource), ('endpoint', endpoint), ('method', method)) + extra
+
+        family('resource_alchemy_requests_total', 'counter', 'Instrumented requests.',
+               [(labels(key), totals['requests']) for key, totals in snapshot])
+        family('resource_alchemy_request_seconds_total', 'counter', 'Time spent handling requests.',
+               [(labels(key), totals['seconds']) for key, totals in snapshot])
+        family('resource_alchemy_phase_seconds_total', 'counter', 'Time spent per request phase.',
+               [(labels(key, ('phase', name)), seconds) for key, totals in snapshot
+                for name, seconds in sorted(totals['phases'].items())])
+
+        for counter, help_text in (('sql', 'SQL statements executed.'),
+                                   ('objects', 'Objects serialized.'),
+                                   ('relationships', 'Relationship fields serialized.')):
+            family('resource_alchemy_%s_total' % counter, 'counter', help_text,
+                   [(labels(key), totals['counters'].get(counter, 0)) for key, totals in snapshot])
+
+        return '\n'.join(lines) + '\n'
+
+
+class Instrumentation(object):
+
+    """Measures requests to the resources which set it as their
+    ``meta.instrumentation``.
+
+    Each request records its phase timings and counters in a
+    :class:`RequestMetrics`, which is sent to `sink` (an
+    :class:`InMemoryMetrics` by default) and, with `server_timing`, returned
+    in a ``Server-Timing`` header. SQL statements are counted on the engines
+    passed to :meth:`watch`, and on the engine of each instrumented
+    resource's model. With `profile_dir`, every request is also run under
+    :mod:`cProfile` and its stats dumped to that directory.
+
+    """
+
+    def __init__(self, sink=None, server_timing=True, profile_dir=None):
+        self.sink = sink if sink is not None else InMemoryMetrics()
+        self.server_timing = server_timing
+        self.profile_dir = profile_dir
+        self._engines = set()
+        self._lock = threading.Lock()
+
+    def watch(self, engine):
+        """Count the statements executed on `engine`."""
+
+        with self._lock:
+            if engine in self._engines:
+                return
+            self._engines.add(engine)
+
+        event.listen(engine, 'before_cursor_execute', _count_statement)
+
+    def _watch_resource(self, resource):
+        for engine in resource_engines(resource):
+            self.watch(engine)
+
+    def instrument(self, resource, endpoint, view):
+        """Wrap the Flask view function `view` of `resource`."""
+
+        watched = []
+
+        @functools.wraps(view)
+        def instrumented(*args, **kwargs):
+            if not watched:
+                self._watch_resource(resource)
+                watched.append(True)
+
+            metrics = RequestMetrics(resource.meta.name, endpoint, request.method)
+            profiler = cProfile.Profile() if self.profile_dir else None
+
+            _local.metrics = metrics
+            try:
+                if profiler is not None:
+                    profiler.enable()
+                try:
+                    response = view(*args, **kwargs)
+                    with phase('render'):
+                        response = current_app.make_response(response)
+                finally:
+                    if profiler is not None:
+                        profiler.disable()
+            finally:
+                _local.metrics = None
+
+            metrics.finish()
+
+            if self.server_timing:
+                response.headers['Server-Timing'] = metrics.server_timing()
+
+            if profiler is not None:
+                self._dump_profile(profiler, metrics)
+
+            self.sink.record(metrics)
+
+            return response
+
+        return instrumented
+
+    def _dump_profile(self, profiler, metrics):
+        filename = '%s-%s-%s-%d.prof' % (metrics.resource, metrics.endpoint, metrics.method.lower(),
+                                         int(metrics.started * 1000000))
+        path = os.path.join(self.profile_dir, filename)
+
+        try:
+            profiler.dump_stats(path)
+        except (IOError, OSError):
+            log.warning('could not write profile %s', path, exc_info=True)
+
+    def register_metrics_route(self, app, rule='/metrics'):
+        """Serve the sink's totals in the Prometheus text format at `rule`."""
+
+        def metrics():
+            return Response(self.sink.prometheus(), mimetype='text/plain; version=0.0.4')
+
+        app.add_url_rule(rule, endpoint='resource_alchemy_metrics', view_func=metrics, methods=['GET'])
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    metrics = current_metrics()
+
+    if metrics is not None:
+        metrics.count('sql')
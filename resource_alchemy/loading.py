@@ -0,0 +1,184 @@
+import logging
+import threading
+from multiprocessing.pool import ThreadPool
+
+from sqlalchemy import inspect, tuple_
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.interfaces import ONETOMANY
+from sqlalchemy.pool import SingletonThreadPool, StaticPool
+
+from .fields import ListRelationship
+
+
+log = logging.getLogger(__name__)
+
+# Keep IN lists below SQLite's default limit on bound parameters.
+IN_CHUNK_SIZE = 500
+
+_pool = None
+_pool_size = 0
+_pool_lock = threading.Lock()
+
+
+def _map(func, values, size):
+    """``map`` on the shared thread pool, grown to at least `size` threads
+    first. A pool that is replaced is closed, and its threads exit once the
+    work already submitted to it has run."""
+
+    global _pool, _pool_size
+
+    retired = None
+
+    with _pool_lock:
+        if _pool is None or _pool_size < size:
+            retired = _pool
+            _pool = ThreadPool(size)
+            _pool_size = size
+
+            if retired is not None:
+                retired.close()
+
+        # Submitted under the lock, so no work reaches a closed pool.
+        result = _pool.map_async(func, values)
+
+    if retired is not None:
+        retired.join()
+
+    return result.get()
+
+
+def _chunks(values, size):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+class CollectionLoader(object):
+
+    """Loads one one-to-many collection for a batch of parents with a single
+    query per chunk of parent keys, then stitches the children back into the
+    parents by foreign key."""
+
+    def __init__(self, parent_mapper, prop):
+        self.prop = prop
+        self.child_mapper = prop.mapper
+
+        pairs = prop.local_remote_pairs
+        self.parent_keys = [parent_mapper.get_property_by_column(local).key for local, _ in pairs]
+        self.child_keys = [self.child_mapper.get_property_by_column(remote).key for _, remote in pairs]
+        self.remote_columns = [remote for _, remote in pairs]
+
+    @classmethod
+    def for_field(cls, parent_mapper, field):
+        prop = parent_mapper.relationships.get(field.name)
+
+        if prop is None or prop.direction is not ONETOMANY or prop.secondary is not None:
+            return None
+
+        return cls(parent_mapper, prop)
+
+    def parent_key(self, parent):
+        return tuple(getattr(parent, key) for key in self.parent_keys)
+
+    def child_key(self, child):
+        return tuple(getattr(child, key) for key in self.child_keys)
+
+    def query(self, session, keys):
+        if len(self.remote_columns) == 1:
+            criterion = self.remote_columns[0].in_([key[0] for key in keys])
+        else:
+            criterion = tuple_(*self.remote_columns).in_(keys)
+
+        query = session.query(self.child_mapper).filter(criterion)
+
+        if self.prop.order_by:
+            query = query.order_by(*self.prop.order_by)
+
+        return query
+
+    def fetch(self, session, keys):
+        children = []
+
+        for chunk in _chunks(keys, IN_CHUNK_SIZE):
+            children.extend(self.query(session, chunk))
+
+        return children
+
+    def stitch(self, parents, children):
+        grouped = {}
+
+        for child in children:
+            grouped.setdefault(self.child_key(child), []).append(child)
+
+        for parent in parents:
+            set_committed_value(parent, self.prop.key, grouped.get(self.parent_key(parent), []))
+
+
+def _shares_connections(engine):
+    # These pools hand every thread either the same connection or a private
+    # in-memory database, so they cannot serve concurrent loads.
+    return not isinstance(engine.pool, (SingletonThreadPool, StaticPool))
+
+
+def load_relationships(resource, objs, session=None, workers=None):
+    """Populate the independent one-to-many :class:`ListRelationship`
+    collections of `resource` for all of `objs` at once.
+
+    Each collection is loaded with one query per chunk of parent keys. When
+    more than one collection is needed and the engine's pool allows it, the
+    queries run concurrently on a thread pool, each with its own session and
+    connection, and the children are merged back into `session` without
+    reloading them.
+
+    Relationships using a secondary table or a many-to-one direction are left
+    to the relationship's own loading strategy.
+
+    """
+    objs = list(objs)
+
+    if not objs:
+        return objs
+
+    mapper = inspect(resource.meta.model)
+    session = session or inspect(objs[0]).session
+
+    loaders = {}
+    for key, field in resource._relationships():
+        if isinstance(field, ListRelationship) and field.name not in loaders:
+            loader = CollectionLoader.for_field(mapper, field)
+            if loader is not None:
+                loaders[field.name] = loader
+
+    if not loaders:
+        return objs
+
+    keys_by_loader = dict((name, sorted(set(loader.parent_key(obj) for obj in objs)))
+                          for name, loader in loaders.items())
+
+    engine = session.get_bind(mapper)
+
+    if len(loaders) == 1 or not _shares_connections(engine):
+        for name, loader in loaders.items():
+            loader.stitch(objs, loader.fetch(session, keys_by_loader[name]))
+
+        return objs
+
+    Session = sessionmaker(bind=engine)
+
+    def fetch(name):
+        loader_session = Session()
+        try:
+            return loaders[name].fetch(loader_session, keys_by_loader[name])
+        finally:
+            loader_session.close()
+
+    names = list(loaders)
+    size = workers or resource.meta.relationship_workers or len(names)
+
+    log.debug('loading %s for %d %s concurrently', names, len(objs), resource.meta.name)
+
+    for name, children in zip(names, _map(fetch, names, size)):
+        children = [session.merge(child, load=False) for child in children]
+        loaders[name].stitch(objs, children)
+
+    return objs
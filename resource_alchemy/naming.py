@@ -0,0 +1,29 @@
+import re
+
+_FIRST_CAP = re.compile('(.)([A-Z][a-z]+)')
+_ALL_CAP = re.compile('([a-z0-9])([A-Z])')
+
+#: Converted names kept before the cache is emptied, so it cannot grow
+#: without bound when names come from requests.
+MAX_CACHED_NAMES = 10000
+
+_converted = {}
+
+
+def convert_name(name):
+    """Convert a ``CamelCase`` class name to ``snake_case``, e.g.
+    ``UserOrder`` to ``user_order``. Results are cached."""
+
+    try:
+        return _converted[name]
+    except KeyError:
+        pass
+
+    converted = _ALL_CAP.sub(r'\1_\2', _FIRST_CAP.sub(r'\1_\2', name)).lower()
+
+    if len(_converted) >= MAX_CACHED_NAMES:
+        _converted.clear()
+
+    _converted[name] = converted
+
+    return converted
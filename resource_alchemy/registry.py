@@ -0,0 +1,170 @@
+import threading
+import urllib
+
+from sqlalchemy import inspect
+
+
+class ResourceRegistry(object):
+
+    """Every resource with a model or a name, by model and by name. The
+    first resource created for a model or a name is the one found for it.
+    See :data:`registry`."""
+
+    def __init__(self):
+        self._by_model = {}
+        self._all_by_model = {}
+        self._by_name = {}
+        self._polymorphic = {}
+        self._lock = threading.Lock()
+
+    def add(self, resource):
+        model = getattr(resource.meta, 'model', None)
+        name = resource.meta.name
+
+        with self._lock:
+            if model is not None:
+                self._by_model.setdefault(model, resource)
+                self._all_by_model.setdefault(model, []).append(resource)
+
+            if name:
+                self._by_name.setdefault(name, resource)
+
+            # A new resource may be the better match for a subclass.
+            self._polymorphic = {}
+
+    def for_model(self, model):
+        """The resource for `model`, or ``None``."""
+
+        return self._by_model.get(model)
+
+    def for_name(self, name):
+        """The resource named `name`, or ``None``."""
+
+        return self._by_name.get(name)
+
+    def polymorphic(self, resource, cls):
+        """The resource to serialize an instance of `cls` with, where
+        `resource` is expected: the first resource which may stand in for
+        `resource` (see :meth:`stands_in_for`) for the nearest class in the
+        MRO of `cls` which is a subclass of `resource`'s model, or else
+        `resource` itself. Cached per pair, so it is one dictionary lookup
+        after the first."""
+
+        key = (resource, cls)
+
+        try:
+            return self._polymorphic[key]
+        except KeyError:
+            pass
+
+        found = resource
+        model = getattr(resource.meta, 'model', None)
+
+        if model is not None and cls is not model and issubclass(cls, model):
+            for base in cls.__mro__:
+                if base is model:
+                    break
+
+                candidates = [candidate for candidate in self._all_by_model.get(base, ())
+                              if self.stands_in_for(candidate, resource)]
+
+                if candidates:
+                    found = candidates[0]
+                    break
+
+        self._polymorphic[key] = found
+
+        return found
+
+    @staticmethod
+    def stands_in_for(candidate, resource):
+        """Whether `candidate` may serialize the objects of a relationship to
+        `resource`: it must serialize like a ``RestResource`` and either
+        subclass `resource` or list it in ``meta.polymorphic_for``. Other
+        resources for the same model may have other fields or authorization,
+        which the relationship never asked for."""
+
+        if not callable(getattr(candidate, 'serialize', None)):
+            return False
+
+        return issubclass(candidate, resource) or resource in candidate.meta.polymorphic_for
+
+    def resolve(self, target):
+        """The resource for `target`: a resource, a model or a resource
+        name. Raises :exc:`KeyError` if there is none."""
+
+        if isinstance(target, type) and hasattr(target, 'meta'):
+            return target
+
+        if isinstance(target, basestring):
+            resource = self._by_name.get(target)
+        else:
+            resource = self._by_model.get(target)
+
+        if resource is None:
+            raise KeyError('No resource for %r' % (target,))
+
+        return resource
+
+    def url(self, target, pk=None):
+        """The URL ``register_api`` routes to the resource for `target`, or
+        to its object with primary key `pk`, a value or a tuple of values.
+        `target` may also be a persistent object, whose own URL is returned.
+        Each value of the key is percent-encoded as UTF-8."""
+
+        if not isinstance(target, (type, basestring)):
+            identity = inspect(target).identity
+            target = type(target)
+
+            if pk is None:
+                pk = identity
+
+        url = '/%s/' % self.resolve(target).meta.name
+
+        if pk is None:
+            return url
+
+        if not isinstance(pk, tuple):
+            pk = (pk,)
+
+        return url + ','.join(quote(value) for value in pk)
+
+
+def quote(value):
+    """`value` as text, percent-encoded for a URL path segment."""
+
+    return urllib.quote(unicode(value).encode('utf-8'), safe='')
+
+
+#: The registry every resource is added to when its class is created.
+registry = ResourceRegistry()
+
+
+#: The ``polymorphic_load`` strategies which can be set on a mapper after it
+#: is configured. SQLAlchemy only acts on ``'inline'`` while it builds the
+#: mapper, so that one must be given in ``__mapper_args__``.
+POLYMORPHIC_LOAD_STRATEGIES = ('selectin',)
+
+
+def configure_polymorphic_loading(model, strategy):
+    """Load the columns of `model`'s own table with `strategy`, which must be
+    one of :data:`POLYMORPHIC_LOAD_STRATEGIES` (see ``polymorphic_load`` of
+    :func:`~sqlalchemy.orm.mapper`), when rows of a superclass are loaded, if
+    it uses joined table inheritance and its mapper does not choose already.
+
+    This changes `model`'s mapper, so it applies to every query of the model,
+    not just those of the resource. Raises :exc:`ValueError` for other
+    strategies.
+
+    """
+    if strategy not in POLYMORPHIC_LOAD_STRATEGIES:
+        raise ValueError("Unsupported polymorphic_load %r, use 'selectin', None, or set it in "
+                         "__mapper_args__" % (strategy,))
+
+    mapper = inspect(model, raiseerr=False)
+
+    if mapper is None or mapper.inherits is None or mapper.single or mapper.concrete:
+        return
+
+    if mapper.polymorphic_load is None:
+        mapper.polymorphic_load = strategy
@@ -1,20 +1,140 @@
+import json
 import math
-import re
+import threading
+import time
+from decimal import Decimal
 
-from flask import jsonify, request
+from flask import Response, jsonify, request, stream_with_context
 from flask.views import MethodView, MethodViewType, View
 from functools import reduce
 from sqlalchemy import inspect
 from sqlalchemy.ext.hybrid import hybrid_property, hybrid_method
+from sqlalchemy.orm import Query
 
 from .exceptions import NotAuthorized, BaseException
-from .fields import Field, Relationship, ListRelationship
+from .fields import Field, Relationship, ListRelationship, UNCONDITIONAL_FIELD_READ, applies_format_value
 from .authorization import FullAuthorization
+from .loading import load_relationships
+from .export import export_ndjson, iter_records, ndjson_stream, csv_stream
+from .codegen import compile_serializer
+from .bulk import CreatePlan, import_ndjson, upsert as upsert_records
+from .instrumentation import current_metrics, phase
+from .naming import convert_name
+from .registry import ResourceRegistry, registry, configure_polymorphic_loading  # NOQA
+from .session import commit, resource_session
+from .search import search, create_query, create_aggregate_query, FilterTable
+
+
+def resolve_query(query):
+    """Return the :class:`~sqlalchemy.orm.query.Query` behind `query`.
+
+    Hybrid properties read from a resource class come back wrapped in an
+    expression proxy, which forwards method calls but does not iterate
+    like a query. Queries are returned as they are, so they may already
+    have a limit.
+
+    """
+    if isinstance(query, Query):
+        return query
+
+    return query.filter()
+
+
+#: Attributes of a lazy resource which are computed when it is prepared.
+DEFERRED_ATTRIBUTES = ('_compiled_serializer', '_compiled_field_serializer', '_filter_table')
+
+_pending = []
+_prepare_lock = threading.RLock()
+
+#: The resources being prepared by the thread which holds the lock.
+_preparing = set()
+
+
+class Deferred(object):
+
+    """Stands in for an attribute of a lazy resource, and prepares the
+    resource the first time it is read."""
+
+    def __init__(self, attr):
+        self.attr = attr
+
+    def __get__(self, instance, owner):
+        prepare(owner)
+        return getattr(owner if instance is None else instance, self.attr)
+
+
+def prepare(resource):
+    """Do the setup a resource with ``meta.lazy`` deferred: add the fields of
+    ``meta.excludes``, compile its serializers and build its filter table.
+    Does nothing if it is already prepared, or while the calling thread is
+    preparing it. Other threads wait until it is prepared.
+
+    The resource is only marked prepared once its setup is complete, so
+    another thread never sees half of its fields."""
+
+    if not isinstance(resource, type):
+        resource = type(resource)
+
+    with _prepare_lock:
+        if not resource.__dict__.get('_unprepared') or resource in _preparing:
+            return
+
+        _preparing.add(resource)
+        try:
+            type(resource).prepare_resource(resource)
+        finally:
+            _preparing.discard(resource)
+
+        resource._unprepared = False
+
+
+def finalize():
+    """Prepare every lazy resource created so far, resolve their forward
+    references and build their schemas, in one batch. Returns the resources
+    prepared."""
+
+    with _prepare_lock:
+        pending = list(_pending)
+        del _pending[:]
 
+    for resource in pending:
+        prepare(resource)
 
-def convert_name(name):
-    s1 = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', name)
-    return re.sub('([a-z0-9])([A-Z])', r'\1_\2', s1).lower()
+    for resource in pending:
+        for _, relationship in relationship_fields(resource):
+            relationship.resource
+
+        if hasattr(resource, '_schema'):
+            resource._schema()
+
+    return pending
+
+
+def relationship_fields(resource):
+    """The ``(key, field)`` pairs of the relationships of `resource`. A
+    ModelResource lists them among its fields."""
+
+    if hasattr(resource, '_relationships'):
+        return list(resource._relationships())
+
+    return [(key, field) for key, field in resource._fields()
+            if isinstance(field, (Relationship, ListRelationship))]
+
+
+def registered_resources(app):
+    """The resources registered on the Flask `app`, in registration order."""
+
+    return list(app.extensions.get('resource_alchemy', ()))
+
+
+def _record_registration(app, resource):
+    if not isinstance(resource, type):
+        resource = type(resource)
+
+    resources = app.extensions.setdefault('resource_alchemy', [])
+
+    if resource not in resources:
+        resources.append(resource)
 
 
 def resource_route(arg=None, **kwargs):
@@ -44,29 +164,56 @@ class ModelTransformer(object):
     @classmethod
     def serialize_one(cls, resource, obj, **kwargs):
 
+        metrics = current_metrics()
+
+        if metrics is not None:
+            metrics.count('objects')
+            metrics.count('relationships', sum(1 for _ in resource._relationships()))
+            started = time.time()
+
         if resource.meta.authorization:
             if not resource.meta.authorization.can_read(obj, **kwargs):
                 raise NotAuthorized('Not authorized to read object')
 
-        result = {}
-        for key, field in resource._fields():
-            result[key] = field.from_obj(obj)
+        if metrics is not None:
+            metrics.add_time('authorize', time.time() - started)
+
+        fragment_cache = resource.meta.fragment_cache
+
+        if fragment_cache is not None:
+            result = fragment_cache.fetch(resource, obj, cls.serialize_fields)
+        elif resource._compiled_serializer is not None:
+            return resource._compiled_serializer(obj)
+        else:
+            result = cls.serialize_fields(resource, obj)
 
         for key, relationship in resource._relationships():
             result[key] = relationship.encode(obj)
 
         return result
 
+    @classmethod
+    def serialize_fields(cls, resource, obj):
+        if resource._compiled_field_serializer is not None:
+            return resource._compiled_field_serializer(obj)
+
+        result = {}
+        for key, field in resource._fields():
+            result[key] = field.from_obj(obj)
+
+        return result
+
     @classmethod
     def serialize_list(cls, resource, objs, **kwargs):
         return [cls.serialize_one(resource, obj, **kwargs) for obj in objs]
 
     @classmethod
     def create_obj(cls, resource, obj_data):
-        if resource.meta.authorization.can_create(obj_data):
-            obj = resource.meta.model()
-            obj = cls.to_obj(resource, obj, obj_data)
-        return obj
+        return resource._create_plan().create(obj_data)
+
+    @classmethod
+    def create_list(cls, resource, records):
+        return resource._create_plan().create_list(records)
 
     @classmethod
     def update_obj(cls, resource, obj_data):
@@ -94,7 +241,6 @@ class ModelTransformer(object):
                 value = obj_data[key]
                 # Ignore fields that aren't writable
                 if field.authorization.can_update(obj, value, **obj_data):
-                    print key, field, obj, value, obj_data
                     field.to_obj(obj, value, **obj_data)
 
         for key, field in resource._relationships():
@@ -124,14 +270,77 @@ class ModelResourceMetaclass(type):
     results_per_page = 100
     transformers = [ModelTransformer]
     decorators = []
+    fragment_cache = None
+    version_column = None
+    concurrent_relationships = False
+    relationship_workers = None
+    export_chunk_size = 10000
+    export_processes = 0
+    import_chunk_size = 1000
+    compile_serializers = True
+    instrumentation = None
+    query_detector = None
+    session_provider = None
+    lazy = False
+    polymorphic_load = 'selectin'
+    polymorphic_for = ()
 
     def __new__(cls, name, bases, attrs):
 
         cls.setup_resource(name, bases, attrs)
         new_cls = super(ModelResourceMetaclass, cls).__new__(cls, name, bases, attrs)
 
+        registry.add(new_cls)
+
+        if new_cls.meta.lazy:
+            new_cls._unprepared = True
+
+            deferred = DEFERRED_ATTRIBUTES if hasattr(new_cls, '_field_plan') else ('_filter_table',)
+
+            for attr in deferred:
+                setattr(new_cls, attr, Deferred(attr))
+
+            with _prepare_lock:
+                _pending.append(new_cls)
+        else:
+            new_cls._unprepared = False
+            cls.prepare_resource(new_cls)
+
         return new_cls
 
+    @classmethod
+    def prepare_resource(cls, new_cls):
+        """Compile the serializers and build the filter table of `new_cls`,
+        adding the fields of ``meta.excludes`` first if they were deferred."""
+
+        meta = new_cls.meta
+        excludes = getattr(meta, 'excludes', None)
+
+        if meta.lazy and excludes is not None:
+            attrs = dict(new_cls.__dict__)
+            cls.process_excludes(excludes, attrs, meta.model)
+
+            for attr, value in attrs.items():
+                if attr not in new_cls.__dict__:
+                    value.bind(attr, meta.model)
+                    setattr(new_cls, attr, value)
+
+        if getattr(meta, 'model', None) is not None and meta.polymorphic_load:
+            configure_polymorphic_loading(meta.model, meta.polymorphic_load)
+
+        if hasattr(new_cls, '_field_plan'):
+            if meta.compile_serializers:
+                new_cls._compiled_serializer = staticmethod(compile_serializer(new_cls))
+                new_cls._compiled_field_serializer = staticmethod(compile_serializer(new_cls, relationships=False))
+            else:
+                new_cls._compiled_serializer = None
+                new_cls._compiled_field_serializer = None
+
+        if getattr(meta, 'model', None) is not None:
+            new_cls._filter_table = FilterTable.for_resource(new_cls)
+        else:
+            new_cls._filter_table = None
+
     @classmethod
     def setup_resource(cls, name, bases, attrs):
 
@@ -161,6 +370,9 @@ class ModelResourceMetaclass(type):
 
         attrs['meta'] = meta_cls
 
+        if model and meta_cls.fragment_cache is not None:
+            meta_cls.fragment_cache.watch(model)
+
         if includes and excludes:
             raise Exception(
                 'Cannot define both includes and excludes for {}. Please remove one.'.format(resource_name))
@@ -170,24 +382,17 @@ class ModelResourceMetaclass(type):
             if not model:
                 raise Exception('A model is required when using excludes for {}'.format(resource_name))
 
-            cls.process_excludes(excludes, attrs, model)
-
-        for attr, value in attrs.iteritems():
+            # Lazy resources inspect their model when they are prepared.
+            if not meta_cls.lazy:
+                cls.process_excludes(excludes, attrs, model)
 
-            if isinstance(value, Field):
-                value.key = attr
-                value.name = value.name or attr
+        for attr, value in attrs.items():
 
-                if model:
-                    value.model = model
-            elif isinstance(value, type) and issubclass(value, Field):
-                field = value()
-                field.key = attr
-                field.name = attr
-                attrs[attr] = field
+            if isinstance(value, type) and issubclass(value, Field):
+                value = attrs[attr] = value()
 
-                if model:
-                    value.model = model
+            if isinstance(value, Field):
+                value.bind(attr, model)
 
     @classmethod
     def process_includes(cls, includes, attrs):
@@ -211,8 +416,15 @@ class Resource(object):
 
     __metaclass__ = ModelResourceMetaclass
 
+    _compiled_serializer = None
+    _compiled_field_serializer = None
+    _filter_table = None
+
     @classmethod
     def _fields(cls):
+        if cls._unprepared:
+            prepare(cls)
+
         for attr, value in cls.__dict__.iteritems():
             if isinstance(value, (Field)) and not isinstance(value, (Relationship, ListRelationship)):
                 yield (attr, value)
@@ -221,16 +433,38 @@ class Resource(object):
     def _primary_keys(cls):
         return inspect(cls.meta.model).primary_key
 
+    @classmethod
+    def _field_plan(cls):
+        """The (key, field) pairs of the plain fields in declaration order,
+        computed once per resource."""
+
+        plan = cls.__dict__.get('_cached_field_plan')
+
+        if plan is None:
+            plan = tuple(sorted(cls._fields(), key=lambda item: item[1].creation_order))
+            cls._cached_field_plan = plan
+
+        return plan
+
+    @classmethod
+    def _create_plan(cls):
+        """The :class:`~resource_alchemy.bulk.CreatePlan` of the resource,
+        computed once."""
+
+        plan = cls.__dict__.get('_cached_create_plan')
+
+        if plan is None:
+            plan = cls._cached_create_plan = CreatePlan(cls)
+
+        return plan
+
     @classmethod
     def _extra_routes(cls):
         for attr, value in cls.__dict__.iteritems():
             if hasattr(value, '__func__') and hasattr(value.__func__, '_resource_route'):
                 func = getattr(cls, attr)
                 options = dict(**value.__func__._resource_route)
-                if cls.meta.decorators:
-                    func = reduce(lambda func, decorator: decorator(func), cls.meta.decorators, func)
-
-                options['view_func'] = func
+                options['view_func'] = cls._view(func, attr)
 
                 relative = options.pop('relative')
                 if relative:
@@ -276,6 +510,17 @@ class Resource(object):
 
     @classmethod
     def _schema(cls):
+        """The JSON schema of the resource, computed once."""
+
+        schema = cls.__dict__.get('_cached_schema')
+
+        if schema is None:
+            schema = cls._cached_schema = cls._build_schema()
+
+        return schema
+
+    @classmethod
+    def _build_schema(cls):
 
         schema = {
             'id': cls.meta.name,
@@ -418,6 +663,9 @@ class ModelResource(object):
 
     @hybrid_property
     def base_query(cls):
+        if cls.meta.session_provider is not None:
+            return cls.meta.session_provider.session().query(cls.meta.model)
+
         return cls.meta.model.query
 
     @hybrid_property
@@ -438,6 +686,9 @@ class ModelResource(object):
 
     @hybrid_method
     def _fields(cls):
+        if cls._unprepared:
+            prepare(cls)
+
         for attr, value in cls.__dict__.iteritems():
             if isinstance(value, Field):
                 yield (attr, value)
@@ -496,8 +747,9 @@ class ApiResource(ModelResource):
         obj = super(ApiResource, cls).to_obj(obj_data)
 
         obj = cls.post_update(obj, obj_data)
+        session = resource_session(cls)
         session.add(obj)
-        session.commit()
+        commit(cls, session)
 
         obj_pk = tuple(getattr(obj, pk) for pk in obj.__class__._pk_attrs)
         session.expunge(obj)
@@ -517,7 +769,7 @@ class ApiResource(ModelResource):
     def search(cls, search_params={}):
 
         search_result = search(None, cls.meta.model, search_params,
-                               query=cls.query('search'))
+                               query=cls.query('search'), table=cls._filter_table)
         result_count = search_result.count()
 
         page = search_params.get('page', 1)
@@ -547,9 +799,12 @@ class ApiResource(ModelResource):
     @hybrid_method
     def register_resource(cls, app):
 
-        name_suffix = cls.meta.name or convert_name(cls.meta.model.__name__)
+        _record_registration(app, cls)
+
+        name_suffix = cls.meta.name
+
+        provider = cls.meta.session_provider
 
-        @app.route('/%s/' % name_suffix, methods=['GET', 'POST'])
         def base_handler():
 
             if request.method is 'GET':
@@ -557,9 +812,16 @@ class ApiResource(ModelResource):
             elif request.method is 'POST':
                 return cls.create()
 
+        if provider is not None:
+            base_handler = provider.instrument(cls, 'base', base_handler)
+
+        app.route('/%s/' % name_suffix, methods=['GET', 'POST'])(base_handler)
+
         for func_name in ('get', 'update', 'search', 'create', 'delete'):
             name = '/%s/%s' % (name_suffix, func_name)
             func = getattr(cls, func_name)
+            if provider is not None:
+                func = provider.instrument(cls, func_name, func)
             register_func = app.route(name)
             register_func(func)
 
@@ -587,16 +849,26 @@ class RestResource(MethodView, Resource):
         if result is None:
             return '', 404
 
-        return jsonify(result)
+        with phase('render'):
+            return jsonify(result)
 
     @hybrid_method
     def post(self):
         obj_data = request.json
-        result = self.apply_transformers(obj_data, 'create_obj')
-        session = self.meta.model.query.session  # oh god why
-        session.add(result)
-        session.commit()
-        return jsonify(self.serialize(result)), 201
+        many = isinstance(obj_data, list)
+        with phase('deserialize'):
+            result = self.apply_transformers(obj_data, 'create_list' if many else 'create_obj')
+        with phase('commit'):
+            session = resource_session(self)
+            if many:
+                self._create_plan().add_all(session, result, obj_data)
+            else:
+                session.add(result)
+            commit(self, session)
+        with phase('serialize'):
+            result = self.serialize(result)
+        with phase('render'):
+            return jsonify(result), 201
 
     @hybrid_method
     def delete(self, pk):
@@ -605,11 +877,16 @@ class RestResource(MethodView, Resource):
     @hybrid_method
     def put(self, pk):
         obj_data = request.json
-        result = self.apply_transformers(obj_data, 'update_obj')
-        session = self.meta.model.query.session  # oh god why
-        session.merge(result)
-        session.commit()
-        return jsonify(self.serialize(result)), 200
+        with phase('deserialize'):
+            result = self.apply_transformers(obj_data, 'update_obj')
+        with phase('commit'):
+            session = resource_session(self)
+            session.merge(result)
+            commit(self, session)
+        with phase('serialize'):
+            result = self.serialize(result)
+        with phase('render'):
+            return jsonify(result), 200
 
     @hybrid_method
     def get_one(cls, pk, **kwargs):
@@ -617,11 +894,13 @@ class RestResource(MethodView, Resource):
         if not isinstance(pk, tuple):
             pk = (pk,)
 
-        query = cls.get_query
-        obj = query.get(pk)
+        with phase('query'):
+            query = cls.get_query
+            obj = query.get(pk)
 
         if obj is not None:
-            obj_data = cls.apply_transformers(obj, 'serialize_one', **kwargs)
+            with phase('serialize'):
+                obj_data = cls.apply_transformers(obj, 'serialize_one', **kwargs)
         else:
             obj_data = None
 
@@ -629,11 +908,103 @@ class RestResource(MethodView, Resource):
 
     @hybrid_method
     def get_list(cls, **kwargs):
-        objs = cls.search_query
-        return cls.apply_transformers(objs, 'serialize_list', **kwargs)
+        with phase('query'):
+            objs = resolve_query(cls.search_query).all()
+
+        if cls.meta.concurrent_relationships:
+            with phase('relationships'):
+                objs = load_relationships(cls, objs)
+
+        with phase('serialize'):
+            return cls.apply_transformers(objs, 'serialize_list', **kwargs)
+
+    @hybrid_method
+    def upsert(cls, records, **kwargs):
+        """Insert or update `records` with one ``INSERT ... ON CONFLICT DO
+        UPDATE`` per chunk and commit. Returns the primary keys written. See
+        :func:`resource_alchemy.bulk.upsert` for the options."""
+
+        session = resource_session(cls)
+        keys = upsert_records(cls, records, session, **kwargs)
+        commit(cls, session)
+        return keys
+
+    @hybrid_method
+    def export(cls, query=None, **kwargs):
+        """Yield the resource's rows as chunks of newline delimited JSON,
+        serialized from raw column values. See
+        :func:`resource_alchemy.export.export_ndjson` for the options."""
+
+        if query is None:
+            query = cls.search_query
+
+        return export_ndjson(cls, query, **kwargs)
+
+    @hybrid_method
+    def aggregate(cls, search_params, query=None):
+        """Compute the counts, sums, averages, minimums or maximums described
+        by `search_params` over the resource's readable fields with a single
+        ``GROUP BY`` query. See
+        :func:`resource_alchemy.search.create_aggregate_query` for the format.
+
+        Returns ``{'keys': [...], 'rows': [[...], ...]}``, one row per group.
+        Rows the resource's authorization cannot read are left out through
+        its ``read_filter``; authorizations without one cannot be aggregated.
+
+        """
+        if query is None:
+            query = resolve_query(cls.search_query)
+
+        authorization = cls.meta.authorization
+
+        if authorization is not None:
+            read_filter = getattr(authorization, 'read_filter', None)
+
+            if read_filter is None:
+                raise BaseException('%s checks read authorization per object and cannot be '
+                                    'aggregated' % cls.meta.name)
+
+            query = read_filter(query)
+
+        fields = dict((key, field) for key, field in cls._field_plan()
+                      if field.authorization in UNCONDITIONAL_FIELD_READ)
+        columns = dict((key, getattr(cls.meta.model, field.name)) for key, field in fields.items())
+
+        try:
+            query, group_by, aggregates = create_aggregate_query(None, cls.meta.model, search_params,
+                                                                 columns, query=query,
+                                                                 table=cls._filter_table)
+        except (ValueError, AttributeError, KeyError, TypeError) as e:
+            raise BaseException('Invalid aggregate: %s' % e)
+
+        def formatter(field):
+            field_cls = type(field)
+            return field_cls.format_value if applies_format_value(field_cls) else None
+
+        formatters = [formatter(fields[key]) for key in group_by]
+        formatters.extend(formatter(fields[aggregate.field]) if aggregate.function in ('min', 'max') else None
+                          for aggregate in aggregates)
+
+        rows = []
+        for row in query:
+            values = []
+            for formatter, value in zip(formatters, row):
+                if isinstance(value, Decimal):
+                    value = float(value)
+                elif formatter is not None:
+                    value = formatter(value)
+                values.append(value)
+            rows.append(values)
+
+        keys = list(group_by) + [aggregate.label for aggregate in aggregates]
+
+        return {'keys': keys, 'rows': rows}
 
     @hybrid_property
     def base_query(cls):
+        if cls.meta.session_provider is not None:
+            return cls.meta.session_provider.session().query(cls.meta.model)
+
         return cls.meta.model.query
 
     @hybrid_property
@@ -674,6 +1045,80 @@ class RestResource(MethodView, Resource):
                 obj = transform(cls, obj, **kwargs)
         return obj
 
+    @classmethod
+    def _export_query(cls):
+        query = resolve_query(cls.search_query)
+        search_params = request.args.get('q')
+
+        if not search_params:
+            return query
+
+        try:
+            return create_query(None, cls.meta.model, json.loads(search_params), query=query,
+                                table=cls._filter_table)
+        except (ValueError, AttributeError, KeyError, TypeError) as e:
+            raise BaseException('Invalid search: %s' % e)
+
+    @classmethod
+    def _export_ndjson(cls):
+        keys, chunks = iter_records(cls, cls._export_query())
+
+        return Response(stream_with_context(ndjson_stream(keys, chunks)),
+                        mimetype='application/x-ndjson')
+
+    @classmethod
+    def _export_csv(cls):
+        keys, chunks = iter_records(cls, cls._export_query())
+
+        response = Response(stream_with_context(csv_stream(keys, chunks)), mimetype='text/csv')
+        response.headers['Content-Disposition'] = 'attachment; filename=%s.csv' % cls.meta.name
+        return response
+
+    @classmethod
+    def _aggregate(cls):
+        try:
+            search_params = json.loads(request.args.get('q') or '{}')
+        except ValueError as e:
+            raise BaseException('Invalid aggregate: %s' % e)
+
+        if not isinstance(search_params, dict):
+            raise BaseException('Invalid aggregate: expected an object')
+
+        return jsonify(cls.aggregate(search_params))
+
+    @classmethod
+    def _import_ndjson(cls):
+        session = resource_session(cls)
+        upsert = request.args.get('mode') == 'upsert'
+
+        try:
+            events = import_ndjson(cls, request.stream, session, upsert=upsert)
+        except ValueError as e:
+            raise BaseException(str(e))
+
+        lines = (json.dumps(event) + '\n' for event in events)
+
+        return Response(stream_with_context(lines), mimetype='application/x-ndjson')
+
+    @classmethod
+    def _view(cls, func, endpoint):
+        """Wrap a view function in the resource's session provider, query
+        detector and instrumentation, if any, and then its decorators."""
+
+        if cls.meta.session_provider is not None:
+            func = cls.meta.session_provider.instrument(cls, endpoint, func)
+
+        if cls.meta.query_detector is not None:
+            func = cls.meta.query_detector.instrument(cls, endpoint, func)
+
+        if cls.meta.instrumentation is not None:
+            func = cls.meta.instrumentation.instrument(cls, endpoint, func)
+
+        if cls.meta.decorators:
+            func = reduce(lambda func, decorator: decorator(func), cls.meta.decorators, func)
+
+        return func
+
     @classmethod
     def register_error_handlers(cls, app):
 
@@ -688,26 +1133,21 @@ class RestResource(MethodView, Resource):
         app.__resource_alchemy_errorhandlers_registered = True
 
     @hybrid_method
-    def register_api(cls, app, pk='id', pk_type='int'):
+    def register_api(cls, app, pk='id', pk_type='int', export=False, bulk_import=False, aggregate=False):
 
         if not hasattr(app, '__resource_alchemy_errorhandlers_registered'):
             cls.register_error_handlers(app)
 
+        _record_registration(app, cls)
+
         resource_name = cls.meta.name
         resource_url = '/%s/' % resource_name
 
-        view_func = cls.as_view(resource_name)
-
-        if cls.meta.decorators:
-            view_func = reduce(lambda func, decorator: decorator(func), cls.meta.decorators, view_func)
+        view_func = cls._view(cls.as_view(resource_name), 'api')
 
         app.add_url_rule(resource_url,
                          view_func=view_func,
-                         methods=['GET', ])
-
-        app.add_url_rule(resource_url,
-                         view_func=view_func,
-                         methods=['POST', ])
+                         methods=['GET', 'POST'])
 
         app.add_url_rule('%s<pk>' % (resource_url),
                          view_func=view_func,
@@ -716,6 +1156,31 @@ class RestResource(MethodView, Resource):
         register_func = app.route('%sschema/' % resource_url, endpoint='%s_schema' %
                                   resource_name, methods=['GET'])(cls._json_schema)
 
+        if export:
+            for extension, func in (('ndjson', cls._export_ndjson), ('csv', cls._export_csv)):
+                func = cls._view(func, 'export_%s' % extension)
+
+                app.add_url_rule('%sexport.%s' % (resource_url, extension),
+                                 endpoint='%s_export_%s' % (resource_name, extension),
+                                 view_func=func,
+                                 methods=['GET'])
+
+        if bulk_import:
+            func = cls._view(cls._import_ndjson, 'import_ndjson')
+
+            app.add_url_rule('%simport.ndjson' % resource_url,
+                             endpoint='%s_import_ndjson' % resource_name,
+                             view_func=func,
+                             methods=['POST'])
+
+        if aggregate:
+            func = cls._view(cls._aggregate, 'aggregate')
+
+            app.add_url_rule('%saggregate' % resource_url,
+                             endpoint='%s_aggregate' % resource_name,
+                             view_func=func,
+                             methods=['GET'])
+
         for extra_route in cls._extra_routes():
             route = extra_route.pop('route')
             app.add_url_rule(route, **extra_route)
@@ -21,11 +21,21 @@
 
 """
 import inspect
+from collections import namedtuple
 
 from sqlalchemy import and_ as AND
 from sqlalchemy import or_ as OR
+from sqlalchemy import not_ as NOT
+from sqlalchemy import func
+from sqlalchemy import inspect as sqlalchemy_inspect
+from sqlalchemy import tuple_
 from sqlalchemy.ext.associationproxy import AssociationProxy
-from sqlalchemy.orm.attributes import InstrumentedAttribute
+from sqlalchemy.orm import Query, aliased
+from sqlalchemy.orm.attributes import InstrumentedAttribute, QueryableAttribute
+
+from .exceptions import InvalidFilter
+from .fulltext import FullTextMatch, FullTextRank
+from .fields import Relationship, ListRelationship, UNCONDITIONAL_FIELD_READ
 
 
 def session_query(session, model):
@@ -55,6 +65,11 @@ def _sub_operator(model, argument, fieldname):
         #submodel = get_related_association_proxy_model(model)
     else:  # TODO what to do here?
         pass
+    if isinstance(argument, FilterNode):
+        raise TypeError('Filter trees inside has/any need a resource filter table')
+    if isinstance(argument, Filter):
+        argument = {'name': argument.fieldname, 'op': argument.operator,
+                    'val': argument.argument}
     if isinstance(argument, dict):
         fieldname = argument['name']
         operator = argument['op']
@@ -118,17 +133,22 @@ OPERATORS = {
     'like': lambda f, a: f.like(a),
     'in': lambda f, a: f.in_(a),
     'not_in': lambda f, a: ~f.in_(a),
+    # Full-text search, see :mod:`resource_alchemy.fulltext`.
+    'search': lambda f, a: FullTextMatch(f, a),
+    'match': lambda f, a: FullTextMatch(f, a),
     # Operators which accept three arguments.
     'has': lambda f, a, fn: f.has(_sub_operator(f, a, fn)),
     'any': lambda f, a, fn: f.any(_sub_operator(f, a, fn)),
 }
 
 
-class OrderBy(object):
+class OrderBy(namedtuple('OrderBy', 'field direction')):
 
     """Represents an "order by" in a SQL query expression."""
 
-    def __init__(self, field, direction='asc'):
+    __slots__ = ()
+
+    def __new__(cls, field, direction='asc'):
         """Instantiates this object with the specified attributes.
 
         `field` is the name of the field by which to order the result set.
@@ -137,15 +157,14 @@ class OrderBy(object):
         "descending", respectively.
 
         """
-        self.field = field
-        self.direction = direction
+        return super(OrderBy, cls).__new__(cls, field, direction)
 
     def __repr__(self):
         """Returns a string representation of this object."""
         return '<OrderBy {0}, {1}>'.format(self.field, self.direction)
 
 
-class Filter(object):
+class Filter(namedtuple('Filter', 'fieldname operator argument otherfield')):
 
     """Represents a filter to apply to a SQL query.
 
@@ -155,7 +174,9 @@ class Filter(object):
 
     """
 
-    def __init__(self, fieldname, operator, argument=None, otherfield=None):
+    __slots__ = ()
+
+    def __new__(cls, fieldname, operator, argument=None, otherfield=None):
         """Instantiates this object with the specified attributes.
 
         `fieldname` is the name of the field of a model which will be on the
@@ -177,10 +198,7 @@ class Filter(object):
            required arguments.
 
         """
-        self.fieldname = fieldname
-        self.operator = operator
-        self.argument = argument
-        self.otherfield = otherfield
+        return super(Filter, cls).__new__(cls, fieldname, operator, argument, otherfield)
 
     def __repr__(self):
         """Returns a string representation of this object."""
@@ -207,27 +225,144 @@ class Filter(object):
         name of the other field of the model to which the operator will be
         applied.
 
+        Lists in the argument become tuples and dictionaries tuples of their
+        sorted items, so that the filter is hashable, except the dictionary
+        argument of ``has`` and ``any``, which :func:`parse_filters` parses
+        into a filter.
+
         """
         fieldname = dictionary.get('name')
         operator = dictionary.get('op')
         argument = dictionary.get('val')
         otherfield = dictionary.get('field')
+        if not (operator in RELATIONSHIP_OPERATORS and isinstance(argument, dict)):
+            argument = _hashable(argument)
         return Filter(fieldname, operator, argument, otherfield)
 
 
-class SearchParameters(object):
+def _hashable(value):
+    """Returns `value` with lists turned into tuples and dictionaries into
+    tuples of their sorted items, recursively."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _hashable(item)) for key, item in value.items()))
+    return value
+
+
+#: The deepest that ``and``, ``or``, ``not`` and ``has``/``any`` filters may
+#: be nested in a search, counting the top level as 1.
+MAX_FILTER_DEPTH = 8
+
+#: The most filters and filter nodes that one search may contain.
+MAX_FILTER_NODES = 100
+
+
+class FilterNode(namedtuple('FilterNode', 'junction children')):
+
+    """Represents an ``and``, ``or`` or ``not`` of other filters.
+
+    `junction` is one of those names and `children` a tuple of
+    :class:`Filter` and :class:`FilterNode` objects. A ``not`` node has
+    exactly one child.
+
+    """
+
+    __slots__ = ()
+
+    def __repr__(self):
+        """Returns a string representation of this object."""
+        return '<FilterNode {0} {1}>'.format(self.junction, list(self.children))
+
+
+def parse_filters(dictionaries):
+    """Returns a tuple of :class:`Filter` and :class:`FilterNode` objects
+    parsed from `dictionaries`, a list whose items are either filters in the
+    form accepted by :meth:`Filter.from_dictionary` or nodes of the form::
+
+        {'or': [{'name': 'age', 'op': 'lt', 'val': 18},
+                {'and': [{'name': 'is_active', 'op': 'eq', 'val': False},
+                         {'not': {'name': 'savings', 'op': 'eq', 'val': 0}}]}]}
+
+    The dictionary argument of ``has`` and ``any`` filters is parsed the same
+    way.
+
+    Raises :exc:`InvalidFilter` if the filters are malformed, nested deeper
+    than :data:`MAX_FILTER_DEPTH` or more than :data:`MAX_FILTER_NODES` in
+    total.
+
+    """
+    if not isinstance(dictionaries, (list, tuple)):
+        raise InvalidFilter('Filters must be a list')
+
+    count = [0]
+    return tuple(_parse_filter(dictionary, 1, count) for dictionary in dictionaries)
+
+
+def _parse_filter(dictionary, depth, count):
+    if not isinstance(dictionary, dict):
+        raise InvalidFilter('Filters must be objects')
+
+    count[0] += 1
+
+    if count[0] > MAX_FILTER_NODES:
+        raise InvalidFilter('Searches may contain at most {0} filters'.format(MAX_FILTER_NODES))
+    if depth > MAX_FILTER_DEPTH:
+        raise InvalidFilter('Filters may be nested at most {0} deep'.format(MAX_FILTER_DEPTH))
+
+    junctions = [junction for junction in ('and', 'or', 'not') if junction in dictionary]
+
+    if not junctions:
+        filt = Filter.from_dictionary(dictionary)
+        if filt.operator in RELATIONSHIP_OPERATORS and isinstance(filt.argument, dict):
+            filt = filt._replace(argument=_parse_filter(filt.argument, depth + 1, count))
+        return filt
+
+    if len(junctions) > 1 or len(dictionary) > 1:
+        raise InvalidFilter("Filter nodes take exactly one of 'and', 'or' or 'not'")
+
+    junction = junctions[0]
+    children = dictionary[junction]
+
+    if junction == 'not':
+        children = [children]
+    elif not isinstance(children, (list, tuple)) or not children:
+        raise InvalidFilter("'{0}' takes a list of filters".format(junction))
+
+    return FilterNode(junction, tuple(_parse_filter(child, depth + 1, count) for child in children))
+
+
+def iter_filters(filters):
+    """Yields every :class:`Filter` in `filters`, descending into
+    :class:`FilterNode` objects but not into ``has``/``any`` arguments."""
+    for filt in filters:
+        if isinstance(filt, FilterNode):
+            for child in iter_filters(filt.children):
+                yield child
+        else:
+            yield filt
+
+
+class SearchParameters(namedtuple('SearchParameters',
+                                  'filters limit offset order_by junction')):
 
     """Aggregates the parameters for a search, including filters, search type,
     limit, offset, and order by directives.
 
+    Search parameters are immutable, so a parsed search can be shared or
+    cached freely.
+
     """
 
-    def __init__(self, filters=None, limit=None, offset=None, order_by=None,
-                 junction=None):
+    __slots__ = ()
+
+    def __new__(cls, filters=None, limit=None, offset=None, order_by=None,
+                junction=None):
         """Instantiates this object with the specified attributes.
 
-        `filters` is a list of :class:`Filter` objects, representing filters to
-        be applied during the search.
+        `filters` is a sequence of :class:`Filter` and :class:`FilterNode`
+        objects, representing filters to be applied during the search. It is
+        stored as a tuple.
 
         `limit`, if not ``None``, specifies the maximum number of results to
         return in the search.
@@ -235,9 +370,9 @@ class SearchParameters(object):
         `offset`, if not ``None``, specifies the number of initial results to
         skip in the result set.
 
-        `order_by` is a list of :class:`OrderBy` objects, representing the
+        `order_by` is a sequence of :class:`OrderBy` objects, representing the
         ordering directives to apply to the result set which matches the
-        search.
+        search. It is stored as a tuple.
 
         `junction` is either :func:`sqlalchemy.or_` or :func:`sqlalchemy.and_`
         (if ``None``, this will default to :func:`sqlalchemy.and_`), specifying
@@ -245,11 +380,8 @@ class SearchParameters(object):
         conjunction).
 
         """
-        self.filters = filters or []
-        self.limit = limit
-        self.offset = offset
-        self.order_by = order_by or []
-        self.junction = junction or AND
+        return super(SearchParameters, cls).__new__(cls, tuple(filters or ()), limit, offset,
+                                                    tuple(order_by or ()), junction or AND)
 
     def __repr__(self):
         """Returns a string representation of the search parameters."""
@@ -274,7 +406,7 @@ class SearchParameters(object):
             }
 
         where ``dictionary['filters']`` is the list of :class:`Filter` objects
-        (in dictionary form), ``dictionary['order_by']`` is the list of
+        or filter trees (in dictionary form, see :func:`parse_filters`), ``dictionary['order_by']`` is the list of
         :class:`OrderBy` objects (in dictionary form), ``dictionary['limit']``
         is the maximum number of matching entries to return,
         ``dictionary['offset']`` is the number of initial entries to skip in
@@ -285,11 +417,9 @@ class SearchParameters(object):
         ignored.
 
         """
-        # for the sake of brevity...
-        from_dict = Filter.from_dictionary
-        filters = [from_dict(f) for f in dictionary.get('filters', [])]
-        order_by_list = dictionary.get('order_by', [])
-        order_by = [OrderBy(**o) for o in order_by_list]
+        filters = parse_filters(dictionary.get('filters', ()))
+        order_by_list = dictionary.get('order_by', ())
+        order_by = tuple(OrderBy(**o) for o in order_by_list)
         limit = dictionary.get('limit')
         offset = dictionary.get('offset')
         disjunction = dictionary.get('disjunction')
@@ -298,6 +428,488 @@ class SearchParameters(object):
                                 order_by=order_by, junction=junction)
 
 
+#: The mapping from aggregate function name (as accepted by
+#: :func:`create_aggregate_query`) to the SQL function it applies.
+AGGREGATES = {
+    'count': func.count,
+    'sum': func.sum,
+    'avg': func.avg,
+    'min': func.min,
+    'max': func.max,
+}
+
+
+class Aggregate(namedtuple('Aggregate', 'function field')):
+
+    """Represents an aggregate function applied to a field, or a plain row
+    count when `field` is ``None``."""
+
+    __slots__ = ()
+
+    def __new__(cls, function, field=None):
+        return super(Aggregate, cls).__new__(cls, function, field)
+
+    @property
+    def label(self):
+        """The name of the aggregate's column in the result, for example
+        ``'count'`` or ``'sum_savings'``."""
+        if self.field is None:
+            return self.function
+        return '{0}_{1}'.format(self.function, self.field)
+
+    @staticmethod
+    def from_dictionary(dictionary):
+        """Returns a new :class:`Aggregate` object with arguments parsed from
+        `dictionary`, which is of the form::
+
+            {'func': 'sum', 'field': 'savings'}
+
+        """
+        return Aggregate(dictionary.get('func'), dictionary.get('field'))
+
+
+#: The number of arguments taken by each function in :data:`OPERATORS`.
+OPERATOR_ARITY = dict((name, len(inspect.getargspec(opfunc)[0]))
+                      for name, opfunc in OPERATORS.items())
+
+#: Operators which test a relationship rather than compare a column.
+RELATIONSHIP_OPERATORS = ('has', 'any')
+
+#: Operators which are not filters at all.
+ORDERING_OPERATORS = ('asc', 'desc')
+
+#: Operators which need a full-text index on the field.
+TEXT_OPERATORS = ('search', 'match')
+
+#: The :class:`OrderBy` direction which orders full-text search results by
+#: relevance, best first.
+RANK = 'rank'
+
+
+def _exists(path, criterion):
+    """Wraps `criterion` in a correlated ``EXISTS`` for each relationship of
+    `path`, innermost last, through ``any`` for collections and ``has`` for
+    scalar relationships."""
+    for relationship in reversed(path):
+        if relationship.property.uselist:
+            criterion = relationship.any(criterion)
+        else:
+            criterion = relationship.has(criterion)
+    return criterion
+
+
+class JoinPlan(object):
+
+    """Collects the joins needed by the related-field filters of one search,
+    with one alias per relationship path, shared by every filter which uses
+    the same path.
+
+    Joins are ``LEFT OUTER`` so filters joined with ``or`` still match
+    objects without related rows. When any joined relationship is a
+    collection, :meth:`apply` joins in a subquery of primary keys instead, so
+    each object is returned once.
+
+    """
+
+    def __init__(self):
+        self.aliases = {}
+        self.joins = []
+        self.collection = False
+
+    def alias(self, path):
+        """Returns the alias of the entity at the end of `path`, a tuple of
+        relationship attributes starting at the searched model."""
+        key = tuple(relationship.key for relationship in path)
+
+        if key in self.aliases:
+            return self.aliases[key]
+
+        relationship = path[-1]
+
+        if len(path) > 1:
+            relationship = getattr(self.alias(path[:-1]), relationship.key)
+
+        target = aliased(relationship.property.mapper.class_)
+        self.joins.append(relationship.of_type(target))
+        self.aliases[key] = target
+
+        if relationship.property.uselist:
+            self.collection = True
+
+        return target
+
+    def apply(self, query, model, criterion):
+        """Returns `query` of `model` filtered by `criterion`, which may use
+        the collected aliases.
+
+        Without collections, the joins are added to `query` itself. Otherwise
+        `query` keeps the objects whose primary key is among those of a joined
+        subquery matching `criterion`. ``DISTINCT`` would also merge distinct
+        objects whose selected columns are equal, as in an export which only
+        selects some columns.
+
+        """
+        if not self.collection:
+            for join in self.joins:
+                query = query.outerjoin(join)
+            return query.filter(criterion)
+
+        mapper = sqlalchemy_inspect(model)
+        keys = [getattr(model, mapper.get_property_by_column(column).key) for column in mapper.primary_key]
+
+        matching = Query(keys)
+        for join in self.joins:
+            matching = matching.outerjoin(join)
+        matching = matching.filter(criterion).statement
+
+        if len(keys) == 1:
+            return query.filter(keys[0].in_(matching))
+
+        return query.filter(tuple_(*keys).in_(matching))
+
+
+class CompiledFilter(namedtuple('CompiledFilter',
+                                'column path operator argument exists')):
+
+    """A :class:`Filter` resolved by a :class:`FilterTable`.
+
+    `column` is the attribute to compare with `operator`, a function from
+    :data:`OPERATORS`, and `argument`. `path` is the tuple of relationship
+    attributes leading from the searched model to `column`'s model, empty
+    for the model's own fields. A filter with no `operator` tests the
+    relationships of `path` against another compiled filter, its `argument`.
+
+    With `exists`, related fields are always tested with correlated
+    ``EXISTS`` subqueries, as they must be under ``not`` or when a
+    relationship filter asks for ``has``/``any`` explicitly.
+
+    """
+
+    __slots__ = ()
+
+    def expression(self, joins=None):
+        """Returns the SQLAlchemy expression for this filter.
+
+        If `joins` is a :class:`JoinPlan`, a related field is compared on a
+        joined alias instead of through ``EXISTS``, and the plan records the
+        join.
+
+        """
+        if self.operator is None:
+            return _exists(self.path, self.argument.expression())
+
+        column = self.column
+        argument = self.argument
+
+        if self.path and joins is not None and not self.exists:
+            alias = joins.alias(self.path)
+            column = getattr(alias, column.key)
+            if isinstance(argument, QueryableAttribute):
+                argument = getattr(alias, argument.key)
+
+        if argument is None:
+            criterion = self.operator(column)
+        else:
+            criterion = self.operator(column, argument)
+
+        if self.path and (joins is None or self.exists):
+            return _exists(self.path, criterion)
+
+        return criterion
+
+    def columns(self):
+        """Returns the column attributes this filter compares."""
+        if self.operator is None:
+            return self.argument.columns()
+        if isinstance(self.argument, QueryableAttribute):
+            return [self.column, self.argument]
+        return [self.column]
+
+
+#: The SQLAlchemy function for each kind of :class:`FilterNode`.
+JUNCTIONS = {
+    'and': AND,
+    'or': OR,
+    'not': NOT,
+}
+
+
+class CompiledNode(namedtuple('CompiledNode', 'junction children')):
+
+    """A :class:`FilterNode` resolved by a :class:`FilterTable`, with its
+    `junction` a function from :data:`JUNCTIONS`."""
+
+    __slots__ = ()
+
+    def expression(self, joins=None):
+        """Returns the SQLAlchemy expression for this node."""
+        return self.junction(*[child.expression(joins) for child in self.children])
+
+    def columns(self):
+        """Returns the column attributes compared anywhere below this node."""
+        return [column for child in self.children for column in child.columns()]
+
+
+class FilterTable(object):
+
+    """The fields of a resource which searches may filter and order on,
+    resolved to model attributes once when the resource class is created.
+
+    `columns` maps field keys to column attributes. `relationships` maps
+    relationship keys to the relationship attribute and a function returning
+    the related resource's table, which is looked up on first use so
+    resources can refer to each other before both exist. `searchable` holds
+    the keys of the fields declared ``searchable``, which alone accept the
+    full-text operators.
+
+    """
+
+    def __init__(self, name, columns, relationships, searchable=()):
+        self.name = name
+        self.columns = columns
+        self.relationships = relationships
+        self.searchable = frozenset(searchable)
+
+    @classmethod
+    def for_resource(cls, resource):
+        """Build the table of `resource`'s declared fields which anyone can
+        read. Fields that are not mapped columns are left out."""
+
+        model = resource.meta.model
+        columns = {}
+        relationships = {}
+        searchable = []
+
+        if hasattr(resource, '_field_plan'):
+            fields = resource._field_plan()
+            related = resource._relationships()
+        else:
+            # A ModelResource lists its relationships among its fields.
+            fields = []
+            related = []
+
+            for key, field in resource._fields():
+                if isinstance(field, (Relationship, ListRelationship)):
+                    related.append((key, field))
+                else:
+                    fields.append((key, field))
+
+        for key, field in fields:
+            attribute = getattr(model, field.name, None)
+
+            if field.authorization in UNCONDITIONAL_FIELD_READ and isinstance(attribute, QueryableAttribute):
+                columns[key] = attribute
+
+                if field.searchable:
+                    searchable.append(key)
+
+        for key, field in related:
+            if field.authorization in UNCONDITIONAL_FIELD_READ:
+                relationships[key] = (getattr(model, field.name), cls._related(field))
+
+        return cls(resource.meta.name, columns, relationships, searchable)
+
+    @staticmethod
+    def _related(field):
+        return lambda: field.resource._filter_table
+
+    def column(self, name):
+        """Returns the column attribute for the field `name`, or raises
+        :exc:`InvalidFilter`."""
+        try:
+            return self.columns[name]
+        except KeyError:
+            raise InvalidFilter("Cannot filter on '{0}' of {1}".format(name, self.name))
+
+    def relationship(self, name):
+        """Returns the relationship attribute and related table for `name`,
+        or raises :exc:`InvalidFilter`."""
+        try:
+            attribute, related = self.relationships[name]
+        except KeyError:
+            raise InvalidFilter("Cannot filter on '{0}' of {1}".format(name, self.name))
+
+        table = related()
+
+        if table is None:
+            raise InvalidFilter("Cannot filter on '{0}' of {1}".format(name, self.name))
+
+        return attribute, table
+
+    def resolve(self, names):
+        """Follows the relationship names of `names` from this table and
+        returns the tuple of relationship attributes and the final table,
+        or raises :exc:`InvalidFilter`."""
+        if len(names) > MAX_FILTER_DEPTH:
+            raise InvalidFilter('Relation paths may be at most {0} long'.format(MAX_FILTER_DEPTH))
+
+        path = []
+        table = self
+
+        for name in names:
+            relationship, table = table.relationship(name)
+            path.append(relationship)
+
+        return tuple(path), table
+
+    def compile(self, filt, negated=False):
+        """Validates `filt`, a :class:`Filter` or :class:`FilterNode`, and
+        returns the equivalent :class:`CompiledFilter` or
+        :class:`CompiledNode`, or raises :exc:`InvalidFilter`.
+
+        Field names are either a field of this table or a path through
+        related resources' tables, such as ``orders__items__sku``.
+
+        Filters below a ``not``, or compiled with `negated`, test related
+        fields with ``EXISTS`` rather than joins, so that negating them also
+        matches objects without any related rows.
+
+        """
+        if isinstance(filt, FilterNode):
+            negated = negated or filt.junction == 'not'
+            return CompiledNode(JUNCTIONS[filt.junction],
+                                tuple(self.compile(child, negated) for child in filt.children))
+
+        name = filt.fieldname
+        operator = filt.operator
+        argument = filt.argument
+
+        if not isinstance(name, basestring):
+            raise InvalidFilter('Filters need a field name')
+
+        if operator not in OPERATORS or operator in ORDERING_OPERATORS:
+            raise InvalidFilter("Unknown operator '{0}'".format(operator))
+
+        if operator in RELATIONSHIP_OPERATORS:
+            return self._compile_relationship(name, operator, argument)
+
+        names = name.split('__')
+        path, table = self.resolve(names[:-1])
+        column = table.column(names[-1])
+
+        if OPERATOR_ARITY[operator] == 1:
+            argument = None
+        elif filt.otherfield:
+            argument = table.column(filt.otherfield)
+        elif argument is None:
+            raise InvalidFilter("Operator '{0}' needs a value".format(operator))
+        elif operator in ('in', 'not_in') and not isinstance(argument, (list, tuple)):
+            raise InvalidFilter("Operator '{0}' needs a list".format(operator))
+        elif operator in TEXT_OPERATORS:
+            if names[-1] not in table.searchable:
+                raise InvalidFilter("'{0}' of {1} is not searchable".format(names[-1], table.name))
+            if not isinstance(argument, basestring):
+                raise InvalidFilter("Operator '{0}' needs text".format(operator))
+
+        return CompiledFilter(column, path, OPERATORS[operator], argument, negated)
+
+    def _compile_relationship(self, name, operator, argument):
+        names = name.split('__')
+
+        if not isinstance(argument, (dict, Filter, FilterNode)):
+            if len(names) < 2:
+                raise InvalidFilter("Operator '{0}' needs a filter".format(operator))
+            # Legacy form: {'name': 'relation__field', 'op': 'any', 'val': 5}
+            argument = Filter(names.pop(), 'eq', argument)
+
+        path, table = self.resolve(names)
+        relationship = path[-1]
+
+        if relationship.property.uselist != (operator == 'any'):
+            raise InvalidFilter("Use '{0}' to filter on '{1}'".format(
+                'any' if relationship.property.uselist else 'has', '__'.join(names)))
+
+        if isinstance(argument, dict):
+            argument = Filter.from_dictionary(argument)
+
+        criterion = table.compile(argument, negated=True)
+
+        return CompiledFilter(None, path, None, criterion, True)
+
+    def compile_order_by(self, order_by, filters=()):
+        """Returns the column and ordering expression for `order_by`, an
+        :class:`OrderBy`, or raises :exc:`InvalidFilter`.
+
+        The ``'rank'`` direction orders a searchable field by how well it
+        matches the full-text search of it among `filters`, best first.
+
+        """
+        if order_by.direction not in ORDERING_OPERATORS and order_by.direction != RANK:
+            raise InvalidFilter("Unknown direction '{0}'".format(order_by.direction))
+
+        try:
+            column = self.columns[order_by.field]
+        except KeyError:
+            raise InvalidFilter("Cannot order by '{0}' of {1}".format(order_by.field, self.name))
+
+        if order_by.direction != RANK:
+            return column, getattr(column, order_by.direction)()
+
+        for filt in iter_filters(filters):
+            if filt.fieldname == order_by.field and filt.operator in TEXT_OPERATORS:
+                return column, FullTextRank(column, filt.argument).asc()
+
+        raise InvalidFilter("Ordering by rank needs a search of '{0}'".format(order_by.field))
+
+    def compile_search(self, search_params):
+        """Validates every filter and ordering of `search_params` and returns
+        the list of :class:`CompiledFilter` objects and the list of
+        ``(column, expression)`` orderings, in order."""
+        filters = [self.compile(filt) for filt in search_params.filters]
+        order_by = [self.compile_order_by(order, search_params.filters)
+                    for order in search_params.order_by]
+
+        return filters, order_by
+
+
+#: Functions called by :meth:`QueryBuilder.create_query` before a search is
+#: applied to a query. See :func:`add_query_hook`.
+_query_hooks = []
+
+
+def add_query_hook(hook):
+    """Call `hook` for every search built by :func:`create_query`.
+
+    It is called as ``hook(name, model, filter_columns, order_columns)``,
+    where `name` is the resource name (or the model's table name), and the
+    columns are the model attributes that the search filters and orders on,
+    in order. A hook may raise :exc:`InvalidFilter` to refuse the search.
+
+    """
+    _query_hooks.append(hook)
+
+
+def remove_query_hook(hook):
+    """Stop calling a hook added with :func:`add_query_hook`."""
+    _query_hooks.remove(hook)
+
+
+def _model_columns(model, search_params):
+    """The attributes of `model` used by `search_params`, for searches which
+    are not resolved through a :class:`FilterTable`."""
+
+    filter_columns = []
+    for filt in iter_filters(search_params.filters):
+        fieldname = filt.fieldname or ''
+        if filt.operator in RELATIONSHIP_OPERATORS:
+            continue
+        if '__' in fieldname:
+            relation, fieldname = fieldname.split('__', 1)
+            target = getattr(model, relation, None)
+            target = getattr(getattr(target, 'property', None), 'mapper', None)
+            target = target and target.class_
+        else:
+            target = model
+        column = getattr(target, fieldname, None)
+        if isinstance(column, QueryableAttribute):
+            filter_columns.append(column)
+
+    order_columns = [getattr(model, order.field, None) for order in search_params.order_by]
+    order_columns = [column for column in order_columns if isinstance(column, QueryableAttribute)]
+
+    return filter_columns, order_columns
+
+
 class QueryBuilder(object):
 
     """Provides a static function for building a SQLAlchemy query object based
@@ -384,25 +996,31 @@ class QueryBuilder(object):
         iterable.
 
         """
-        filters = []
-        for filt in search_params.filters:
-            fname = filt.fieldname
-            val = filt.argument
-            # get the relationship from the field name, if it exists
-            relation = None
-            if '__' in fname:
-                relation, fname = fname.split('__')
-            # get the other field to which to compare, if it exists
-            if filt.otherfield:
-                val = getattr(model, filt.otherfield)
-            # for the sake of brevity...
-            create_op = QueryBuilder._create_operation
-            param = create_op(model, fname, filt.operator, val, relation)
-            filters.append(param)
-        return filters
+        return [QueryBuilder._create_filter(model, filt)
+                for filt in search_params.filters]
+
+    @staticmethod
+    def _create_filter(model, filt):
+        """Returns the operation on `model` for one :class:`Filter`, or the
+        conjunction, disjunction or negation of a :class:`FilterNode`."""
+        if isinstance(filt, FilterNode):
+            children = [QueryBuilder._create_filter(model, child) for child in filt.children]
+            return JUNCTIONS[filt.junction](*children)
+        fname = filt.fieldname
+        val = filt.argument
+        # get the relationship from the field name, if it exists
+        relation = None
+        if '__' in fname:
+            relation, fname = fname.split('__')
+        # get the other field to which to compare, if it exists
+        if filt.otherfield:
+            val = getattr(model, filt.otherfield)
+        # for the sake of brevity...
+        create_op = QueryBuilder._create_operation
+        return create_op(model, fname, filt.operator, val, relation)
 
     @staticmethod
-    def create_query(session, model, search_params, query=None):
+    def create_query(session, model, search_params, query=None, table=None):
         """Builds an SQLAlchemy query instance based on the search parameters
         present in ``search_params``, an instance of :class:`SearchParameters`.
 
@@ -420,22 +1038,48 @@ class QueryBuilder(object):
         3. limiting the query
         4. offsetting the query
 
-        Raises one of :exc:`AttributeError`, :exc:`KeyError`, or
+        If `table` is a :class:`FilterTable`, filters and orderings are
+        resolved through it instead of `model`, and :exc:`InvalidFilter` is
+        raised for any which it does not allow.
+
+        Otherwise raises one of :exc:`AttributeError`, :exc:`KeyError`, or
         :exc:`TypeError` if there is a problem creating the query. See the
         documentation for :func:`_create_operation` for more information.
 
         """
         # Adding field filters
         query = query or session_query(session, model)
-        # may raise exception here
-        filters = QueryBuilder._create_filters(model, search_params)
-        query = query.filter(search_params.junction(*filters))
 
-        # Order the search
-        for val in search_params.order_by:
-            field = getattr(model, val.field)
-            direction = getattr(field, val.direction)
-            query = query.order_by(direction())
+        if table is not None:
+            filters, order_by = table.compile_search(search_params)
+
+            if _query_hooks:
+                filter_columns = [column for filt in filters for column in filt.columns()]
+                order_columns = [column for column, _ in order_by]
+                for hook in _query_hooks:
+                    hook(table.name, model, filter_columns, order_columns)
+
+            joins = JoinPlan()
+            criterion = search_params.junction(*[filt.expression(joins) for filt in filters])
+            query = joins.apply(query, model, criterion)
+
+            if order_by:
+                query = query.order_by(*[expression for _, expression in order_by])
+        else:
+            if _query_hooks:
+                filter_columns, order_columns = _model_columns(model, search_params)
+                for hook in _query_hooks:
+                    hook(model.__tablename__, model, filter_columns, order_columns)
+
+            # may raise exception here
+            filters = QueryBuilder._create_filters(model, search_params)
+            query = query.filter(search_params.junction(*filters))
+
+            # Order the search
+            for val in search_params.order_by:
+                field = getattr(model, val.field)
+                direction = getattr(field, val.direction)
+                query = query.order_by(direction())
 
         # Limit it
         if search_params.limit:
@@ -445,7 +1089,86 @@ class QueryBuilder(object):
         return query
 
 
-def create_query(session, model, searchparams, query=None):
+def create_aggregate_query(session, model, searchparams, columns, query=None, table=None):
+    """Returns a SQLAlchemy query which applies the filters of `searchparams`
+    to `model` and computes aggregates over the matching rows in a single
+    ``GROUP BY`` statement.
+
+    The query is returned with the tuple of field names it groups by and the
+    tuple of :class:`Aggregate` objects it computes, which name its columns
+    in order.
+
+    `searchparams` is a dictionary of the form accepted by
+    :func:`SearchParameters.from_dictionary`, with two more keys::
+
+        {
+          'filters': [{'name': 'age', 'op': 'gt', 'val': 18}],
+          'group_by': ['is_active'],
+          'aggregates': [{'func': 'count'}, {'func': 'avg', 'field': 'savings'}]
+        }
+
+    ``group_by`` is a list of field names, and ``aggregates`` a list of
+    :class:`Aggregate` objects in dictionary form whose ``func`` is a key of
+    :data:`AGGREGATES`. Without ``aggregates`` the rows are counted. Groups
+    are returned in ``group_by`` order, and ``limit`` caps the number of
+    groups.
+
+    `columns` maps the field names which may be grouped by or aggregated
+    over to column expressions of `model`. Filters are resolved as in
+    :func:`create_query`, through `table` if it is given.
+
+    Raises :exc:`ValueError` for an unknown field or aggregate function, and
+    one of :exc:`AttributeError`, :exc:`KeyError`, or :exc:`TypeError` for an
+    invalid filter.
+
+    """
+    params = SearchParameters.from_dictionary(searchparams)
+    group_by = tuple(searchparams.get('group_by') or ())
+    aggregates = tuple(Aggregate.from_dictionary(a)
+                       for a in searchparams.get('aggregates') or ({'func': 'count'},))
+
+    def column(name):
+        if name not in columns:
+            raise ValueError("Unknown field '{0}'".format(name))
+        return columns[name]
+
+    group_columns = [column(name) for name in group_by]
+    entities = [col.label(name) for name, col in zip(group_by, group_columns)]
+
+    for aggregate in aggregates:
+        if aggregate.function not in AGGREGATES:
+            raise ValueError("Unknown aggregate '{0}'".format(aggregate.function))
+        function = AGGREGATES[aggregate.function]
+        if aggregate.field is None:
+            if aggregate.function != 'count':
+                raise ValueError("'{0}' needs a field".format(aggregate.function))
+            # count(*) alone names no column of `model`, so it would have
+            # no FROM clause; primary keys are never null.
+            expression = function(sqlalchemy_inspect(model).primary_key[0])
+        else:
+            expression = function(column(aggregate.field))
+        entities.append(expression.label(aggregate.label))
+
+    query = query or session_query(session, model)
+
+    if table is not None:
+        filters, _ = table.compile_search(params)
+        filters = [filt.expression() for filt in filters]
+    else:
+        filters = QueryBuilder._create_filters(model, params)
+
+    query = query.filter(params.junction(*filters))
+    query = query.with_entities(*entities)
+
+    if group_columns:
+        query = query.group_by(*group_columns).order_by(*group_columns)
+    if params.limit:
+        query = query.limit(params.limit)
+
+    return query, group_by, aggregates
+
+
+def create_query(session, model, searchparams, query=None, table=None):
     """Returns a SQLAlchemy query object on the given `model` where the search
     for the query is defined by `searchparams`.
 
@@ -461,13 +1184,17 @@ def create_query(session, model, searchparams, query=None):
     the parameters of the query (as returned by
     :func:`SearchParameters.from_dictionary`, for example).
 
+    If `table` is given, the search may only use the fields it allows. See
+    :class:`FilterTable`.
+
     """
     if isinstance(searchparams, dict):
         searchparams = SearchParameters.from_dictionary(searchparams)
-    return QueryBuilder.create_query(session, model, searchparams, query=query)
+    return QueryBuilder.create_query(session, model, searchparams, query=query,
+                                     table=table)
 
 
-def search(session, model, search_params, query=None):
+def search(session, model, search_params, query=None, table=None):
     """Performs the search specified by the given parameters on the model
     specified in the constructor of this class.
 
@@ -492,12 +1219,15 @@ def search(session, model, search_params, query=None):
     :class:`SearchParameters` object when the :func:`create_query` function is
     called.
 
+    `table`, if given, is the :class:`FilterTable` of the resource searched,
+    as for :func:`create_query`.
+
     """
     # `is_single` is True when 'single' is a key in ``search_params`` and its
     # corresponding value is anything except those values which evaluate to
     # False (False, 0, the empty string, the empty list, etc.).
     is_single = search_params.get('single')
-    query = create_query(session, model, search_params, query=query)
+    query = create_query(session, model, search_params, query=query, table=table)
     if is_single:
         # may raise NoResultFound or MultipleResultsFound
         return query.one()
@@ -0,0 +1,328 @@
+import functools
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import current_app, request
+from sqlalchemy import event
+from sqlalchemy.exc import InvalidRequestError
+
+from .instrumentation import current_metrics
+
+
+log = logging.getLogger(__name__)
+
+#: Methods served from read only transactions.
+READ_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS'])
+
+#: Clients whose last write is remembered before expired ones are dropped.
+MAX_STICKY_CLIENTS = 10000
+
+
+class PoolStats(object):
+
+    """How long units of work waited to check a connection out of the pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record(self, seconds):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                'checkouts': self.checkouts,
+                'wait_seconds': self.wait_seconds,
+                'max_wait_seconds': self.max_wait_seconds,
+                'mean_wait_seconds': self.wait_seconds / self.checkouts if self.checkouts else 0.0,
+            }
+
+
+class UnitOfWork(object):
+
+    """One session and one transaction, committed once by :meth:`finish`
+    unless it is read only or failed, and then closed so its connection goes
+    back to the pool."""
+
+    def __init__(self, session, read_only=False):
+        self.session = session
+        self.read_only = read_only
+        self.finished = False
+
+        if read_only:
+            event.listen(session, 'before_flush', _refuse_flush)
+
+    def finish(self, error=False):
+        if self.finished:
+            return
+
+        self.finished = True
+
+        try:
+            if error or self.read_only:
+                self.session.rollback()
+            else:
+                self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        finally:
+            self.session.close()
+
+
+def _refuse_flush(session, flush_context, instances):
+    raise InvalidRequestError('Cannot write in a read only unit of work')
+
+
+def remote_addr():
+    """The default client key for read-your-writes: the client's address."""
+
+    return request.remote_addr
+
+
+class SessionProvider(object):
+
+    """Provides the sessions of the resources which set it as their
+    ``meta.session_provider``.
+
+    `factory` is a :func:`~sqlalchemy.orm.sessionmaker` bound to the primary
+    database. Every request to those resources runs in a :class:`UnitOfWork`
+    with a new session from it: one transaction, committed once when the view
+    returns, or after a streamed response is sent, and rolled back on error.
+
+    Requests with a method in :data:`READ_METHODS` get a read only unit of
+    work, which refuses to flush and is always rolled back. `replica` is an
+    engine or a list of engines to bind those to, taken in turn. For
+    `sticky_seconds` after a client writes, its reads go to the primary
+    instead, so it sees its own writes despite replication lag. Clients are
+    told apart by `client_key`, a function of the current request which
+    returns the client's address by default.
+
+    Each unit of work checks its connection out up front, and the time that
+    takes is kept in :attr:`stats` and reported as the ``checkout`` phase of
+    the request's instrumentation.
+
+    """
+
+    def __init__(self, factory, replica=None, sticky_seconds=0, client_key=remote_addr):
+        if replica is None:
+            replica = []
+        elif not isinstance(replica, (list, tuple)):
+            replica = [replica]
+
+        self.factory = factory
+        self.replicas = list(replica)
+        self.sticky_seconds = sticky_seconds
+        self.client_key = client_key
+        self.stats = PoolStats()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._replica_cycle = itertools.cycle(self.replicas)
+        self._writes = {}
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+
+        if stack is None:
+            stack = self._local.stack = []
+
+        return stack
+
+    def current(self):
+        """The unit of work active on this thread, or ``None``."""
+
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def session(self):
+        """The session of the unit of work active on this thread."""
+
+        unit = self.current()
+
+        if unit is None:
+            raise RuntimeError('No unit of work is active, use SessionProvider.unit_of_work()')
+
+        return unit.session
+
+    def next_replica(self):
+        """The next replica engine in turn, or ``None`` without replicas."""
+
+        if not self.replicas:
+            return None
+
+        with self._lock:
+            return next(self._replica_cycle)
+
+    def record_write(self, client):
+        """Send the reads of `client` to the primary for the next
+        `sticky_seconds`."""
+
+        if not self.sticky_seconds or client is None:
+            return
+
+        now = time.time()
+
+        with self._lock:
+            self._writes[client] = now
+
+            if len(self._writes) > MAX_STICKY_CLIENTS:
+                for key, written in self._writes.items():
+                    if now - written >= self.sticky_seconds:
+                        del self._writes[key]
+
+    def is_sticky(self, client):
+        """Whether `client` wrote within the last `sticky_seconds`."""
+
+        if not self.sticky_seconds or client is None:
+            return False
+
+        written = self._writes.get(client)
+
+        return written is not None and time.time() - written < self.sticky_seconds
+
+    def begin(self, read_only=False, client=None):
+        """Start a unit of work and make it current on this thread. It must be
+        ended with :meth:`end`. Read only units of work are bound to the next
+        replica, unless `client` has written recently."""
+
+        bind = None
+
+        if read_only and not self.is_sticky(client):
+            bind = self.next_replica()
+
+        session = self.factory(bind=bind) if bind is not None else self.factory()
+        unit = UnitOfWork(session, read_only)
+
+        start = time.time()
+        try:
+            session.connection()
+        except Exception:
+            session.close()
+            raise
+
+        wait = time.time() - start
+        self.stats.record(wait)
+
+        metrics = current_metrics()
+
+        if metrics is not None:
+            metrics.add_time('checkout', wait)
+
+        self._stack().append(unit)
+
+        return unit
+
+    def end(self, unit):
+        """Stop `unit` being current. It is finished separately."""
+
+        self._stack().remove(unit)
+
+    @contextmanager
+    def unit_of_work(self, read_only=False, client=None):
+        """Run the enclosed block in a unit of work, yielding its session::
+
+            with provider.unit_of_work():
+                UserResource.upsert(records)
+
+        `client` identifies who is reading or writing, for read-your-writes.
+
+        """
+        unit = self.begin(read_only, client)
+        try:
+            yield unit.session
+        except Exception:
+            self.end(unit)
+            unit.finish(error=True)
+            raise
+
+        self.end(unit)
+        unit.finish()
+
+        if not read_only:
+            self.record_write(client)
+
+    @property
+    def primary(self):
+        """The engine `factory` is bound to, or ``None``."""
+
+        return getattr(self.factory, 'kw', {}).get('bind')
+
+    def pool_status(self):
+        """The ``status()`` of the primary and replica connection pools."""
+
+        status = {}
+
+        if self.primary is not None:
+            status['primary'] = self.primary.pool.status()
+
+        for index, engine in enumerate(self.replicas):
+            status['replica-%d' % index] = engine.pool.status()
+
+        return status
+
+    def instrument(self, resource, endpoint, view):
+        """Wrap the Flask view function `view` of `resource` in a unit of
+        work."""
+
+        @functools.wraps(view)
+        def scoped(*args, **kwargs):
+            read_only = request.method in READ_METHODS
+            client = self.client_key() if self.sticky_seconds else None
+            unit = self.begin(read_only, client)
+
+            def finish():
+                unit.finish()
+
+                if not read_only:
+                    self.record_write(client)
+
+            try:
+                response = current_app.make_response(view(*args, **kwargs))
+            except Exception:
+                unit.finish(error=True)
+                raise
+            finally:
+                self.end(unit)
+
+            if response.is_streamed:
+                # The body is still to be generated from the session.
+                response.call_on_close(finish)
+            else:
+                finish()
+
+            return response
+
+        return scoped
+
+
+def resource_session(resource):
+    """The session `resource` should use: that of its session provider's
+    current unit of work, or else its model's ``query`` session."""
+
+    provider = resource.meta.session_provider
+
+    if provider is None:
+        return resource.meta.model.query.session
+
+    return provider.session()
+
+
+def commit(resource, session):
+    """Commit `session`, or only flush it if a unit of work will commit it
+    at the end of the request."""
+
+    provider = resource.meta.session_provider
+
+    if provider is not None and provider.current() is not None:
+        session.flush()
+    else:
+        session.commit()
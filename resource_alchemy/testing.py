@@ -0,0 +1,44 @@
+from contextlib import contextmanager
+
+from .detector import recording, watch
+
+
+@contextmanager
+def assert_max_queries(maximum, *engines):
+    """Fail with an :exc:`AssertionError` listing the statements if the
+    enclosed block executes more than `maximum` statements on `engines`::
+
+        with assert_max_queries(2, engine):
+            client.get('/user/')
+
+    """
+    for engine in engines:
+        watch(engine)
+
+    with recording() as recorder:
+        yield recorder
+
+    if len(recorder) > maximum:
+        lines = ['%s  [%s]' % (' '.join(statement.statement.split()), statement.source or '-')
+                 for statement in recorder.statements]
+        raise AssertionError('Expected at most %d queries, %d were executed:\n%s' % (
+            maximum, len(recorder), '\n'.join(lines)))
+
+
+@contextmanager
+def assert_no_repeated_queries(*engines, **kwargs):
+    """Fail with an :exc:`AssertionError` if the enclosed block executes a
+    statement `threshold` (default 2) or more times for the same field."""
+
+    threshold = kwargs.pop('threshold', 2)
+
+    for engine in engines:
+        watch(engine)
+
+    with recording() as recorder:
+        yield recorder
+
+    repetitions = recorder.repetitions(threshold)
+
+    if repetitions:
+        raise AssertionError('Repeated queries:\n%s' % '\n'.join(str(r) for r in repetitions))
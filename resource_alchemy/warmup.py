@@ -0,0 +1,109 @@
+import collections
+import logging
+import os
+import time
+
+from sqlalchemy.orm import configure_mappers
+
+from .resource import finalize, prepare, registered_resources, relationship_fields
+
+
+log = logging.getLogger(__name__)
+
+
+class WarmupReport(collections.namedtuple('WarmupReport', 'resources seconds memory_mb failures')):
+
+    """What :func:`warmup` did: the resources it warmed, the time it took,
+    how much the resident memory of the process grew in megabytes (``None``
+    where that cannot be read) and a ``(resource, step, error)`` tuple for
+    each step that failed."""
+
+    __slots__ = ()
+
+
+def _resident_mb():
+    """The resident set size of this process in megabytes, or ``None``."""
+
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+    except (IOError, OSError, IndexError, ValueError):
+        return None
+
+    return pages * os.sysconf('SC_PAGE_SIZE') / (1024.0 * 1024.0)
+
+
+def _steps(resource):
+    """Yield ``(name, func)`` for each plan, table and schema of `resource`
+    to build."""
+
+    if getattr(resource.meta, 'model', None) is not None:
+        yield 'filter table', lambda: resource._filter_table
+
+    if hasattr(resource, '_field_plan'):
+        yield 'field plan', resource._field_plan
+
+        if getattr(resource.meta, 'model', None) is not None:
+            yield 'create plan', resource._create_plan
+            yield 'schema', resource._schema
+
+
+def warmup(app, resources=None):
+    """Build everything resource-alchemy computes lazily for the resources
+    registered on `app`, and those their relationships lead to: mapper
+    configuration, deferred resource setup, forward references, field and
+    create plans, filter tables and schemas. `resources` adds more.
+
+    Meant for the master process of a pre-fork server, so each worker starts
+    with these caches built and shares their memory with the others until it
+    writes to it. Nothing here opens a database connection or starts a
+    thread, so none are inherited by the workers. A step which fails is
+    logged as a warning and warmup carries on. Returns a
+    :class:`WarmupReport`.
+
+    """
+    started = time.time()
+    memory_before = _resident_mb()
+    failures = []
+
+    def attempt(resource, step, func):
+        try:
+            func()
+        except Exception as e:
+            label = step if resource is None else '%s of %s' % (step, resource.__name__)
+            log.warning('could not warm up %s: %s', label, e, exc_info=True)
+            failures.append((resource, step, e))
+
+    attempt(None, 'mappers', configure_mappers)
+    attempt(None, 'finalize', finalize)
+
+    pending = collections.deque(registered_resources(app) + list(resources or ()))
+    warmed = []
+
+    while pending:
+        resource = pending.popleft()
+
+        if resource in warmed:
+            continue
+
+        warmed.append(resource)
+        relationships = []
+
+        attempt(resource, 'prepare', lambda: prepare(resource))
+        attempt(resource, 'relationships', lambda: relationships.extend(relationship_fields(resource)))
+
+        for key, field in relationships:
+            attempt(resource, 'relationship %s' % key, lambda field=field: pending.append(field.resource))
+
+        for step, func in _steps(resource):
+            attempt(resource, step, func)
+
+    memory_after = _resident_mb()
+    memory_mb = memory_after - memory_before if memory_before is not None and memory_after is not None else None
+
+    report = WarmupReport(warmed, time.time() - started, memory_mb, failures)
+
+    log.info('warmed up %d resources in %.3fs%s, %d failures', len(warmed), report.seconds,
+             ' using %.1fMB' % memory_mb if memory_mb is not None else '', len(failures))
+
+    return report
@@ -56,17 +56,37 @@ class Order(Base):
     order_id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('users.user_id'))
     user = relationship('User', back_populates='orders')
+    items = relationship('Item', back_populates='order')
 
 
 class OrderResource(Resource):
 
     order_id = Field()
     user = Relationship(lambda: UserResource, description='the user')
+    items = ListRelationship(lambda: ItemResource)
 
     class meta:
         model = Order
 
 
+class Item(Base):
+    __tablename__ = 'items'
+
+    item_id = Column(Integer, primary_key=True)
+    order_id = Column(Integer, ForeignKey('orders.order_id'))
+    sku = Column(String, index=True)
+    order = relationship('Order', back_populates='items')
+
+
+class ItemResource(Resource):
+
+    item_id = Field()
+    sku = Field()
+
+    class meta:
+        model = Item
+
+
 class TestCase(PythonTestCase):
 
     def setUp(self):
@@ -0,0 +1,186 @@
+import json
+
+from flask import Flask
+from preggy import expect
+
+from resource_alchemy import RestResource, Field
+
+from ..base import TestCase, User, session_scope
+
+
+class AggregateUserResource(RestResource):
+
+    user_id = Field()
+    age = Field()
+    savings = Field()
+    is_active = Field()
+
+    class meta:
+        model = User
+
+
+class FormatOnlyField(Field):
+
+    # Field.from_obj never calls format_value, so neither may aggregates.
+    @staticmethod
+    def format_value(value):
+        return 'formatted'
+
+
+class FormatOnlyUserResource(RestResource):
+
+    user_id = Field()
+    age = FormatOnlyField()
+
+    class meta:
+        model = User
+        name = 'format_only_aggregate'
+
+
+class AdultsOnlyAuthorization(object):
+
+    @classmethod
+    def can_read(cls, obj, **kwargs):
+        return obj.age >= 18
+
+    @classmethod
+    def read_filter(cls, query, **kwargs):
+        return query.filter(User.age >= 18)
+
+
+class AdultUserResource(RestResource):
+
+    age = Field()
+    savings = Field()
+
+    class meta:
+        model = User
+        name = 'adult'
+        authorization = AdultsOnlyAuthorization
+
+
+class PerObjectAuthorization(object):
+
+    @classmethod
+    def can_read(cls, obj, **kwargs):
+        return True
+
+
+class PerObjectUserResource(RestResource):
+
+    age = Field()
+
+    class meta:
+        model = User
+        name = 'per_object'
+        authorization = PerObjectAuthorization
+
+
+class AggregateTestCase(TestCase):
+
+    def setUp(self):
+        super(AggregateTestCase, self).setUp()
+
+        with session_scope() as session:
+            session.add(User(user_id=1, age=17, savings=10.0, is_active=True))
+            session.add(User(user_id=2, age=30, savings=20.0, is_active=True))
+            session.add(User(user_id=3, age=40, savings=60.0, is_active=False))
+
+    def test_count_without_aggregates(self):
+        result = AggregateUserResource.aggregate({})
+
+        expect(result).to_equal({'keys': ['count'], 'rows': [[3]]})
+
+    def test_group_by(self):
+        result = AggregateUserResource.aggregate({
+            'group_by': ['is_active'],
+            'aggregates': [{'func': 'count'}, {'func': 'sum', 'field': 'savings'},
+                           {'func': 'max', 'field': 'age'}],
+        })
+
+        expect(result['keys']).to_equal(['is_active', 'count', 'sum_savings', 'max_age'])
+        expect(result['rows']).to_equal([[False, 1, 60.0, 40], [True, 2, 30.0, 30]])
+
+    def test_filters(self):
+        result = AggregateUserResource.aggregate({
+            'filters': [{'name': 'age', 'op': 'lt', 'val': 35}],
+            'aggregates': [{'func': 'avg', 'field': 'savings'}],
+        })
+
+        expect(result['rows']).to_equal([[15.0]])
+
+    def test_read_filter(self):
+        result = AdultUserResource.aggregate({'aggregates': [{'func': 'min', 'field': 'age'}]})
+
+        expect(result['rows']).to_equal([[30]])
+
+    def test_format_value_without_from_obj(self):
+        result = FormatOnlyUserResource.aggregate({
+            'group_by': ['age'],
+            'aggregates': [{'func': 'max', 'field': 'age'}],
+        })
+
+        expect(result['rows']).to_equal([[17, 17], [30, 30], [40, 40]])
+        expect([row[0] for row in result['rows']]).to_equal(
+            sorted(user['age'] for user in FormatOnlyUserResource.get_list()))
+
+    def test_single_query(self):
+        statements = []
+
+        def count(*args):
+            statements.append(args)
+
+        from sqlalchemy import event
+        from ..base import engine
+
+        event.listen(engine, 'before_cursor_execute', count)
+        try:
+            AggregateUserResource.aggregate({'group_by': ['is_active', 'age']})
+        finally:
+            event.remove(engine, 'before_cursor_execute', count)
+
+        expect(statements).to_length(1)
+
+    def test_undeclared_field(self):
+        err = expect.error_to_happen(Exception, message="Invalid aggregate: Unknown field 'first_name'")
+
+        with err:
+            AggregateUserResource.aggregate({'group_by': ['first_name']})
+
+    def test_unknown_function(self):
+        err = expect.error_to_happen(Exception, message="Invalid aggregate: Unknown aggregate 'median'")
+
+        with err:
+            AggregateUserResource.aggregate({'aggregates': [{'func': 'median', 'field': 'age'}]})
+
+    def test_per_object_authorization(self):
+        err = expect.error_to_happen(Exception)
+
+        with err:
+            PerObjectUserResource.aggregate({})
+
+
+class AggregateRouteTestCase(AggregateTestCase):
+
+    def setUp(self):
+        super(AggregateRouteTestCase, self).setUp()
+
+        app = Flask(__name__)
+        AggregateUserResource.register_api(app, aggregate=True)
+        self.client = app.test_client()
+
+    def test_route(self):
+        q = json.dumps({'group_by': ['is_active'], 'aggregates': [{'func': 'count'}]})
+        response = self.client.get('/user/aggregate', query_string={'q': q})
+
+        expect(response.status_code).to_equal(200)
+        expect(json.loads(response.data)).to_equal({
+            'keys': ['is_active', 'count'],
+            'rows': [[False, 1], [True, 2]],
+        })
+
+    def test_invalid_route(self):
+        q = json.dumps({'group_by': ['first_name']})
+        response = self.client.get('/user/aggregate', query_string={'q': q})
+
+        expect(response.status_code).to_equal(400)
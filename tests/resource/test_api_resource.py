@@ -0,0 +1,66 @@
+from preggy import expect
+
+from resource_alchemy import ApiResource, RestResource, Field, ListRelationship
+from resource_alchemy.exceptions import InvalidFilter
+
+from ..base import TestCase, User, Order, session_scope
+
+
+class ApiOrderResource(RestResource):
+
+    order_id = Field()
+
+    class meta:
+        model = Order
+        name = 'api_order'
+
+
+class ApiUserResource(ApiResource):
+
+    user_id = Field()
+    first_name = Field()
+    age = Field()
+    orders = ListRelationship(lambda: ApiOrderResource)
+
+    class meta:
+        model = User
+        name = 'api_user'
+
+
+class ApiResourceSearchTestCase(TestCase):
+
+    def setUp(self):
+        super(ApiResourceSearchTestCase, self).setUp()
+
+        with session_scope() as session:
+            session.add(User(user_id=1, first_name='Ann', age=30, savings=0.0,
+                             orders=[Order(order_id=1), Order(order_id=2)]))
+            session.add(User(user_id=2, first_name='Bob', age=17, savings=0.0))
+
+    def search(self, filters):
+        response = ApiUserResource.search({'filters': filters})
+        return [obj['user_id'] for obj in response['objects']]
+
+    def test_filter_table(self):
+        table = ApiUserResource._filter_table
+
+        expect(sorted(table.columns)).to_equal(['age', 'first_name', 'user_id'])
+        expect(sorted(table.relationships)).to_equal(['orders'])
+
+    def test_declared_field(self):
+        expect(self.search([{'name': 'age', 'op': 'gt', 'val': 18}])).to_equal([1])
+
+    def test_undeclared_column(self):
+        err = expect.error_to_happen(InvalidFilter, message="Cannot filter on 'savings' of api_user")
+
+        with err:
+            self.search([{'name': 'savings', 'op': 'eq', 'val': 0}])
+
+    def test_relation_path(self):
+        expect(self.search([{'name': 'orders__order_id', 'op': 'ge', 'val': 2}])).to_equal([1])
+
+    def test_nested_filters(self):
+        filters = [{'or': [{'name': 'first_name', 'op': 'eq', 'val': 'Bob'},
+                           {'name': 'orders', 'op': 'any', 'val': {'name': 'order_id', 'op': 'eq', 'val': 1}}]}]
+
+        expect(sorted(self.search(filters))).to_equal([1, 2])
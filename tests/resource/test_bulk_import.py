@@ -0,0 +1,176 @@
+import json
+
+from flask import Flask
+from preggy import expect
+
+from resource_alchemy import RestResource, Field, NotAuthorized, ReadOnlyAuthorization
+from resource_alchemy.bulk import ImportPlan
+
+from ..base import TestCase, User, session_scope
+
+
+class ImportUserResource(RestResource):
+
+    user_id = Field()
+    first_name = Field(required=True, read_only=False)
+    age = Field(read_only=False)
+    savings = Field(read_only=False)
+
+    class meta:
+        model = User
+        import_chunk_size = 2
+
+
+class ReadOnlyUserResource(RestResource):
+
+    first_name = Field(read_only=False)
+
+    class meta:
+        model = User
+        name = 'readonly_user'
+        authorization = ReadOnlyAuthorization
+
+
+class OwnerFieldAuthorization(object):
+
+    @classmethod
+    def can_read(cls, obj, **kwargs):
+        return True
+
+    @classmethod
+    def can_update(cls, obj, value, **kwargs):
+        return obj.first_name == value
+
+
+class RefusingFieldAuthorization(object):
+
+    @classmethod
+    def can_read(cls, obj, **kwargs):
+        return True
+
+    @classmethod
+    def can_update(cls, obj, value, **kwargs):
+        raise NotAuthorized('Names are managed elsewhere')
+
+
+class RefusedNameUserResource(RestResource):
+
+    first_name = Field(read_only=False, authorization=RefusingFieldAuthorization)
+
+    class meta:
+        model = User
+        name = 'refused_name_user'
+
+
+class OwnedNameUserResource(RestResource):
+
+    first_name = Field(read_only=False, authorization=OwnerFieldAuthorization)
+    age = Field(read_only=False)
+    savings = Field(read_only=False)
+
+    class meta:
+        model = User
+        name = 'owned_name_user'
+
+
+def ndjson(*records):
+    return '\n'.join(record if isinstance(record, str) else json.dumps(record) for record in records)
+
+
+class BulkImportTestCase(TestCase):
+
+    def setUp(self):
+        super(BulkImportTestCase, self).setUp()
+
+        app = Flask(__name__)
+        ImportUserResource.register_api(app, bulk_import=True)
+        ReadOnlyUserResource.register_api(app, bulk_import=True)
+        OwnedNameUserResource.register_api(app, bulk_import=True)
+        self.client = app.test_client()
+
+    def post(self, url, body):
+        response = self.client.post(url, data=body, content_type='application/x-ndjson')
+        return response, [json.loads(line) for line in response.data.splitlines()]
+
+    def test_imports_in_chunks(self):
+        body = ndjson(*[{'first_name': 'User %d' % i, 'age': i, 'savings': 1.0} for i in range(5)])
+        response, events = self.post('/user/import.ndjson', body)
+
+        expect(response.status_code).to_equal(200)
+        expect(events).to_equal([
+            {'line': 2, 'imported': 2},
+            {'line': 4, 'imported': 4},
+            {'line': 5, 'imported': 5},
+            {'done': True, 'imported': 5, 'failed': 0, 'lines': 5},
+        ])
+
+        with session_scope() as session:
+            expect(session.query(User).count()).to_equal(5)
+
+    def test_reports_invalid_lines(self):
+        body = ndjson(
+            {'first_name': 'Ok', 'age': 1, 'savings': 1.0},
+            'not json',
+            {'age': 2, 'savings': 1.0},
+            {'first_name': 'Id', 'user_id': 10, 'age': 3, 'savings': 1.0},
+            {'first_name': 'Extra', 'nickname': 'x', 'age': 4, 'savings': 1.0},
+        )
+        response, events = self.post('/user/import.ndjson', body)
+
+        errors = dict((event['line'], event['error']) for event in events if 'error' in event)
+
+        expect(sorted(errors)).to_equal([2, 3, 5])
+        expect(errors[3]).to_equal('Missing required field(s): first_name')
+        expect(errors[5]).to_equal("Unknown field 'nickname'")
+        expect(events[-1]).to_equal({'done': True, 'imported': 2, 'failed': 3, 'lines': 5})
+
+    def test_ignores_read_only_fields(self):
+        # As exported: user_id is readable but not writable.
+        body = ndjson({'user_id': 10, 'first_name': 'Exported', 'age': 1, 'savings': 1.0})
+        response, events = self.post('/user/import.ndjson', body)
+
+        expect(events[-1]['imported']).to_equal(1)
+
+        with session_scope() as session:
+            user = session.query(User).one()
+            expect(user.first_name).to_equal('Exported')
+            expect(user.user_id).not_to_equal(10)
+
+    def test_reports_non_ascii_keys(self):
+        body = ndjson({u'n\xfcm': 1, 'first_name': 'A', 'age': 1, 'savings': 1.0},
+                      {'first_name': 'B', 'age': 2, 'savings': 1.0})
+        response, events = self.post('/user/import.ndjson', body)
+
+        expect(events[0]).to_equal({'line': 1, 'error': u"Unknown field 'n\xfcm'"})
+        expect(events[-1]).to_equal({'done': True, 'imported': 1, 'failed': 1, 'lines': 2})
+
+    def test_reports_authorizations_which_need_the_object(self):
+        body = ndjson({'first_name': 'A', 'age': 1, 'savings': 1.0},
+                      {'first_name': 'B', 'age': 2, 'savings': 1.0})
+        response, events = self.post('/owned_name_user/import.ndjson', body)
+
+        expect(events[0]['line']).to_equal(1)
+        expect(events[0]['error']).to_include("Cannot authorize 'first_name' without an object")
+        expect(events[-1]).to_equal({'done': True, 'imported': 0, 'failed': 2, 'lines': 2})
+
+    def test_authorization_errors_propagate(self):
+        plan = ImportPlan(RefusedNameUserResource)
+
+        with expect.error_to_happen(NotAuthorized, message='Names are managed elsewhere'):
+            plan.validate({'first_name': 'A'})
+
+    def test_reports_rejected_chunks(self):
+        # age and savings are NOT NULL
+        body = ndjson({'first_name': 'A', 'age': 1, 'savings': 1.0}, {'first_name': 'B'})
+        response, events = self.post('/user/import.ndjson', body)
+
+        expect(events[0]['lines']).to_equal([1, 2])
+        expect(events[-1]['failed']).to_equal(2)
+
+        with session_scope() as session:
+            expect(session.query(User).count()).to_equal(0)
+
+    def test_resource_authorization(self):
+        response, events = self.post('/readonly_user/import.ndjson', ndjson({'first_name': 'A'}))
+
+        expect(events[0]).to_equal({'line': 1, 'error': 'Not authorized to create object'})
@@ -0,0 +1,172 @@
+import os
+import shutil
+import tempfile
+import threading
+from multiprocessing.pool import CLOSE
+
+from preggy import expect
+from sqlalchemy import Column, ForeignKey, Integer, String, create_engine, event
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship, scoped_session, sessionmaker
+
+from resource_alchemy import RestResource, Field, ListRelationship, loading
+
+from ..base import TestCase, User, Order, session_scope
+
+Base = declarative_base()
+
+
+class Author(Base):
+    __tablename__ = 'authors'
+
+    author_id = Column(Integer, primary_key=True)
+    name = Column(String)
+
+    books = relationship('Book', order_by='Book.book_id')
+    articles = relationship('Article', order_by='Article.article_id')
+
+
+class Book(Base):
+    __tablename__ = 'books'
+
+    book_id = Column(Integer, primary_key=True)
+    author_id = Column(Integer, ForeignKey('authors.author_id'))
+    title = Column(String)
+
+
+class Article(Base):
+    __tablename__ = 'articles'
+
+    article_id = Column(Integer, primary_key=True)
+    author_id = Column(Integer, ForeignKey('authors.author_id'))
+    title = Column(String)
+
+
+class BookResource(RestResource):
+    title = Field()
+
+    class meta:
+        model = Book
+
+
+class ArticleResource(RestResource):
+    title = Field()
+
+    class meta:
+        model = Article
+
+
+class AuthorResource(RestResource):
+    name = Field()
+    books = ListRelationship(BookResource)
+    articles = ListRelationship(ArticleResource)
+
+    class meta:
+        model = Author
+        concurrent_relationships = True
+        relationship_workers = 2
+
+
+class OrdersUserResource(RestResource):
+    user_id = Field()
+    orders = ListRelationship(lambda: OrderResource)
+
+    class meta:
+        model = User
+        concurrent_relationships = True
+
+
+class OrderResource(RestResource):
+    order_id = Field()
+
+    class meta:
+        model = Order
+
+
+def count_statements(engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    return statements
+
+
+class ConcurrentRelationshipsTestCase(TestCase):
+
+    def setUp(self):
+        super(ConcurrentRelationshipsTestCase, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.engine = create_engine('sqlite:///%s' % os.path.join(self.directory, 'authors.db'))
+        self.Session = scoped_session(sessionmaker(bind=self.engine))
+        Author.query = self.Session.query_property()
+        Base.metadata.create_all(self.engine)
+
+        session = self.Session()
+        for author_id in (1, 2, 3):
+            session.add(Author(author_id=author_id, name='Author %d' % author_id))
+            session.add(Book(author_id=author_id, title='Book %d' % author_id))
+            session.add(Book(author_id=author_id, title='Book %da' % author_id))
+            if author_id != 2:
+                session.add(Article(author_id=author_id, title='Article %d' % author_id))
+        session.commit()
+        self.Session.remove()
+
+    def tearDown(self):
+        self.Session.remove()
+        self.engine.dispose()
+        shutil.rmtree(self.directory)
+        super(ConcurrentRelationshipsTestCase, self).tearDown()
+
+    def test_collections_are_stitched_into_parents(self):
+        authors = AuthorResource.get_list()
+
+        expect(authors).to_length(3)
+        expect(authors[0]['books']).to_equal([{'title': 'Book 1'}, {'title': 'Book 1a'}])
+        expect(authors[0]['articles']).to_equal([{'title': 'Article 1'}])
+        expect(authors[1]['articles']).to_equal([])
+        expect(authors[2]['books']).to_equal([{'title': 'Book 3'}, {'title': 'Book 3a'}])
+
+    def test_no_lazy_loads(self):
+        statements = count_statements(self.engine)
+
+        AuthorResource.get_list()
+
+        # the parents plus one query per collection
+        expect(statements).to_length(3)
+
+
+class BatchedRelationshipsTestCase(TestCase):
+
+    def setUp(self):
+        super(BatchedRelationshipsTestCase, self).setUp()
+
+        with session_scope() as session:
+            for user_id in (1, 2):
+                session.add(User(user_id=user_id, age=20, savings=0.0))
+            session.add(Order(order_id=1, user_id=1))
+            session.add(Order(order_id=2, user_id=1))
+
+    def test_single_collection_loads_in_session(self):
+        users = OrdersUserResource.get_list()
+
+        expect(users).to_equal([
+            {'user_id': 1, 'orders': [{'order_id': 1}, {'order_id': 2}]},
+            {'user_id': 2, 'orders': []},
+        ])
+
+
+class ThreadPoolTestCase(TestCase):
+
+    def test_growing_the_pool_closes_the_old_one(self):
+        expect(loading._map(lambda value: value * 2, [1, 2], 1)).to_equal([2, 4])
+        before = threading.active_count()
+        old = loading._pool
+
+        expect(loading._map(lambda value: value * 2, [1, 2], loading._pool_size + 2)).to_equal([2, 4])
+
+        expect(loading._pool).not_to_equal(old)
+        expect(old._state).to_equal(CLOSE)
+        # Two more workers, none left over from the old pool.
+        expect(threading.active_count()).to_equal(before + 2)
@@ -0,0 +1,201 @@
+import json
+
+from flask import Flask
+from preggy import expect
+
+from resource_alchemy import RestResource, Field, ListRelationship, NotAuthorized, ReadOnlyAuthorization
+
+from ..base import TestCase, User, Order, session_scope
+
+
+class CountingAuthorization(object):
+
+    calls = []
+
+    @classmethod
+    def can_read(cls, obj, **kwargs):
+        return True
+
+    @classmethod
+    def can_update(cls, obj, value, **obj_data):
+        cls.calls.append(value)
+        return value != 'forbidden'
+
+
+class NewObjectAuthorization(object):
+
+    @classmethod
+    def can_read(cls, obj, **kwargs):
+        return True
+
+    @classmethod
+    def can_update(cls, obj, value, **obj_data):
+        # Only new users may set their biography.
+        return obj.user_id is None
+
+
+class CreateOrderResource(RestResource):
+
+    order_id = Field()
+
+    class meta:
+        model = Order
+        name = 'create_order'
+
+
+class CreateUserResource(RestResource):
+
+    user_id = Field()
+    first_name = Field(read_only=False)
+    last_name = Field(read_only=False, authorization=CountingAuthorization)
+    age = Field(read_only=False)
+    savings = Field(read_only=False)
+    biography = Field()
+    orders = ListRelationship(lambda: CreateOrderResource, read_only=False)
+
+    class meta:
+        model = User
+        name = 'create_user'
+
+
+class FlatUserResource(RestResource):
+
+    user_id = Field(read_only=False)
+    first_name = Field(read_only=False)
+    age = Field(read_only=False)
+    savings = Field(read_only=False)
+
+    class meta:
+        model = User
+        name = 'flat_user'
+
+
+class BiographyUserResource(RestResource):
+
+    first_name = Field(read_only=False)
+    age = Field(read_only=False)
+    savings = Field(read_only=False)
+    biography = Field(read_only=False, authorization=NewObjectAuthorization)
+
+    class meta:
+        model = User
+        name = 'biography_user'
+
+
+class NoCreateUserResource(RestResource):
+
+    first_name = Field(read_only=False)
+
+    class meta:
+        model = User
+        name = 'no_create_user'
+        authorization = ReadOnlyAuthorization
+
+
+class CreatePlanTestCase(TestCase):
+
+    def setUp(self):
+        super(CreatePlanTestCase, self).setUp()
+        del CountingAuthorization.calls[:]
+
+    def test_single_pass(self):
+        user = CreateUserResource.apply_transformers(
+            {'first_name': 'Ada', 'last_name': 'Lovelace', 'age': 36, 'savings': 1.0}, 'create_obj')
+
+        expect(user.first_name).to_equal('Ada')
+        expect(user.last_name).to_equal('Lovelace')
+        expect(user.age).to_equal(36)
+        expect(CountingAuthorization.calls).to_equal(['Lovelace'])
+
+    def test_skips_read_only_and_refused_fields(self):
+        user = CreateUserResource.apply_transformers(
+            {'first_name': 'Ada', 'last_name': 'forbidden', 'biography': 'ignored', 'age': 36, 'savings': 1.0},
+            'create_obj')
+
+        expect(user.last_name).to_be_null()
+        expect(user.biography).to_be_null()
+
+    def test_authorization_sees_the_new_object(self):
+        user = BiographyUserResource.apply_transformers(
+            {'first_name': 'Ada', 'age': 36, 'savings': 1.0, 'biography': 'Analyst'}, 'create_obj')
+
+        expect(user.first_name).to_equal('Ada')
+        expect(user.age).to_equal(36)
+        expect(user.biography).to_equal('Analyst')
+
+    def test_relationships(self):
+        user = CreateUserResource.apply_transformers(
+            {'first_name': 'Ada', 'age': 36, 'savings': 1.0, 'orders': [{}, {}]}, 'create_obj')
+
+        expect(user.orders).to_length(2)
+
+    def test_bulk_save(self):
+        records = [{'first_name': 'User %d' % i, 'age': 20 + i, 'savings': 1.0} for i in range(3)]
+        users = FlatUserResource.apply_transformers(records, 'create_list')
+
+        with session_scope() as session:
+            FlatUserResource._create_plan().add_all(session, users, records)
+
+            expect([user.user_id for user in users]).to_equal([1, 2, 3])
+            expect(users[0] in session).to_be_false()
+
+        with session_scope():
+            expect(User.query.count()).to_equal(3)
+
+    def test_bulk_save_with_primary_keys(self):
+        records = [{'user_id': 10 + i, 'first_name': 'User %d' % i, 'age': 20, 'savings': 1.0} for i in range(2)]
+        users = FlatUserResource.apply_transformers(records, 'create_list')
+
+        with session_scope() as session:
+            FlatUserResource._create_plan().add_all(session, users, records)
+
+        with session_scope():
+            expect(sorted(user.user_id for user in User.query)).to_equal([10, 11])
+
+    def test_not_authorized(self):
+        err = expect.error_to_happen(NotAuthorized, message='Not authorized to create object')
+
+        with err:
+            NoCreateUserResource.apply_transformers({'first_name': 'Ada'}, 'create_obj')
+
+
+class CreateRouteTestCase(TestCase):
+
+    def setUp(self):
+        super(CreateRouteTestCase, self).setUp()
+
+        app = Flask(__name__)
+        CreateUserResource.register_api(app)
+        FlatUserResource.register_api(app)
+        self.client = app.test_client()
+
+    def post(self, body, url='/create_user/'):
+        response = self.client.post(url, data=json.dumps(body), content_type='application/json')
+        return response, json.loads(response.data)
+
+    def test_create_one(self):
+        response, data = self.post({'first_name': 'Ada', 'age': 36, 'savings': 1.0})
+
+        expect(response.status_code).to_equal(201)
+        expect(data['user_id']).to_equal(1)
+        expect(data['first_name']).to_equal('Ada')
+
+    def test_create_many(self):
+        response, data = self.post([{'first_name': 'User %d' % i, 'age': 20 + i, 'savings': 1.0}
+                                    for i in range(3)], url='/flat_user/')
+
+        expect(response.status_code).to_equal(201)
+        expect([user['user_id'] for user in data]).to_equal([1, 2, 3])
+
+        with session_scope():
+            expect(User.query.count()).to_equal(3)
+
+    def test_create_many_with_relationships(self):
+        response, data = self.post([{'first_name': 'Ada', 'age': 36, 'savings': 1.0, 'orders': [{}]},
+                                    {'first_name': 'Bob', 'age': 40, 'savings': 2.0}])
+
+        expect(response.status_code).to_equal(201)
+        expect(data[0]['orders']).to_length(1)
+
+        with session_scope():
+            expect(Order.query.count()).to_equal(1)
@@ -0,0 +1,131 @@
+import json
+
+from preggy import expect
+
+from resource_alchemy import RestResource, Field, ListRelationship, PropertyAuthorization
+from resource_alchemy.search import create_query
+
+from ..base import TestCase, User, Order, OrderResource, session_scope
+
+
+class ExportUserResource(RestResource):
+
+    user_id = Field()
+    first_name = Field()
+    savings = Field()
+
+    class meta:
+        model = User
+
+
+class NameAgeUserResource(RestResource):
+
+    first_name = Field()
+    age = Field()
+    orders = ListRelationship(lambda: OrderResource)
+
+    class meta:
+        model = User
+        name = 'name_age_user'
+
+
+class UpperField(Field):
+
+    def from_obj(self, obj, **kwargs):
+        return super(UpperField, self).from_obj(obj, **kwargs).upper()
+
+
+class FormatOnlyField(Field):
+
+    @staticmethod
+    def format_value(value):
+        return 'formatted'
+
+
+class FormatOnlyUserResource(RestResource):
+
+    user_id = Field()
+    first_name = FormatOnlyField()
+
+    class meta:
+        model = User
+        name = 'format_only_user'
+
+
+class CustomFieldUserResource(RestResource):
+
+    first_name = UpperField()
+
+    class meta:
+        model = User
+
+
+class OwnedUserResource(RestResource):
+
+    user_id = Field()
+
+    class meta:
+        model = User
+        authorization = PropertyAuthorization('owner')
+
+
+class ExportTestCase(TestCase):
+
+    def setUp(self):
+        super(ExportTestCase, self).setUp()
+
+        with session_scope() as session:
+            for user_id in range(1, 8):
+                session.add(User(user_id=user_id, first_name='User %d' % user_id, age=20, savings=user_id * 1.5))
+
+    def read(self, chunks):
+        return [json.loads(line) for line in ''.join(chunks).splitlines()]
+
+    def test_export_matches_get_list(self):
+        query = User.query.order_by(User.user_id)
+        rows = self.read(ExportUserResource.export(query, chunk_size=3))
+
+        expect(rows).to_equal(ExportUserResource.get_list())
+
+    def test_format_value_without_from_obj(self):
+        query = User.query.order_by(User.user_id)
+        rows = self.read(FormatOnlyUserResource.export(query, chunk_size=3))
+
+        expect(rows).to_equal(FormatOnlyUserResource.get_list())
+        expect(rows[0]['first_name']).to_equal('User 1')
+
+    def test_to_many_filter_keeps_equal_rows(self):
+        with session_scope() as session:
+            for user_id in range(10, 13):
+                session.add(User(user_id=user_id, first_name='Same', age=40, savings=0.0,
+                                 orders=[Order(order_id=user_id)]))
+
+        query = create_query(None, User, {'filters': [{'name': 'orders__order_id', 'op': 'gt', 'val': 0}]},
+                             table=NameAgeUserResource._filter_table)
+        rows = self.read(NameAgeUserResource.export(query))
+
+        expect(rows).to_equal([{'first_name': 'Same', 'age': 40}] * 3)
+
+    def test_chunks_end_with_newline(self):
+        query = User.query.order_by(User.user_id)
+        chunks = list(ExportUserResource.export(query, chunk_size=3))
+
+        expect(chunks).to_length(3)
+        for chunk in chunks:
+            expect(chunk.endswith('\n')).to_be_true()
+
+    def test_process_pool_preserves_order(self):
+        query = User.query.order_by(User.user_id.desc())
+        serial = list(ExportUserResource.export(query, chunk_size=2))
+        parallel = list(ExportUserResource.export(query, chunk_size=2, processes=2))
+
+        expect(parallel).to_equal(serial)
+        expect(self.read(parallel)[0]['user_id']).to_equal(7)
+
+    def test_custom_from_obj_is_rejected(self):
+        with expect.error_to_happen(ValueError):
+            list(CustomFieldUserResource.export())
+
+    def test_object_authorization_is_rejected(self):
+        with expect.error_to_happen(ValueError):
+            list(OwnedUserResource.export())
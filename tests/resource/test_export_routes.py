@@ -0,0 +1,96 @@
+import json
+
+from flask import Flask
+from preggy import expect
+
+from resource_alchemy import RestResource, Field
+
+from ..base import TestCase, User, session_scope
+
+
+class ExportUserResource(RestResource):
+
+    user_id = Field()
+    first_name = Field()
+    age = Field()
+
+    class meta:
+        model = User
+
+
+class AdultsOnlyAuthorization(object):
+
+    @classmethod
+    def can_read(cls, obj, **kwargs):
+        return obj.age >= 18
+
+
+class AdultUserResource(RestResource):
+
+    user_id = Field()
+
+    class meta:
+        model = User
+        name = 'adult'
+        authorization = AdultsOnlyAuthorization
+
+
+class ExportRoutesTestCase(TestCase):
+
+    def setUp(self):
+        super(ExportRoutesTestCase, self).setUp()
+
+        app = Flask(__name__)
+        ExportUserResource.register_api(app, export=True)
+        AdultUserResource.register_api(app, export=True)
+        self.client = app.test_client()
+
+        with session_scope() as session:
+            session.add(User(user_id=1, first_name=u'Zo\xeb', age=17, savings=0.0))
+            session.add(User(user_id=2, first_name='Ann', age=30, savings=0.0))
+
+    def test_ndjson(self):
+        response = self.client.get('/user/export.ndjson')
+
+        expect(response.status_code).to_equal(200)
+        expect(response.mimetype).to_equal('application/x-ndjson')
+
+        rows = [json.loads(line) for line in response.data.splitlines()]
+        expect(rows).to_equal([
+            {'user_id': 1, 'first_name': u'Zo\xeb', 'age': 17},
+            {'user_id': 2, 'first_name': 'Ann', 'age': 30},
+        ])
+
+    def test_csv_header_follows_field_declarations(self):
+        response = self.client.get('/user/export.csv')
+
+        expect(response.mimetype).to_equal('text/csv')
+        expect(response.data.splitlines()).to_equal([
+            'user_id,first_name,age',
+            '1,Zo\xc3\xab,17',
+            '2,Ann,30',
+        ])
+
+    def test_search_filters(self):
+        q = json.dumps({'filters': [{'name': 'age', 'op': 'gt', 'val': 18}]})
+        response = self.client.get('/user/export.ndjson', query_string={'q': q})
+
+        expect(response.data.splitlines()).to_length(1)
+
+    def test_invalid_search(self):
+        q = json.dumps({'filters': [{'name': 'age', 'op': 'unknown', 'val': 18}]})
+        response = self.client.get('/user/export.csv', query_string={'q': q})
+
+        expect(response.status_code).to_equal(400)
+
+    def test_undeclared_field(self):
+        q = json.dumps({'filters': [{'name': 'savings', 'op': 'gt', 'val': 0}]})
+        response = self.client.get('/user/export.ndjson', query_string={'q': q})
+
+        expect(response.status_code).to_equal(400)
+        expect(json.loads(response.data)['message']).to_equal("Cannot filter on 'savings' of user")
+
+    def test_object_authorization(self):
+        response = self.client.get('/adult/export.csv')
+
+        expect(response.data.splitlines()).to_equal(['user_id', '2'])
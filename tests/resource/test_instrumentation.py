@@ -0,0 +1,115 @@
+import os
+import pstats
+import shutil
+import tempfile
+
+from flask import Flask
+from preggy import expect
+
+from resource_alchemy import RestResource, Field, Instrumentation, InMemoryMetrics
+from resource_alchemy.instrumentation import RequestMetrics, phase, current_metrics
+
+from ..base import TestCase, User, session_scope
+
+
+instrumentation = Instrumentation()
+
+
+class InstrumentedUserResource(RestResource):
+
+    user_id = Field()
+    first_name = Field()
+
+    class meta:
+        model = User
+        name = 'instrumented'
+        instrumentation = instrumentation
+
+
+class RequestMetricsTestCase(TestCase):
+
+    def test_server_timing(self):
+        metrics = RequestMetrics('user', 'api', 'GET')
+        metrics.add_time('query', 0.0012)
+        metrics.count('sql', 3)
+        metrics.duration = 0.005
+
+        expect(metrics.server_timing()).to_equal('query;dur=1.20, total;dur=5.00, sql;desc="3"')
+
+    def test_phase_without_metrics(self):
+        with phase('query'):
+            expect(current_metrics()).to_be_null()
+
+
+class InstrumentationTestCase(TestCase):
+
+    def setUp(self):
+        super(InstrumentationTestCase, self).setUp()
+
+        with session_scope() as session:
+            session.add(User(user_id=1, first_name='Test', last_name='User', age=18, savings=100.0))
+            session.add(User(user_id=2, first_name='Test', last_name='User2', age=19, savings=200.0))
+
+        instrumentation.sink.clear()
+        instrumentation.profile_dir = None
+
+        self.app = Flask(__name__)
+        InstrumentedUserResource.register_api(self.app)
+        instrumentation.register_metrics_route(self.app)
+        self.client = self.app.test_client()
+
+    def test_server_timing_header(self):
+        response = self.client.get('/instrumented/')
+
+        expect(response.status_code).to_equal(200)
+
+        header = response.headers['Server-Timing']
+        names = [metric.split(';')[0] for metric in header.split(', ')]
+
+        expect(names).to_equal(['query', 'authorize', 'serialize', 'render', 'total',
+                                'objects', 'relationships', 'sql'])
+        expect(header).to_include('objects;desc="2"')
+        expect(header).to_include('sql;desc="1"')
+
+    def test_sink_totals(self):
+        self.client.get('/instrumented/')
+        self.client.get('/instrumented/1')
+
+        snapshot = instrumentation.sink.snapshot()
+        totals = snapshot[('instrumented', 'api', 'GET')]
+
+        expect(totals['requests']).to_equal(2)
+        expect(totals['counters']['objects']).to_equal(3)
+        expect(totals['phases']).to_include('query')
+
+    def test_prometheus_route(self):
+        self.client.get('/instrumented/1')
+
+        response = self.client.get('/metrics')
+
+        expect(response.status_code).to_equal(200)
+        expect(response.data).to_include(
+            'resource_alchemy_requests_total{resource="instrumented",endpoint="api",method="GET"} 1')
+        expect(response.data).to_include(
+            'resource_alchemy_objects_total{resource="instrumented",endpoint="api",method="GET"} 1')
+
+    def test_profile_dump(self):
+        profile_dir = tempfile.mkdtemp()
+        instrumentation.profile_dir = profile_dir
+
+        try:
+            self.client.get('/instrumented/1')
+
+            profiles = os.listdir(profile_dir)
+
+            expect(profiles).to_length(1)
+            expect(profiles[0]).to_match(r'^instrumented-api-get-\d+\.prof$')
+
+            pstats.Stats(os.path.join(profile_dir, profiles[0]))
+        finally:
+            shutil.rmtree(profile_dir)
+
+    def test_not_instrumented(self):
+        InMemoryMetrics().record(RequestMetrics('user', 'api', 'GET'))
+
+        expect(current_metrics()).to_be_null()
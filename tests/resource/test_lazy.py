@@ -0,0 +1,141 @@
+import json
+import threading
+import time
+
+from flask import Flask
+from preggy import expect
+
+from resource_alchemy import RestResource, Field, ListRelationship, finalize
+from resource_alchemy.resource import Deferred, ModelResourceMetaclass
+
+from ..base import TestCase, User, Order, session_scope
+
+
+def lazy_resources():
+
+    class LazyOrderResource(RestResource):
+
+        order_id = Field()
+
+        class meta:
+            model = Order
+            name = 'lazy_order'
+            lazy = True
+
+    class LazyUserResource(RestResource):
+
+        orders = ListRelationship(lambda: LazyOrderResource)
+
+        class meta:
+            model = User
+            name = 'lazy_user'
+            excludes = ('first_name', 'last_name', 'biography')
+            lazy = True
+
+    return LazyUserResource, LazyOrderResource
+
+
+class EagerUserResource(RestResource):
+
+    orders = ListRelationship(lambda: EagerOrderResource)
+
+    class meta:
+        model = User
+        name = 'eager_user'
+        excludes = ('first_name', 'last_name', 'biography')
+
+
+class EagerOrderResource(RestResource):
+
+    order_id = Field()
+
+    class meta:
+        model = Order
+        name = 'eager_order'
+
+
+class LazyResourceTestCase(TestCase):
+
+    def setUp(self):
+        super(LazyResourceTestCase, self).setUp()
+
+        with session_scope() as session:
+            session.add(User(user_id=1, first_name='Test', last_name='User', age=18, savings=100.0,
+                             is_active=True))
+            session.add(Order(order_id=1, user_id=1))
+            session.commit()
+
+    def test_setup_is_deferred(self):
+        resource, _ = lazy_resources()
+
+        expect(resource._unprepared).to_be_true()
+        expect(resource.__dict__).not_to_include('savings')
+        expect(resource.__dict__['_compiled_serializer']).to_be_instance_of(Deferred)
+        expect(resource.__dict__['_filter_table']).to_be_instance_of(Deferred)
+
+    def test_first_use_prepares(self):
+        resource, _ = lazy_resources()
+
+        user = resource.get_one(1)
+
+        expect(resource._unprepared).to_be_false()
+        expect(resource.__dict__).to_include('savings')
+        expect(user).to_equal(EagerUserResource.get_one(1))
+
+    def test_filter_table_prepares(self):
+        resource, _ = lazy_resources()
+
+        expect(resource._filter_table.column('age')).to_equal(User.age)
+        expect(resource._unprepared).to_be_false()
+
+    def test_finalize(self):
+        user_resource, order_resource = lazy_resources()
+
+        prepared = finalize()
+
+        expect(prepared).to_include(user_resource)
+        expect(prepared).to_include(order_resource)
+        expect(user_resource._unprepared).to_be_false()
+        expect(user_resource.orders._resource).to_equal(order_resource)
+        expect(user_resource.__dict__).to_include('_cached_schema')
+        expect(user_resource._schema()['items']['properties']).to_equal(
+            EagerUserResource._schema()['items']['properties'])
+
+        expect(finalize()).to_be_empty()
+
+    def test_first_request_prepares(self):
+        user_resource, order_resource = lazy_resources()
+
+        app = Flask(__name__)
+        user_resource.register_api(app)
+        order_resource.register_api(app)
+
+        expect(user_resource._unprepared).to_be_true()
+
+        response = app.test_client().get('/lazy_user/1')
+
+        expect(response.status_code).to_equal(200)
+        expect(json.loads(response.data)).to_equal(EagerUserResource.get_one(1))
+        expect(user_resource._unprepared).to_be_false()
+
+    def test_concurrent_first_use_waits_for_prepare(self):
+        user_resource, _ = lazy_resources()
+        process_excludes = ModelResourceMetaclass.__dict__['process_excludes']
+
+        def slow_process_excludes(cls, excludes, attrs, model):
+            time.sleep(0.2)
+            process_excludes.__func__(cls, excludes, attrs, model)
+
+        ModelResourceMetaclass.process_excludes = classmethod(slow_process_excludes)
+        keys = []
+
+        try:
+            preparing = threading.Thread(target=user_resource._field_plan)
+            preparing.start()
+            time.sleep(0.05)
+            keys.extend(key for key, _ in user_resource._fields())
+            preparing.join()
+        finally:
+            ModelResourceMetaclass.process_excludes = process_excludes
+
+        expect(sorted(keys)).to_equal(['age', 'is_active', 'savings', 'user_id'])
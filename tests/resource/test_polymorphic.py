@@ -0,0 +1,177 @@
+from preggy import expect
+from sqlalchemy import Column, ForeignKey, Integer, String, inspect
+from sqlalchemy.orm import relationship
+
+from resource_alchemy import ApiResource, RestResource, Field, Relationship, ListRelationship, registry
+from resource_alchemy.testing import assert_max_queries
+
+from ..base import TestCase, Base, engine, session_scope
+
+
+class Owner(Base):
+
+    __tablename__ = 'owners'
+
+    owner_id = Column(Integer, primary_key=True)
+    name = Column(String)
+    favourite_id = Column(Integer, ForeignKey('pets.pet_id', use_alter=True))
+
+    pets = relationship('Pet', foreign_keys='Pet.owner_id', order_by='Pet.pet_id')
+    favourite = relationship('Pet', foreign_keys=[favourite_id])
+
+
+class Pet(Base):
+
+    __tablename__ = 'pets'
+
+    pet_id = Column(Integer, primary_key=True)
+    owner_id = Column(Integer, ForeignKey('owners.owner_id'))
+    kind = Column(String)
+    name = Column(String)
+
+    __mapper_args__ = {'polymorphic_on': kind, 'polymorphic_identity': 'pet'}
+
+
+class Dog(Pet):
+
+    __tablename__ = 'dogs'
+
+    pet_id = Column(Integer, ForeignKey('pets.pet_id'), primary_key=True)
+    breed = Column(String)
+
+    __mapper_args__ = {'polymorphic_identity': 'dog'}
+
+
+class Cat(Pet):
+
+    __tablename__ = 'cats'
+
+    pet_id = Column(Integer, ForeignKey('pets.pet_id'), primary_key=True)
+    lives = Column(Integer)
+
+    __mapper_args__ = {'polymorphic_identity': 'cat'}
+
+
+class Lion(Pet):
+
+    __mapper_args__ = {'polymorphic_identity': 'lion'}
+
+
+class InternalLionApi(ApiResource):
+
+    pet_id = Field()
+
+    class meta:
+        model = Lion
+
+
+class InternalLionResource(RestResource):
+
+    pet_id = Field()
+    kind = Field()
+
+    class meta:
+        model = Lion
+
+
+class PetResource(RestResource):
+
+    pet_id = Field()
+    name = Field()
+
+    class meta:
+        model = Pet
+
+
+class DogResource(RestResource):
+
+    pet_id = Field()
+    name = Field()
+    breed = Field()
+
+    class meta:
+        model = Dog
+        polymorphic_for = (PetResource,)
+
+
+class CatResource(RestResource):
+
+    pet_id = Field()
+    name = Field()
+    lives = Field()
+
+    class meta:
+        model = Cat
+        polymorphic_for = (PetResource,)
+
+
+class OwnerResource(RestResource):
+
+    owner_id = Field()
+    pets = ListRelationship(PetResource)
+    favourite = Relationship(PetResource)
+
+    class meta:
+        model = Owner
+
+
+class PolymorphicTestCase(TestCase):
+
+    def setUp(self):
+        super(PolymorphicTestCase, self).setUp()
+
+        with session_scope() as session:
+            session.add(Owner(owner_id=1, name='Owner'))
+            session.flush()
+
+            for pet_id in range(1, 9):
+                if pet_id % 2:
+                    session.add(Dog(pet_id=pet_id, owner_id=1, name='Dog %d' % pet_id, breed='Collie'))
+                else:
+                    session.add(Cat(pet_id=pet_id, owner_id=1, name='Cat %d' % pet_id, lives=9))
+
+            session.flush()
+            session.query(Owner).get(1).favourite_id = 2
+            session.commit()
+
+    def test_lists_dispatch_on_type(self):
+        pets = OwnerResource.get_one(1)['pets']
+
+        expect(pets[0]).to_equal({'pet_id': 1, 'name': 'Dog 1', 'breed': 'Collie'})
+        expect(pets[1]).to_equal({'pet_id': 2, 'name': 'Cat 2', 'lives': 9})
+
+    def test_relationships_dispatch_on_type(self):
+        expect(OwnerResource.get_one(1)['favourite']).to_equal({'pet_id': 2, 'name': 'Cat 2', 'lives': 9})
+
+    def test_lookup(self):
+        expect(registry.polymorphic(PetResource, Dog)).to_equal(DogResource)
+        expect(registry.polymorphic(PetResource, Pet)).to_equal(PetResource)
+        expect(registry.polymorphic(DogResource, Cat)).to_equal(DogResource)
+
+    def test_ignores_resources_which_do_not_opt_in(self):
+        with session_scope() as session:
+            session.add(Lion(pet_id=9, owner_id=1, name='Lion 9'))
+
+        expect(registry.polymorphic(PetResource, Lion)).to_equal(PetResource)
+        expect(OwnerResource.get_one(1)['pets'][8]).to_equal({'pet_id': 9, 'name': 'Lion 9'})
+
+    def test_rejects_strategies_which_cannot_be_set_later(self):
+        err = expect.error_to_happen(ValueError)
+
+        with err:
+            class InlineCatResource(RestResource):
+
+                pet_id = Field()
+
+                class meta:
+                    model = Cat
+                    polymorphic_load = 'inline'
+
+        expect(str(err.error)).to_include("Unsupported polymorphic_load 'inline'")
+
+    def test_subclasses_are_loaded_in_one_query_each(self):
+        expect(inspect(Dog).polymorphic_load).to_equal('selectin')
+
+        # The owner, the pets, then the dogs and the cats.
+        with assert_max_queries(4, engine):
+            OwnerResource.serialize(Owner.query.filter(Owner.owner_id == 1).one())
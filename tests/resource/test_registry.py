@@ -0,0 +1,118 @@
+from preggy import expect
+from sqlalchemy import Column, String
+
+from resource_alchemy import RestResource, Field, convert_name, registry
+from resource_alchemy import naming
+from resource_alchemy.resource import ResourceRegistry
+
+from ..base import TestCase, Base, User, Order, UserResource, session_scope
+
+
+class Tag(Base):
+
+    __tablename__ = 'tags'
+
+    name = Column(String, primary_key=True)
+
+
+class ConvertNameTestCase(TestCase):
+
+    def test_convert_name(self):
+        expect(convert_name('User')).to_equal('user')
+        expect(convert_name('UserOrder')).to_equal('user_order')
+        expect(convert_name('HTTPRequestLog')).to_equal('http_request_log')
+        expect(convert_name('Order2Item')).to_equal('order2_item')
+
+    def test_cached(self):
+        convert_name('CachedName')
+
+        expect(naming._converted['CachedName']).to_equal('cached_name')
+
+    def test_cache_is_bounded(self):
+        maximum = naming.MAX_CACHED_NAMES
+        naming.MAX_CACHED_NAMES = 2
+        try:
+            for name in ('OneName', 'TwoName', 'ThreeName'):
+                convert_name(name)
+
+            expect(len(naming._converted)).to_be_lesser_or_equal_to(2)
+            expect(convert_name('ThreeName')).to_equal('three_name')
+        finally:
+            naming.MAX_CACHED_NAMES = maximum
+
+
+class ResourceRegistryTestCase(TestCase):
+
+    def test_resources_are_registered(self):
+        expect(registry.for_model(User)).to_equal(UserResource)
+        expect(registry.for_name('user')).to_equal(UserResource)
+
+    def test_first_resource_wins(self):
+
+        class RegistryUserResource(RestResource):
+
+            user_id = Field()
+
+            class meta:
+                model = User
+
+        expect(RegistryUserResource.meta.name).to_equal('user')
+        expect(registry.for_model(User)).to_equal(UserResource)
+        expect(registry.for_name('user')).to_equal(UserResource)
+
+    def test_unknown(self):
+        local = ResourceRegistry()
+
+        expect(local.for_model(User)).to_be_null()
+        expect(local.for_name('user')).to_be_null()
+
+        with expect.error_to_happen(KeyError):
+            local.resolve(User)
+
+    def test_url(self):
+        local = ResourceRegistry()
+
+        class OrderUrlResource(RestResource):
+
+            order_id = Field()
+
+            class meta:
+                model = Order
+                name = 'orders'
+
+        local.add(OrderUrlResource)
+
+        expect(local.url(OrderUrlResource)).to_equal('/orders/')
+        expect(local.url(Order, 3)).to_equal('/orders/3')
+        expect(local.url('orders', 3)).to_equal('/orders/3')
+
+        with session_scope() as session:
+            session.add(User(user_id=1, first_name='Test', last_name='User', age=18, savings=1.0))
+            order = Order(order_id=7, user_id=1)
+            session.add(order)
+            session.commit()
+
+            expect(local.url(order)).to_equal('/orders/7')
+
+    def test_url_of_non_ascii_key(self):
+        local = ResourceRegistry()
+
+        class TagResource(RestResource):
+
+            name = Field()
+
+            class meta:
+                model = Tag
+                name = 'tags'
+
+        local.add(TagResource)
+
+        with session_scope() as session:
+            tag = Tag(name=u'caf\xe9')
+            session.add(tag)
+            session.commit()
+
+            expect(local.url(tag)).to_equal('/tags/caf%C3%A9')
+
+        expect(local.url(Tag, u'a/b?c#d e')).to_equal('/tags/a%2Fb%3Fc%23d%20e')
+        expect(local.url(Tag, (u'a,b', 2))).to_equal('/tags/a%2Cb,2')
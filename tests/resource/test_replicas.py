@@ -0,0 +1,103 @@
+import json
+import os
+import shutil
+import tempfile
+
+from flask import Flask
+from preggy import expect
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from resource_alchemy import RestResource, Field, SessionProvider
+
+from ..base import TestCase, Base, User
+
+
+class ReplicaUserResource(RestResource):
+
+    user_id = Field()
+    first_name = Field(read_only=False)
+    age = Field(read_only=False)
+    savings = Field(read_only=False)
+
+    class meta:
+        model = User
+        name = 'replica_user'
+
+
+class ReplicaRoutingTestCase(TestCase):
+
+    def setUp(self):
+        super(ReplicaRoutingTestCase, self).setUp()
+
+        self.directory = tempfile.mkdtemp()
+        self.engines = []
+
+        for name in ('Primary', 'Replica 0', 'Replica 1'):
+            engine = create_engine('sqlite:///%s' % os.path.join(self.directory, '%s.db' % name))
+            Base.metadata.create_all(engine)
+            engine.execute(User.__table__.insert(), user_id=1, first_name=name, age=30, savings=1.0)
+            self.engines.append(engine)
+
+        self.provider = SessionProvider(sessionmaker(bind=self.engines[0]), replica=self.engines[1:],
+                                        sticky_seconds=60)
+        ReplicaUserResource.meta.session_provider = self.provider
+
+        app = Flask(__name__)
+        ReplicaUserResource.register_api(app)
+        self.client = app.test_client()
+
+    def tearDown(self):
+        ReplicaUserResource.meta.session_provider = None
+
+        for engine in self.engines:
+            engine.dispose()
+
+        shutil.rmtree(self.directory)
+
+        super(ReplicaRoutingTestCase, self).tearDown()
+
+    def read(self, client='10.0.0.1'):
+        response = self.client.get('/replica_user/1', environ_base={'REMOTE_ADDR': client})
+        return json.loads(response.data)['first_name']
+
+    def write(self, client='10.0.0.1'):
+        response = self.client.put('/replica_user/1', data=json.dumps({'user_id': 1, 'first_name': 'Written'}),
+                                   content_type='application/json', environ_base={'REMOTE_ADDR': client})
+        expect(response.status_code).to_equal(200)
+
+    def test_round_robin(self):
+        expect([self.read() for _ in range(4)]).to_equal(['Replica 0', 'Replica 1', 'Replica 0', 'Replica 1'])
+
+    def test_list_reads_replica(self):
+        response = self.client.get('/replica_user/')
+
+        expect(json.loads(response.data)['objects'][0]['first_name']).to_equal('Replica 0')
+
+    def test_writes_go_to_primary(self):
+        self.write()
+
+        expect(self.engines[0].execute('SELECT first_name FROM users').scalar()).to_equal('Written')
+        expect(self.engines[1].execute('SELECT first_name FROM users').scalar()).to_equal('Replica 0')
+
+    def test_read_your_writes(self):
+        self.write()
+
+        expect(self.read()).to_equal('Written')
+        expect(self.read(client='10.0.0.2')).to_equal('Replica 0')
+
+    def test_stickiness_expires(self):
+        self.write()
+        self.provider._writes['10.0.0.1'] -= 61
+
+        expect(self.read()).to_equal('Replica 0')
+
+    def test_unit_of_work_client(self):
+        with self.provider.unit_of_work(client='job'):
+            ReplicaUserResource.upsert([{'user_id': 1, 'first_name': 'Synced', 'age': 30, 'savings': 1.0}])
+
+        with self.provider.unit_of_work(read_only=True, client='job'):
+            expect(ReplicaUserResource.get_one(1)['first_name']).to_equal('Synced')
+
+        with self.provider.unit_of_work(read_only=True):
+            expect(ReplicaUserResource.get_one(1)['first_name']).to_equal('Replica 0')
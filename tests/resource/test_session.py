@@ -0,0 +1,139 @@
+import json
+import os
+import shutil
+import tempfile
+
+from flask import Flask
+from preggy import expect
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from resource_alchemy import RestResource, Field, Instrumentation, SessionProvider
+
+from ..base import TestCase, Base, User
+
+
+class SessionUserResource(RestResource):
+
+    user_id = Field()
+    first_name = Field(read_only=False)
+    age = Field(read_only=False)
+    savings = Field(read_only=False)
+
+    class meta:
+        model = User
+        name = 'session_user'
+
+
+class SessionProviderTestCase(TestCase):
+
+    def setUp(self):
+        super(SessionProviderTestCase, self).setUp()
+
+        self.directory = tempfile.mkdtemp()
+        self.primary = create_engine('sqlite:///%s' % os.path.join(self.directory, 'primary.db'),
+                                     poolclass=QueuePool)
+        self.replica = create_engine('sqlite:///%s' % os.path.join(self.directory, 'replica.db'),
+                                     poolclass=QueuePool)
+
+        for engine, name in ((self.primary, 'Primary'), (self.replica, 'Replica')):
+            Base.metadata.create_all(engine)
+            engine.execute(User.__table__.insert(), user_id=1, first_name=name, age=30, savings=1.0)
+
+        self.factory = sessionmaker(bind=self.primary)
+        self.commits = []
+        event.listen(self.factory, 'after_commit', lambda session: self.commits.append(session))
+
+        self.provider = SessionProvider(self.factory, replica=self.replica)
+        SessionUserResource.meta.session_provider = self.provider
+
+        app = Flask(__name__)
+        SessionUserResource.register_api(app)
+        self.client = app.test_client()
+
+    def tearDown(self):
+        SessionUserResource.meta.session_provider = None
+        self.primary.dispose()
+        self.replica.dispose()
+        shutil.rmtree(self.directory)
+
+        super(SessionProviderTestCase, self).tearDown()
+
+    def post(self, body):
+        return self.client.post('/session_user/', data=json.dumps(body), content_type='application/json')
+
+    def test_reads_from_replica(self):
+        response = self.client.get('/session_user/1')
+
+        expect(response.status_code).to_equal(200)
+        expect(json.loads(response.data)['first_name']).to_equal('Replica')
+        expect(self.commits).to_be_empty()
+
+    def test_instrumentation_counts_replica_statements(self):
+        SessionUserResource.meta.instrumentation = Instrumentation()
+
+        try:
+            app = Flask(__name__)
+            SessionUserResource.register_api(app)
+            response = app.test_client().get('/session_user/1')
+        finally:
+            SessionUserResource.meta.instrumentation = None
+
+        expect(json.loads(response.data)['first_name']).to_equal('Replica')
+        expect(response.headers['Server-Timing']).to_include('sql;desc="1"')
+
+    def test_writes_to_primary_and_commits_once(self):
+        response = self.post({'first_name': 'New', 'age': 20, 'savings': 2.0})
+
+        expect(response.status_code).to_equal(201)
+        expect(json.loads(response.data)['user_id']).to_equal(2)
+        expect(self.commits).to_length(1)
+        expect(self.primary.execute('SELECT count(*) FROM users').scalar()).to_equal(2)
+        expect(self.replica.execute('SELECT count(*) FROM users').scalar()).to_equal(1)
+
+    def test_rolls_back_on_error(self):
+        response = self.post({'first_name': 'No age'})
+
+        expect(response.status_code).to_equal(500)
+        expect(self.commits).to_be_empty()
+        expect(self.primary.execute('SELECT count(*) FROM users').scalar()).to_equal(1)
+
+    def test_releases_connections(self):
+        self.client.get('/session_user/')
+        self.post({'first_name': 'New', 'age': 20, 'savings': 2.0})
+
+        expect(self.primary.pool.checkedout()).to_equal(0)
+        expect(self.replica.pool.checkedout()).to_equal(0)
+
+    def test_checkout_stats(self):
+        self.client.get('/session_user/')
+        self.client.get('/session_user/1')
+
+        stats = self.provider.stats.as_dict()
+
+        expect(stats['checkouts']).to_equal(2)
+        expect(stats['max_wait_seconds']).to_be_greater_or_equal_to(0)
+        expect(self.provider.pool_status()).to_include('replica-0')
+
+    def test_read_only_unit_of_work(self):
+        err = expect.error_to_happen(InvalidRequestError, message='Cannot write in a read only unit of work')
+
+        with err:
+            with self.provider.unit_of_work(read_only=True) as session:
+                session.add(User(user_id=5, age=1, savings=0.0))
+                session.flush()
+
+    def test_unit_of_work(self):
+        with self.provider.unit_of_work():
+            SessionUserResource.upsert([{'user_id': 1, 'first_name': 'Upserted', 'age': 30, 'savings': 1.0}])
+
+        expect(self.commits).to_length(1)
+        expect(self.primary.execute('SELECT first_name FROM users').scalar()).to_equal('Upserted')
+
+    def test_requires_unit_of_work(self):
+        err = expect.error_to_happen(RuntimeError)
+
+        with err:
+            SessionUserResource.get_list()
@@ -0,0 +1,123 @@
+import json
+
+from flask import Flask
+from preggy import expect
+from sqlalchemy import event
+
+from resource_alchemy import RestResource, Field, PropertyAuthorization
+
+from ..base import TestCase, User, engine, session_scope
+
+
+class UpsertUserResource(RestResource):
+
+    user_id = Field()
+    first_name = Field(read_only=False)
+    age = Field(read_only=False)
+    savings = Field(read_only=False)
+    biography = Field()
+
+    class meta:
+        model = User
+        import_chunk_size = 2
+
+
+class OwnedUserResource(RestResource):
+
+    user_id = Field()
+
+    class meta:
+        model = User
+        name = 'owned_user'
+        authorization = PropertyAuthorization('owner')
+
+
+class UpsertTestCase(TestCase):
+
+    def setUp(self):
+        super(UpsertTestCase, self).setUp()
+
+        with session_scope() as session:
+            session.add(User(user_id=1, first_name='Old', last_name='Name', age=10, savings=1.0))
+
+        self.statements = []
+        event.listen(engine, 'before_cursor_execute', self.count_statement)
+
+    def tearDown(self):
+        event.remove(engine, 'before_cursor_execute', self.count_statement)
+        super(UpsertTestCase, self).tearDown()
+
+    def count_statement(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def test_inserts_and_updates(self):
+        keys = UpsertUserResource.upsert([
+            {'user_id': 1, 'first_name': 'New', 'age': 11, 'savings': 2.0},
+            {'user_id': 2, 'first_name': 'Second', 'age': 20, 'savings': 3.0},
+        ])
+
+        expect(keys).to_equal([(1,), (2,)])
+
+        with session_scope() as session:
+            users = session.query(User).order_by(User.user_id).all()
+            expect([(u.first_name, u.last_name, u.age) for u in users]).to_equal([
+                ('New', 'Name', 11),
+                ('Second', None, 20),
+            ])
+
+    def test_one_statement_per_chunk(self):
+        records = [{'user_id': i, 'age': i, 'savings': 0.0} for i in range(1, 6)]
+        UpsertUserResource.upsert(records)
+
+        upserts = [s for s in self.statements if 'ON CONFLICT' in s]
+        expect(upserts).to_length(3)
+        expect(len(self.statements)).to_equal(3)
+
+    def test_keeps_record_order(self):
+        UpsertUserResource.upsert([
+            {'user_id': 2, 'first_name': 'First', 'age': 1, 'savings': 0.0},
+            {'user_id': 2, 'age': 2, 'savings': 0.0},
+            {'user_id': 3, 'age': 3, 'savings': 0.0},
+            {'user_id': 3, 'first_name': 'Last', 'age': 4, 'savings': 0.0},
+            {'user_id': 3, 'age': 5, 'savings': 0.0},
+        ])
+
+        with session_scope() as session:
+            users = session.query(User).filter(User.user_id > 1).order_by(User.user_id).all()
+            expect([(u.first_name, u.age) for u in users]).to_equal([('First', 2), ('Last', 5)])
+
+    def test_idempotent(self):
+        records = [{'user_id': 1, 'first_name': 'Again', 'age': 5, 'savings': 0.0}]
+        UpsertUserResource.upsert(records)
+        UpsertUserResource.upsert(records)
+
+        with session_scope() as session:
+            expect(session.query(User).count()).to_equal(1)
+
+    def test_requires_primary_key(self):
+        with expect.error_to_happen(ValueError, message='Record 0: Missing required field(s): user_id'):
+            UpsertUserResource.upsert([{'age': 1, 'savings': 0.0}])
+
+    def test_ignores_read_only_fields(self):
+        UpsertUserResource.upsert([{'user_id': 1, 'age': 12, 'savings': 1.0, 'biography': 'x'}])
+
+        with session_scope() as session:
+            user = session.query(User).get(1)
+            expect((user.age, user.biography)).to_equal((12, None))
+
+    def test_rejects_object_authorization(self):
+        with expect.error_to_happen(ValueError):
+            OwnedUserResource.upsert([{'user_id': 1}])
+
+    def test_import_route_upsert_mode(self):
+        app = Flask(__name__)
+        UpsertUserResource.register_api(app, bulk_import=True)
+
+        body = json.dumps({'user_id': 1, 'first_name': 'Imported', 'age': 1, 'savings': 0.0})
+        response = app.test_client().post('/user/import.ndjson?mode=upsert', data=body)
+        events = [json.loads(line) for line in response.data.splitlines()]
+
+        expect(events[-1]['imported']).to_equal(1)
+
+        with session_scope() as session:
+            expect(session.query(User).get(1).first_name).to_equal('Imported')
@@ -0,0 +1,109 @@
+import logging
+
+from flask import Flask
+from preggy import expect
+
+from resource_alchemy import ApiResource, RestResource, Field, ListRelationship, warmup
+
+from ..base import TestCase, User, Order
+
+
+def resources():
+
+    class WarmOrderResource(RestResource):
+
+        order_id = Field()
+
+        class meta:
+            model = Order
+            name = 'warm_order'
+            lazy = True
+
+    class WarmUserResource(RestResource):
+
+        user_id = Field()
+        first_name = Field(read_only=False)
+        orders = ListRelationship(lambda: WarmOrderResource)
+
+        class meta:
+            model = User
+            name = 'warm_user'
+            lazy = True
+
+    return WarmUserResource, WarmOrderResource
+
+
+class WarmupTestCase(TestCase):
+
+    def test_warms_registered_and_related_resources(self):
+        user_resource, order_resource = resources()
+
+        app = Flask(__name__)
+        user_resource.register_api(app)
+
+        report = warmup(app)
+
+        expect(report.resources).to_equal([user_resource, order_resource])
+        expect(report.failures).to_be_empty()
+        expect(report.seconds).to_be_greater_than(0)
+
+        for resource in (user_resource, order_resource):
+            expect(resource._unprepared).to_be_false()
+            expect(resource.__dict__).to_include('_cached_field_plan')
+            expect(resource.__dict__).to_include('_cached_create_plan')
+            expect(resource.__dict__).to_include('_cached_schema')
+
+        expect(user_resource.orders._resource).to_equal(order_resource)
+
+    def test_warms_api_resources(self):
+        _, order_resource = resources()
+
+        class WarmApiUserResource(ApiResource):
+
+            user_id = Field()
+            orders = ListRelationship(lambda: order_resource)
+
+            class meta:
+                model = User
+                name = 'warm_api_user'
+                lazy = True
+
+        app = Flask(__name__)
+        WarmApiUserResource.register_resource(app)
+
+        report = warmup(app)
+
+        expect(report.failures).to_be_empty()
+        expect(report.resources).to_equal([WarmApiUserResource, order_resource])
+        expect(WarmApiUserResource._unprepared).to_be_false()
+        expect(WarmApiUserResource.__dict__['_filter_table'].relationships).to_include('orders')
+
+    def test_reports_what_could_not_be_warmed(self):
+
+        class BrokenResource(RestResource):
+
+            user_id = Field()
+            orders = ListRelationship(lambda: UndefinedResource)  # NOQA
+
+            class meta:
+                model = User
+                name = 'broken'
+
+        app = Flask(__name__)
+        BrokenResource.register_api(app)
+
+        warnings = []
+        handler = logging.Handler()
+        handler.emit = warnings.append
+        logger = logging.getLogger('resource_alchemy.warmup')
+        logger.addHandler(handler)
+        try:
+            report = warmup(app)
+        finally:
+            logger.removeHandler(handler)
+
+        steps = [step for resource, step, error in report.failures if resource is BrokenResource]
+
+        expect(steps).to_include('relationship orders')
+        expect(report.resources).to_equal([BrokenResource])
+        expect([record.levelno for record in warnings]).to_include(logging.WARNING)
@@ -0,0 +1,109 @@
+from preggy import expect
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from resource_alchemy import IndexAdvisor, InvalidFilter, RestResource, Field, SessionProvider
+from resource_alchemy.search import create_query
+from tests.base import TestCase, Base, User, UserResource, session_scope
+
+
+def search(params):
+    return create_query(None, User, params, table=UserResource._filter_table)
+
+
+def users_engine(count):
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    engine.execute(User.__table__.insert(), [{'user_id': i, 'age': 1, 'savings': 0.0} for i in range(count)])
+    return engine
+
+
+class ProvidedUserResource(RestResource):
+
+    user_id = Field()
+    age = Field()
+
+    class meta:
+        model = User
+        name = 'provided_user'
+
+
+class IndexAdvisorTestCase(TestCase):
+
+    def setUp(self):
+        super(IndexAdvisorTestCase, self).setUp()
+        self.advisor = IndexAdvisor().install()
+
+    def tearDown(self):
+        self.advisor.uninstall()
+        super(IndexAdvisorTestCase, self).tearDown()
+
+    def test_report(self):
+        search({'filters': [{'name': 'age', 'op': 'gt', 'val': 18}]})
+        search({'filters': [{'name': 'age', 'op': 'lt', 'val': 65}],
+                'order_by': [{'field': 'user_id'}, {'field': 'age'}]})
+
+        expect(self.advisor.report()).to_equal([
+            {'resource': 'user', 'column': 'users.age', 'filter': 2, 'order_by': 1,
+             'indexed': False, 'score': 3},
+            {'resource': 'user', 'column': 'users.user_id', 'filter': 0, 'order_by': 1,
+             'indexed': True, 'score': 0},
+        ])
+
+    def test_relationship_columns(self):
+        search({'filters': [{'name': 'orders__order_id', 'op': 'eq', 'val': 1}]})
+
+        expect(self.advisor.report()[0]['column']).to_equal('orders.order_id')
+        expect(self.advisor.report()[0]['indexed']).to_be_true()
+
+    def test_model_search(self):
+        create_query(None, User, {'filters': [{'name': 'savings', 'op': 'gt', 'val': 1}]})
+
+        expect(self.advisor.report()[0]['resource']).to_equal('users')
+        expect(self.advisor.report()[0]['column']).to_equal('users.savings')
+
+
+class StrictIndexAdvisorTestCase(TestCase):
+
+    def tearDown(self):
+        self.advisor.uninstall()
+        super(StrictIndexAdvisorTestCase, self).tearDown()
+
+    def test_refuses_unindexed_ordering_on_large_table(self):
+        self.advisor = IndexAdvisor(strict=True, row_counts={'users': 10 ** 6}).install()
+
+        err = expect.error_to_happen(InvalidFilter, message="Cannot order user by 'age', it is not indexed")
+
+        with err:
+            search({'order_by': [{'field': 'age'}]})
+
+        search({'order_by': [{'field': 'user_id'}]})
+
+    def test_counts_rows(self):
+        self.advisor = IndexAdvisor(strict=True, large_table_rows=2).install()
+
+        with session_scope() as session:
+            session.add(User(user_id=1, age=1, savings=0.0))
+
+        search({'order_by': [{'field': 'age'}]})
+
+        expect(self.advisor.row_count(User.__table__, User)).to_equal(1)
+
+    def test_counts_rows_with_bind(self):
+        self.advisor = IndexAdvisor(strict=True, large_table_rows=2, bind=users_engine(3)).install()
+
+        err = expect.error_to_happen(InvalidFilter, message="Cannot order user by 'age', it is not indexed")
+
+        with err:
+            search({'order_by': [{'field': 'age'}]})
+
+    def test_counts_rows_with_session_provider(self):
+        provider = SessionProvider(sessionmaker(bind=users_engine(3)))
+        ProvidedUserResource.meta.session_provider = provider
+        self.advisor = IndexAdvisor(strict=True, large_table_rows=2).install()
+
+        try:
+            with provider.unit_of_work():
+                expect(self.advisor.row_count(User.__table__, User, 'provided_user')).to_equal(3)
+        finally:
+            ProvidedUserResource.meta.session_provider = None
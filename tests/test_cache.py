@@ -0,0 +1,80 @@
+from preggy import expect
+
+from resource_alchemy import RestResource, Field, FragmentCache
+
+from tests.base import TestCase, Session, User, session_scope
+
+fragment_cache = FragmentCache(max_size=2)
+
+
+class CachedUserResource(RestResource):
+
+    user_id = Field()
+    first_name = Field()
+    age = Field()
+
+    class meta:
+        model = User
+        fragment_cache = fragment_cache
+
+
+class FragmentCacheTestCase(TestCase):
+
+    def setUp(self):
+        super(FragmentCacheTestCase, self).setUp()
+        fragment_cache.clear()
+
+        with session_scope() as session:
+            for user_id in (1, 2, 3):
+                session.add(User(user_id=user_id, first_name='User %d' % user_id, age=20 + user_id, savings=0.0))
+
+    def test_hit_after_miss(self):
+        first = CachedUserResource.get_one(1)
+        second = CachedUserResource.get_one(1)
+
+        expect(second).to_equal(first)
+        expect(second).to_equal(dict(user_id=1, first_name='User 1', age=21))
+
+        stats = fragment_cache.stats(CachedUserResource)
+        expect(stats['misses']).to_equal(1)
+        expect(stats['hits']).to_equal(1)
+
+    def test_hits_are_copies(self):
+        CachedUserResource.get_one(1)
+        CachedUserResource.get_one(1)['age'] = 99
+
+        expect(CachedUserResource.get_one(1)['age']).to_equal(21)
+
+    def test_update_invalidates(self):
+        CachedUserResource.get_one(1)
+
+        with session_scope():
+            user = User.query.get(1)
+            user.age = 50
+
+        expect(CachedUserResource.get_one(1)['age']).to_equal(50)
+        expect(fragment_cache.stats(CachedUserResource)['invalidations']).to_equal(1)
+
+    def test_rollback_invalidates(self):
+        CachedUserResource.get_one(1)
+
+        session = Session()
+        User.query.get(1).age = 50
+        session.flush()
+
+        # Read back inside the transaction, then rolled back.
+        expect(CachedUserResource.get_one(1)['age']).to_equal(50)
+        session.rollback()
+
+        expect(CachedUserResource.get_one(1)['age']).to_equal(21)
+
+    def test_lru_eviction(self):
+        CachedUserResource.get_list()
+
+        expect(len(fragment_cache)).to_equal(2)
+        expect(fragment_cache.stats(CachedUserResource)['evictions']).to_equal(1)
+
+    def test_stats_by_name(self):
+        CachedUserResource.get_one(2)
+
+        expect(fragment_cache.stats()['user']['misses']).to_equal(1)
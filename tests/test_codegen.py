@@ -0,0 +1,162 @@
+import random
+from datetime import datetime, timedelta
+
+from preggy import expect
+
+from resource_alchemy import (RestResource, Field, DateTimeField, IntervalField, Relationship,
+                              ListRelationship, FilteredListRelationship)
+from resource_alchemy.codegen import compile_serializer
+from tests.base import TestCase
+
+
+class Stub(object):
+
+    def __init__(self, **attrs):
+        self.__dict__.update(attrs)
+
+
+class UpperField(Field):
+
+    def from_obj(self, obj, **kwargs):
+        value = super(UpperField, self).from_obj(obj, **kwargs)
+        return value.upper() if value else value
+
+
+class FormatOnlyField(Field):
+
+    # Field.from_obj never calls format_value, so this has no effect.
+    @staticmethod
+    def format_value(value):
+        return 'formatted'
+
+
+class HiddenWhenNegative(object):
+
+    @classmethod
+    def can_read(cls, obj, **kwargs):
+        return obj.number >= 0
+
+    @classmethod
+    def can_update(cls, obj, value, **obj_data):
+        return True
+
+
+class ChildResource(RestResource):
+
+    number = Field()
+    label = UpperField()
+
+
+class ParentResource(RestResource):
+
+    number = Field()
+    text = Field()
+    renamed = Field(name='text')
+    keyword = Field(name='class')
+    created = DateTimeField()
+    duration = IntervalField()
+    shouted = UpperField(name='text')
+    guarded = Field(name='number', read_only=False, authorization=HiddenWhenNegative)
+    writable = Field(name='number', read_only=False)
+    format_only = FormatOnlyField(name='number')
+
+    child = Relationship(ChildResource)
+    children = ListRelationship(lambda: ChildResource)
+    positive_children = FilteredListRelationship(ChildResource, list_filter=lambda child: child.number > 0)
+
+
+def reference_serialize(resource, obj):
+    result = {}
+
+    for key, field in resource._fields():
+        result[key] = field.from_obj(obj)
+
+    for key, relationship in resource._relationships():
+        result[key] = relationship.encode(obj)
+
+    return result
+
+
+def random_value(rng):
+    return rng.choice([
+        None,
+        rng.randint(-10, 10),
+        rng.random(),
+        u'text %d' % rng.randint(0, 100),
+        rng.choice([True, False]),
+    ])
+
+
+def random_child(rng):
+    return Stub(number=rng.randint(-3, 3), label=rng.choice([None, u'child']))
+
+
+def random_parent(rng):
+    attrs = {
+        'number': rng.randint(-5, 5),
+        'text': random_value(rng),
+        'class': random_value(rng),
+        'created': rng.choice([None, datetime(2015, 1, 1) + timedelta(seconds=rng.randint(0, 10 ** 8))]),
+        'duration': rng.choice([None, timedelta(seconds=rng.randint(0, 10 ** 6))]),
+        'child': rng.choice([None, random_child(rng)]),
+        'children': [random_child(rng) for _ in range(rng.randint(0, 3))],
+        'positive_children': [random_child(rng) for _ in range(rng.randint(0, 3))],
+    }
+    if isinstance(attrs['text'], (int, float, bool)):
+        attrs['text'] = unicode(attrs['text'])
+    return Stub(**attrs)
+
+
+class CompiledSerializerTestCase(TestCase):
+
+    def test_matches_reference_serialization(self):
+        rng = random.Random(42)
+
+        for _ in range(500):
+            obj = random_parent(rng)
+            expect(ParentResource._compiled_serializer(obj)).to_equal(reference_serialize(ParentResource, obj))
+
+    def test_serialize_uses_compiled_function(self):
+        obj = random_parent(random.Random(7))
+
+        expect(ParentResource.serialize(obj)).to_equal(reference_serialize(ParentResource, obj))
+
+    def test_field_only_serializer(self):
+        obj = random_parent(random.Random(3))
+        result = ParentResource._compiled_field_serializer(obj)
+
+        expect(sorted(result)).to_equal(sorted(key for key, _ in ParentResource._fields()))
+
+    def test_inlines_plain_fields(self):
+        source = ParentResource._compiled_serializer.source
+
+        expect(source).to_include("'number': obj.number")
+        expect(source).to_include("'keyword': getattr(obj, 'class')")
+        expect(source).to_include("'created': _format_")
+        expect(source).to_include("'shouted': _field_")
+        expect(source).to_include("'guarded': _field_")
+
+    def test_format_value_without_from_obj(self):
+        obj = random_parent(random.Random(5))
+
+        expect(ParentResource._compiled_serializer(obj)['format_only']).to_equal(obj.number)
+        expect(ParentResource._compiled_serializer.source).to_include("'format_only': obj.number")
+
+    def test_missing_attribute_raises(self):
+        with expect.error_to_happen(AttributeError):
+            ChildResource._compiled_serializer(Stub(number=1))
+
+    def test_can_be_disabled(self):
+        class UncompiledResource(RestResource):
+            number = Field()
+
+            class meta:
+                compile_serializers = False
+
+        expect(UncompiledResource._compiled_serializer).to_be_null()
+        expect(UncompiledResource.serialize(Stub(number=1))).to_equal({'number': 1})
+
+    def test_compile_serializer_without_relationships(self):
+        serialize = compile_serializer(ChildResource, relationships=False)
+
+        expect(serialize(Stub(number=2, label=u'x'))).to_equal({'number': 2, 'label': u'X'})
@@ -0,0 +1,157 @@
+from flask import Flask
+from preggy import expect
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import subqueryload
+
+from resource_alchemy import RestResource, Field, Relationship, ListRelationship, QueryDetector, NPlusOneQueries
+from resource_alchemy.testing import assert_max_queries, assert_no_repeated_queries
+
+from .base import TestCase, User, Order, engine, session_scope
+
+
+class DetectedOrderResource(RestResource):
+
+    order_id = Field()
+
+    class meta:
+        model = Order
+        name = 'detected_order'
+
+
+class DetectedUserResource(RestResource):
+
+    user_id = Field()
+    orders = ListRelationship(lambda: DetectedOrderResource)
+
+    class meta:
+        model = User
+        name = 'detected_user'
+
+
+class EagerUserResource(RestResource):
+
+    user_id = Field()
+    orders = ListRelationship(lambda: DetectedOrderResource)
+
+    class meta:
+        model = User
+        name = 'eager_user'
+
+    @hybrid_property
+    def search_query(cls):
+        return cls.base_query.options(subqueryload(User.orders))
+
+
+class OrderUserResource(RestResource):
+
+    order_id = Field()
+    user = Relationship(lambda: DetectedUserResource)
+
+    class meta:
+        model = Order
+        name = 'order_user'
+
+
+class QueryDetectorTestCase(TestCase):
+
+    def setUp(self):
+        super(QueryDetectorTestCase, self).setUp()
+
+        with session_scope() as session:
+            for user_id in (1, 2, 3):
+                session.add(User(user_id=user_id, age=20, savings=0.0))
+                session.add(Order(order_id=user_id * 10, user_id=user_id))
+                session.add(Order(order_id=user_id * 10 + 1, user_id=user_id))
+
+        self.detector = QueryDetector()
+        self.detector.watch(engine)
+
+    def test_list_relationship(self):
+        with self.detector.detect('users'):
+            DetectedUserResource.get_list()
+
+        expect(self.detector.detected).to_length(1)
+
+        label, repetitions = self.detector.detected[0]
+
+        expect(label).to_equal('users')
+        expect(repetitions).to_length(1)
+        expect(repetitions[0].count).to_equal(3)
+        expect(repetitions[0].source).to_equal('DetectedUserResource.orders')
+        expect(repetitions[0].statement).to_include('FROM orders')
+
+    def test_relationship(self):
+        with self.detector.detect('orders'):
+            OrderUserResource.get_list()
+
+        sources = [repetition.source for repetition in self.detector.detected[0][1]]
+
+        expect(sources).to_include('OrderUserResource.user')
+
+    def test_eager_loading(self):
+        with self.detector.detect('users'):
+            EagerUserResource.get_list()
+
+        expect(self.detector.detected).to_be_empty()
+
+    def test_raise_errors(self):
+        self.detector.raise_errors = True
+
+        err = expect.error_to_happen(NPlusOneQueries)
+
+        with err:
+            with self.detector.detect('users'):
+                DetectedUserResource.get_list()
+
+        expect(str(err.error)).to_include('3 queries from DetectedUserResource.orders')
+
+    def test_route(self):
+        DetectedUserResource.meta.query_detector = self.detector
+        try:
+            app = Flask(__name__)
+            DetectedUserResource.register_api(app)
+            response = app.test_client().get('/detected_user/')
+        finally:
+            DetectedUserResource.meta.query_detector = None
+
+        expect(response.status_code).to_equal(200)
+        expect(self.detector.detected[0][0]).to_equal('GET detected_user api')
+
+
+class AssertQueriesTestCase(TestCase):
+
+    def setUp(self):
+        super(AssertQueriesTestCase, self).setUp()
+
+        with session_scope() as session:
+            session.add(User(user_id=1, age=20, savings=0.0))
+            session.add(Order(order_id=10, user_id=1))
+
+        app = Flask(__name__)
+        EagerUserResource.register_api(app)
+        self.client = app.test_client()
+
+    def test_max_queries(self):
+        with assert_max_queries(2, engine) as recorder:
+            response = self.client.get('/eager_user/')
+
+        expect(response.status_code).to_equal(200)
+        expect(recorder).to_length(2)
+
+    def test_too_many_queries(self):
+        err = expect.error_to_happen(AssertionError)
+
+        with err:
+            with assert_max_queries(1, engine):
+                self.client.get('/eager_user/')
+
+        expect(str(err.error)).to_include('Expected at most 1 queries, 2 were executed')
+
+    def test_no_repeated_queries(self):
+        err = expect.error_to_happen(AssertionError)
+
+        with err:
+            with assert_no_repeated_queries(engine, threshold=1):
+                DetectedUserResource.get_list()
+
+        expect(str(err.error)).to_include('DetectedUserResource.orders')
@@ -1,5 +1,8 @@
+from datetime import datetime, timedelta
+
 from preggy import expect
 
+from resource_alchemy import DateTimeField, IntervalField
 from tests.base import TestCase, UserResource, OrderResource
 
 
@@ -127,3 +130,52 @@ class ListRelationshipTestCase(TestCase):
             'readonly': True,
             'type': 'array'
         })
+
+
+class FormatValueTestCase(TestCase):
+
+    def test_datetime_field(self):
+        value = DateTimeField.format_value(datetime(2015, 6, 1, 12, 30))
+
+        expect(value).to_equal('2015-06-01T12:30:00')
+
+    def test_interval_field(self):
+        expect(IntervalField.format_value(timedelta(minutes=2))).to_equal(120.0)
+
+    def test_none(self):
+        expect(DateTimeField.format_value(None)).to_be_null()
+        expect(IntervalField.format_value(None)).to_be_null()
+
+
+class ParseValueTestCase(TestCase):
+
+    def test_datetime_field(self):
+        value = DateTimeField.parse_value('2015-06-01T12:30:00')
+
+        expect(value).to_equal(datetime(2015, 6, 1, 12, 30))
+
+    def test_interval_field(self):
+        expect(IntervalField.parse_value(120)).to_equal(timedelta(minutes=2))
+
+    def test_none(self):
+        expect(DateTimeField.parse_value(None)).to_be_null()
+        expect(IntervalField.parse_value(None)).to_be_null()
+
+
+class ImmutableFieldTestCase(TestCase):
+
+    def test_bound_field_rejects_assignment(self):
+        err = expect.error_to_happen(AttributeError)
+
+        with err:
+            UserResource.user_id.read_only = False
+
+        expect(UserResource.user_id.read_only).to_be_true()
+
+    def test_field_has_no_dict(self):
+        expect(hasattr(UserResource.first_name, '__dict__')).to_be_false()
+        expect(hasattr(OrderResource.user, '__dict__')).to_be_false()
+
+    def test_bind_sets_key_and_name(self):
+        expect(UserResource.first_name.key).to_equal('first_name')
+        expect(UserResource.first_name.name).to_equal('first_name')
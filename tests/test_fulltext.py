@@ -0,0 +1,110 @@
+from preggy import expect
+from sqlalchemy.dialects import mysql, postgresql
+from sqlalchemy.exc import CompileError
+
+from resource_alchemy import Resource, Field, InvalidFilter, create_search_index
+from resource_alchemy.fulltext import fts5_query, search_index_ddl
+from resource_alchemy.search import create_query
+from tests.base import TestCase, User, engine, session_scope
+
+
+class SearchableUserResource(Resource):
+
+    user_id = Field()
+    first_name = Field()
+    biography = Field(searchable=True)
+
+    class meta:
+        model = User
+        name = 'searchable_user'
+
+
+def search(params):
+    return create_query(None, User, params, table=SearchableUserResource._filter_table)
+
+
+class FullTextSearchTestCase(TestCase):
+
+    def setUp(self):
+        super(FullTextSearchTestCase, self).setUp()
+
+        with session_scope() as session:
+            session.add(User(user_id=1, age=1, savings=0.0, biography='Writes Python and SQL'))
+            session.add(User(user_id=2, age=1, savings=0.0, biography='Python, Python, Python'))
+
+        create_search_index(engine, SearchableUserResource)
+
+        with session_scope() as session:
+            session.add(User(user_id=3, age=1, savings=0.0, biography='Grows tomatoes'))
+
+    def tearDown(self):
+        engine.execute('DROP TABLE IF EXISTS users_fts')
+        super(FullTextSearchTestCase, self).tearDown()
+
+    def test_search(self):
+        users = search({'filters': [{'name': 'biography', 'op': 'search', 'val': 'python'}]})
+
+        expect(sorted(user.user_id for user in users)).to_equal([1, 2])
+
+    def test_index_follows_writes(self):
+        with session_scope() as session:
+            session.query(User).get(1).biography = 'Grows potatoes'
+
+        users = search({'filters': [{'name': 'biography', 'op': 'match', 'val': 'grows'}]})
+
+        expect(sorted(user.user_id for user in users)).to_equal([1, 3])
+
+    def test_all_words_must_match(self):
+        users = search({'filters': [{'name': 'biography', 'op': 'search', 'val': 'python sql'}]})
+
+        expect([user.user_id for user in users]).to_equal([1])
+
+    def test_query_syntax_is_quoted(self):
+        users = search({'filters': [{'name': 'biography', 'op': 'search', 'val': 'python" OR "tomatoes'}]})
+
+        expect(list(users)).to_equal([])
+
+    def test_rank(self):
+        users = search({'filters': [{'name': 'biography', 'op': 'search', 'val': 'python'}],
+                        'order_by': [{'field': 'biography', 'direction': 'rank'}]})
+
+        expect([user.user_id for user in users]).to_equal([2, 1])
+
+    def test_rank_needs_search(self):
+        err = expect.error_to_happen(InvalidFilter, message="Ordering by rank needs a search of 'biography'")
+
+        with err:
+            search({'order_by': [{'field': 'biography', 'direction': 'rank'}]})
+
+    def test_field_must_be_searchable(self):
+        err = expect.error_to_happen(InvalidFilter, message="'first_name' of searchable_user is not searchable")
+
+        with err:
+            search({'filters': [{'name': 'first_name', 'op': 'search', 'val': 'ann'}]})
+
+
+class FullTextDialectTestCase(TestCase):
+
+    def test_postgresql(self):
+        query = search({'filters': [{'name': 'biography', 'op': 'search', 'val': 'python'}],
+                        'order_by': [{'field': 'biography', 'direction': 'rank'}]})
+        sql = str(query.statement.compile(dialect=postgresql.dialect()))
+
+        expect(sql).to_include("to_tsvector('english', coalesce(users.biography, '')) @@ plainto_tsquery(")
+        expect(sql).to_include('ORDER BY -ts_rank(')
+
+    def test_postgresql_ddl(self):
+        expect(search_index_ddl('postgresql', SearchableUserResource)).to_equal([
+            "CREATE INDEX IF NOT EXISTS ix_users_biography_fts ON users USING GIN "
+            "(to_tsvector('english', coalesce(biography, '')))"])
+
+    def test_unsupported_dialect(self):
+        query = search({'filters': [{'name': 'biography', 'op': 'search', 'val': 'python'}]})
+        err = expect.error_to_happen(CompileError, message='Full-text search is not supported on mysql')
+
+        with err:
+            str(query.statement.compile(dialect=mysql.dialect()))
+
+    def test_fts5_query(self):
+        expect(fts5_query('a "b')).to_equal('"a" """b"')
+        expect(fts5_query('  ')).to_equal('""')
@@ -0,0 +1,339 @@
+from preggy import expect
+from sqlalchemy import and_, or_
+
+from resource_alchemy import InvalidFilter, Resource, Field, Relationship
+from resource_alchemy.search import (Filter, FilterNode, OrderBy, SearchParameters, create_query,
+                                     create_aggregate_query,
+                                     MAX_FILTER_DEPTH, MAX_FILTER_NODES)
+from tests.base import TestCase, User, Order, Item, UserResource, OrderResource, session_scope
+
+
+class SearchParametersTestCase(TestCase):
+
+    def test_from_dictionary(self):
+        params = SearchParameters.from_dictionary({
+            'filters': [{'name': 'age', 'op': 'lt', 'val': 20}],
+            'order_by': [{'field': 'age', 'direction': 'desc'}],
+            'limit': 10,
+            'disjunction': True,
+        })
+
+        expect(params.filters).to_equal((Filter('age', 'lt', 20),))
+        expect(params.order_by).to_equal((OrderBy('age', 'desc'),))
+        expect(params.limit).to_equal(10)
+        expect(params.offset).to_be_null()
+        expect(params.junction).to_equal(or_)
+
+    def test_defaults(self):
+        params = SearchParameters()
+
+        expect(params.filters).to_equal(())
+        expect(params.order_by).to_equal(())
+        expect(params.junction).to_equal(and_)
+        expect(OrderBy('age').direction).to_equal('asc')
+
+    def test_immutable(self):
+        err = expect.error_to_happen(AttributeError)
+
+        with err:
+            Filter('age', 'lt', 20).argument = 30
+
+    def test_hashable(self):
+        params = SearchParameters.from_dictionary({'filters': [{'name': 'age', 'op': 'lt', 'val': 20}]})
+        same = SearchParameters.from_dictionary({'filters': [{'name': 'age', 'op': 'lt', 'val': 20}]})
+
+        expect(hash(params)).to_equal(hash(same))
+
+    def test_hashable_with_list_arguments(self):
+        params = SearchParameters.from_dictionary({'filters': [
+            {'name': 'age', 'op': 'in', 'val': [20, 30]},
+            {'name': 'orders', 'op': 'any', 'val': {'name': 'order_id', 'op': 'in', 'val': [1, [2, 3]]}}]})
+        same = SearchParameters.from_dictionary({'filters': [
+            {'name': 'age', 'op': 'in', 'val': [20, 30]},
+            {'name': 'orders', 'op': 'any', 'val': {'name': 'order_id', 'op': 'in', 'val': [1, [2, 3]]}}]})
+
+        expect(params.filters[0].argument).to_equal((20, 30))
+        expect(params.filters[1].argument.argument).to_equal((1, (2, 3)))
+        expect(hash(params)).to_equal(hash(same))
+
+
+class FilterTableTestCase(TestCase):
+
+    def setUp(self):
+        super(FilterTableTestCase, self).setUp()
+
+        with session_scope() as session:
+            session.add(User(user_id=1, first_name='Ann', age=30, savings=0.0,
+                             orders=[Order(order_id=1), Order(order_id=2)]))
+            session.add(User(user_id=2, first_name='Bob', age=17, savings=0.0))
+
+    def search(self, resource, params):
+        table = resource._filter_table
+        query = create_query(None, resource.meta.model, params, table=table)
+        return [obj for obj in query]
+
+    def test_declared_field(self):
+        users = self.search(UserResource, {'filters': [{'name': 'age', 'op': 'gt', 'val': 18}]})
+
+        expect([user.user_id for user in users]).to_equal([1])
+
+    def test_compiled_once_per_resource(self):
+        table = UserResource._filter_table
+
+        expect(table.columns['age']).to_equal(User.age)
+        expect(table.column('age')).to_equal(User.age)
+
+    def test_unknown_field(self):
+        err = expect.error_to_happen(InvalidFilter, message="Cannot filter on 'height' of user")
+
+        with err:
+            self.search(UserResource, {'filters': [{'name': 'height', 'op': 'eq', 'val': 2}]})
+
+    def test_undeclared_column(self):
+        # Order.user_id is a column, but OrderResource does not expose it
+        err = expect.error_to_happen(InvalidFilter, message="Cannot filter on 'user_id' of order")
+
+        with err:
+            self.search(OrderResource, {'filters': [{'name': 'user_id', 'op': 'eq', 'val': 1}]})
+
+    def test_unknown_operator(self):
+        err = expect.error_to_happen(InvalidFilter, message="Unknown operator 'near'")
+
+        with err:
+            self.search(UserResource, {'filters': [{'name': 'age', 'op': 'near', 'val': 2}]})
+
+    def test_missing_value(self):
+        err = expect.error_to_happen(InvalidFilter, message="Operator 'gt' needs a value")
+
+        with err:
+            self.search(UserResource, {'filters': [{'name': 'age', 'op': 'gt'}]})
+
+    def test_in_needs_list(self):
+        err = expect.error_to_happen(InvalidFilter, message="Operator 'in' needs a list")
+
+        with err:
+            self.search(UserResource, {'filters': [{'name': 'age', 'op': 'in', 'val': 30}]})
+
+    def test_in(self):
+        users = self.search(UserResource, {'filters': [{'name': 'age', 'op': 'in', 'val': [17, 18]}]})
+
+        expect([user.user_id for user in users]).to_equal([2])
+
+    def test_scalar_relation(self):
+        orders = self.search(OrderResource, {'filters': [{'name': 'user__first_name', 'op': 'eq', 'val': 'Ann'}]})
+
+        expect(sorted(order.order_id for order in orders)).to_equal([1, 2])
+
+    def test_collection_relation(self):
+        users = self.search(UserResource, {'filters': [{'name': 'orders__order_id', 'op': 'ge', 'val': 2}]})
+
+        expect([user.user_id for user in users]).to_equal([1])
+
+    def test_nested_any(self):
+        users = self.search(UserResource, {'filters': [
+            {'name': 'orders', 'op': 'any', 'val': {'name': 'order_id', 'op': 'eq', 'val': 1}}]})
+
+        expect([user.user_id for user in users]).to_equal([1])
+
+    def test_wrong_relationship_operator(self):
+        err = expect.error_to_happen(InvalidFilter, message="Use 'any' to filter on 'orders'")
+
+        with err:
+            self.search(UserResource, {'filters': [
+                {'name': 'orders', 'op': 'has', 'val': {'name': 'order_id', 'op': 'eq', 'val': 1}}]})
+
+    def test_order_by(self):
+        users = self.search(UserResource, {'order_by': [{'field': 'age', 'direction': 'asc'}]})
+
+        expect([user.user_id for user in users]).to_equal([2, 1])
+
+    def test_order_by_unknown_field(self):
+        err = expect.error_to_happen(InvalidFilter, message="Cannot order by 'height' of user")
+
+        with err:
+            self.search(UserResource, {'order_by': [{'field': 'height'}]})
+
+
+class FilterTreeTestCase(TestCase):
+
+    def setUp(self):
+        super(FilterTreeTestCase, self).setUp()
+
+        with session_scope() as session:
+            session.add(User(user_id=1, age=30, savings=0.0, is_active=True, orders=[Order(order_id=1)]))
+            session.add(User(user_id=2, age=17, savings=5.0, is_active=True))
+            session.add(User(user_id=3, age=70, savings=9.0, is_active=False))
+
+    def search(self, filters, table=True):
+        table = UserResource._filter_table if table else None
+        query = create_query(None, User, {'filters': filters}, table=table)
+        return sorted(user.user_id for user in query)
+
+    def test_parse(self):
+        params = SearchParameters.from_dictionary({'filters': [
+            {'or': [{'name': 'age', 'op': 'lt', 'val': 18},
+                    {'not': {'name': 'is_active', 'op': 'eq', 'val': True}}]}]})
+
+        expect(params.filters).to_equal((
+            FilterNode('or', (Filter('age', 'lt', 18),
+                              FilterNode('not', (Filter('is_active', 'eq', True),)))),))
+
+    def test_or_of_and(self):
+        filters = [{'or': [
+            {'and': [{'name': 'age', 'op': 'gt', 'val': 18}, {'name': 'is_active', 'op': 'eq', 'val': True}]},
+            {'name': 'savings', 'op': 'eq', 'val': 5.0},
+        ]}]
+
+        expect(self.search(filters)).to_equal([1, 2])
+        expect(self.search(filters, table=False)).to_equal([1, 2])
+
+    def test_not(self):
+        filters = [{'not': {'name': 'age', 'op': 'lt', 'val': 18}}]
+
+        expect(self.search(filters)).to_equal([1, 3])
+        expect(self.search(filters, table=False)).to_equal([1, 3])
+
+    def test_tree_inside_any(self):
+        filters = [{'name': 'orders', 'op': 'any', 'val': {'or': [
+            {'name': 'order_id', 'op': 'eq', 'val': 1},
+            {'name': 'order_id', 'op': 'eq', 'val': 2},
+        ]}}]
+
+        expect(self.search(filters)).to_equal([1])
+
+    def test_single_where_clause(self):
+        filters = [{'or': [{'name': 'age', 'op': 'lt', 'val': 18}, {'name': 'age', 'op': 'gt', 'val': 65}]}]
+        query = create_query(None, User, {'filters': filters}, table=UserResource._filter_table)
+
+        expect(str(query.statement).count('WHERE')).to_equal(1)
+        expect(str(query.statement)).to_include(' OR ')
+
+    def test_depth_limit(self):
+        filters = {'name': 'age', 'op': 'gt', 'val': 1}
+        for _ in range(MAX_FILTER_DEPTH):
+            filters = {'not': filters}
+
+        err = expect.error_to_happen(InvalidFilter,
+                                     message='Filters may be nested at most %d deep' % MAX_FILTER_DEPTH)
+
+        with err:
+            SearchParameters.from_dictionary({'filters': [filters]})
+
+    def test_node_limit(self):
+        filters = [{'name': 'age', 'op': 'eq', 'val': value} for value in range(MAX_FILTER_NODES)]
+
+        err = expect.error_to_happen(InvalidFilter,
+                                     message='Searches may contain at most %d filters' % MAX_FILTER_NODES)
+
+        with err:
+            SearchParameters.from_dictionary({'filters': [{'or': filters}]})
+
+    def test_malformed_node(self):
+        err = expect.error_to_happen(InvalidFilter, message="'or' takes a list of filters")
+
+        with err:
+            SearchParameters.from_dictionary({'filters': [{'or': {'name': 'age'}}]})
+
+    def test_ambiguous_node(self):
+        err = expect.error_to_happen(InvalidFilter,
+                                     message="Filter nodes take exactly one of 'and', 'or' or 'not'")
+
+        with err:
+            SearchParameters.from_dictionary({'filters': [{'and': [], 'or': []}]})
+
+
+class OrderPathResource(Resource):
+
+    order_id = Field()
+    user = Relationship(lambda: UserResource)
+
+    class meta:
+        model = Order
+        name = 'order_path'
+
+
+class ItemPathResource(Resource):
+
+    item_id = Field()
+    order = Relationship(lambda: OrderPathResource)
+
+    class meta:
+        model = Item
+        name = 'item_path'
+
+
+class RelationPathTestCase(TestCase):
+
+    def setUp(self):
+        super(RelationPathTestCase, self).setUp()
+
+        with session_scope() as session:
+            session.add(User(user_id=1, first_name='Ann', age=30, savings=0.0, orders=[
+                Order(order_id=1, items=[Item(item_id=1, sku='A'), Item(item_id=2, sku='B')]),
+                Order(order_id=2, items=[Item(item_id=3, sku='A')]),
+            ]))
+            session.add(User(user_id=2, first_name='Bob', age=17, savings=0.0, orders=[
+                Order(order_id=3, items=[Item(item_id=4, sku='C')]),
+            ]))
+            session.add(User(user_id=3, first_name='Cy', age=50, savings=0.0))
+
+    def query(self, resource, filters):
+        return create_query(None, resource.meta.model, {'filters': filters}, table=resource._filter_table)
+
+    def test_to_many_path_is_joined_once_per_object(self):
+        query = self.query(UserResource, [{'name': 'orders__items__sku', 'op': 'eq', 'val': 'A'}])
+        sql = str(query.statement)
+
+        expect(sql).to_include('LEFT OUTER JOIN')
+        expect(sql).to_include('users.user_id IN (SELECT users.user_id')
+        expect(sql).Not.to_include('DISTINCT')
+        expect(sql).Not.to_include('EXISTS')
+        expect([user.user_id for user in query]).to_equal([1])
+
+    def test_shared_path_reuses_join(self):
+        query = self.query(UserResource, [{'name': 'orders__items__sku', 'op': 'eq', 'val': 'A'},
+                                          {'name': 'orders__order_id', 'op': 'eq', 'val': 2},
+                                          {'name': 'orders__items__item_id', 'op': 'eq', 'val': 3}])
+        sql = str(query.statement)
+
+        expect(sql.count('JOIN orders')).to_equal(1)
+        expect(sql.count('JOIN items')).to_equal(1)
+        expect([user.user_id for user in query]).to_equal([1])
+
+    def test_many_to_one_path(self):
+        query = self.query(ItemPathResource, [{'name': 'order__user__first_name', 'op': 'eq', 'val': 'Bob'}])
+
+        expect(str(query.statement)).Not.to_include('DISTINCT')
+        expect([item.item_id for item in query]).to_equal([4])
+
+    def test_or_keeps_objects_without_related_rows(self):
+        query = self.query(UserResource, [{'or': [{'name': 'orders__items__sku', 'op': 'eq', 'val': 'C'},
+                                                  {'name': 'age', 'op': 'gt', 'val': 40}]}])
+
+        expect(sorted(user.user_id for user in query)).to_equal([2, 3])
+
+    def test_not_uses_exists(self):
+        query = self.query(UserResource, [{'not': {'name': 'orders__items__sku', 'op': 'eq', 'val': 'A'}}])
+
+        expect(str(query.statement)).to_include('EXISTS')
+        expect(str(query.statement)).Not.to_include('JOIN')
+        expect(sorted(user.user_id for user in query)).to_equal([2, 3])
+
+    def test_any_over_path(self):
+        query = self.query(UserResource, [{'name': 'orders__items', 'op': 'any',
+                                           'val': {'name': 'sku', 'op': 'eq', 'val': 'C'}}])
+
+        expect([user.user_id for user in query]).to_equal([2])
+
+    def test_unknown_hop(self):
+        err = expect.error_to_happen(InvalidFilter, message="Cannot filter on 'lines' of order")
+
+        with err:
+            self.query(UserResource, [{'name': 'orders__lines__sku', 'op': 'eq', 'val': 'A'}])
+
+    def test_aggregate_uses_exists(self):
+        query, _, _ = create_aggregate_query(
+            None, User, {'filters': [{'name': 'orders__items__sku', 'op': 'eq', 'val': 'A'}]},
+            {}, table=UserResource._filter_table)
+
+        expect(query.scalar()).to_equal(1)